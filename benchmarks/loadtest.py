@@ -0,0 +1,264 @@
+"""
+Concurrent load generator for the API
+
+Drives a running (or locally spawned) API with a configurable request mix
+over asyncio and reports throughput, p50/p95/p99 latency, error and 429
+rates per endpoint:
+
+    python main.py loadtest --spawn --workers 4 --concurrency 32 --duration 60
+    python main.py loadtest --host 10.0.0.5 --port 8000 --mix targets=6 daily=3 weekly=1
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_MIX = {"targets": 5, "daily": 3, "weekly": 1, "foods": 1}
+
+ENDPOINTS = {
+    "targets": ("POST", "/api/v1/calculate_targets"),
+    "daily":   ("POST", "/api/v1/generate_daily_plan"),
+    "weekly":  ("POST", "/api/v1/generate_weekly_plan"),
+    "foods":   ("GET",  "/api/v1/foods"),
+}
+
+SEARCH_TERMS = [
+    "rice", "egg", "milk", "chicken", "fish", "dal", "lentil", "banana",
+    "apple", "bread", "potato", "tofu", "yogurt", "oat", "spinach",
+]
+
+# Sampling weights for categorical profile fields
+ACTIVITY_WEIGHTS = {"sedentary": 0.30, "lightly": 0.25, "moderate": 0.30, "very": 0.10, "athlete": 0.05}
+GOAL_WEIGHTS = {"maintain": 0.40, "weight_loss": 0.35, "muscle_gain": 0.15, "diabetes_control": 0.10}
+INTENSITY_WEIGHTS = {"mild": 0.30, "standard": 0.55, "aggressive": 0.15}
+ALLERGY_RATES = {"peanut": 0.03, "nuts": 0.03, "dairy": 0.08, "egg": 0.02, "seafood": 0.04}
+CONDITION_RATES = {"diabetes": 0.10, "hypertension": 0.15}
+
+
+def parse_mix(items: Optional[List[str]]) -> Dict[str, float]:
+    """Parse ['targets=5', 'daily=3'] into a weight dict"""
+    if not items:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def sample_profile(rng: random.Random) -> Dict:
+    """Draw a user profile from realistic adult population ranges"""
+    gender = rng.choice(["male", "female"])
+    if gender == "male":
+        height = rng.gauss(175.0, 7.0)
+    else:
+        height = rng.gauss(162.0, 6.5)
+    height = min(max(height, 140.0), 210.0)
+    bmi = min(max(rng.lognormvariate(3.22, 0.18), 17.0), 45.0)
+    weight = min(max(bmi * (height / 100.0) ** 2, 35.0), 250.0)
+
+    return {
+        "age": rng.randint(18, 80),
+        "gender": gender,
+        "height_cm": round(height, 1),
+        "weight_kg": round(weight, 1),
+        "activity": _pick(rng, ACTIVITY_WEIGHTS),
+        "goal": _pick(rng, GOAL_WEIGHTS),
+        "intensity": _pick(rng, INTENSITY_WEIGHTS),
+        "conditions": [c for c, p in CONDITION_RATES.items() if rng.random() < p],
+        "allergies": [a for a, p in ALLERGY_RATES.items() if rng.random() < p],
+    }
+
+
+def build_request(kind: str, rng: random.Random, weekly_days: int):
+    method, path = ENDPOINTS[kind]
+    if kind == "foods":
+        return method, path, {"params": {"search": rng.choice(SEARCH_TERMS), "limit": 50}}
+    if kind == "weekly":
+        return method, path, {"json": {"profile": sample_profile(rng), "days": weekly_days}}
+    return method, path, {"json": sample_profile(rng)}
+
+
+async def _worker(client, deadline, remaining, mix, rng, weekly_days, samples, timeout):
+    while time.perf_counter() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+        kind = _pick(rng, mix)
+        method, path, kwargs = build_request(kind, rng, weekly_days)
+        t0 = time.perf_counter()
+        try:
+            resp = await client.request(method, path, timeout=timeout, **kwargs)
+            status = resp.status_code
+        except Exception:
+            status = 0
+        samples.append((kind, status, time.perf_counter() - t0))
+
+
+def summarize(samples: List, elapsed: float) -> Dict:
+    """Aggregate (endpoint, status, latency) samples into a report"""
+    report = {}
+    groups = {"all": samples}
+    for kind in ENDPOINTS:
+        rows = [s for s in samples if s[0] == kind]
+        if rows:
+            groups[kind] = rows
+
+    for kind, rows in groups.items():
+        lat = np.array([r[2] for r in rows]) * 1000.0
+        statuses = np.array([r[1] for r in rows])
+        ok = (statuses >= 200) & (statuses < 300)
+        report[kind] = {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(float(np.percentile(lat, 50)), 1),
+            "p95_ms": round(float(np.percentile(lat, 95)), 1),
+            "p99_ms": round(float(np.percentile(lat, 99)), 1),
+            "max_ms": round(float(lat.max()), 1),
+            "error_rate": round(float((~ok & (statuses != 429)).mean()), 4),
+            "rate_429": round(float((statuses == 429).mean()), 4),
+        }
+    return report
+
+
+async def run_load(
+    base_url: str,
+    concurrency: int = 16,
+    duration: float = 30.0,
+    total_requests: Optional[int] = None,
+    mix: Optional[Dict[str, float]] = None,
+    weekly_days: int = 3,
+    seed: int = 0,
+    timeout: float = 120.0,
+) -> Dict:
+    """Run a closed-loop load test with `concurrency` simultaneous clients"""
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("❌ The load generator needs httpx: pip install httpx")
+
+    mix = mix or dict(DEFAULT_MIX)
+    samples = []
+    remaining = [total_requests] if total_requests else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + (duration if not total_requests else float("inf"))
+        await asyncio.gather(*[
+            _worker(client, deadline, remaining, mix, random.Random(seed + i),
+                    weekly_days, samples, timeout)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "config": {
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 2),
+            "mix": mix,
+            "weekly_days": weekly_days,
+            "seed": seed,
+        },
+        "endpoints": summarize(samples, elapsed) if samples else {},
+    }
+
+
+def spawn_api(host: str, port: int, workers: int = 1, wait: float = 120.0) -> subprocess.Popen:
+    """Start the API with uvicorn and wait until the root endpoint answers"""
+    import urllib.request
+
+    cmd = [
+        sys.executable, "-m", "uvicorn", "src.api.main:app",
+        "--host", host, "--port", str(port), "--workers", str(workers),
+        "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT_DIR, env={**os.environ, "PYTHONPATH": str(ROOT_DIR)})
+
+    url = f"http://{host}:{port}/"
+    t_end = time.time() + wait
+    while time.time() < t_end:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API process exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                if resp.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"API did not come up on {url} within {wait:.0f}s")
+
+
+def print_report(report: Dict):
+    cfg = report["config"]
+    print(f"\n📊 {cfg['base_url']} | concurrency {cfg['concurrency']} | {cfg['duration_s']}s")
+    print(f"   {'endpoint':<10}{'reqs':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'errors':>9}{'429s':>8}")
+    for kind, st in report["endpoints"].items():
+        print(f"   {kind:<10}{st['requests']:>8}{st['throughput_rps']:>9.2f}{st['p50_ms']:>10.1f}"
+              f"{st['p95_ms']:>10.1f}{st['p99_ms']:>10.1f}{st['error_rate']:>9.2%}{st['rate_429']:>8.2%}")
+
+
+def main(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    concurrency: int = 16,
+    duration: float = 30.0,
+    total_requests: Optional[int] = None,
+    mix: Optional[List[str]] = None,
+    weekly_days: int = 3,
+    spawn: bool = False,
+    workers: int = 1,
+    output: Optional[str] = None,
+    seed: int = 0,
+) -> int:
+    if host == "0.0.0.0":
+        host = "127.0.0.1"
+    proc = spawn_api(host, port, workers=workers) if spawn else None
+    try:
+        print(f"🚦 Load testing http://{host}:{port} ...")
+        report = asyncio.run(run_load(
+            f"http://{host}:{port}",
+            concurrency=concurrency,
+            duration=duration,
+            total_requests=total_requests,
+            mix=parse_mix(mix),
+            weekly_days=weekly_days,
+            seed=seed,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    if spawn:
+        report["config"]["api_workers"] = workers
+    print_report(report)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved report to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,321 @@
+"""
+Optimizer hot-path benchmarks
+
+Times every stage of plan generation on synthetic catalogs of increasing
+size and records peak memory per stage. Results are written as JSON so a
+run can be compared with a previous one:
+
+    python main.py bench --sizes 1k 10k --output bench.json
+    python main.py bench --sizes 1k 10k --compare bench.json --threshold 0.15
+
+Each size (and the real database, when present) also gets a memory report
+of the food table as a default DataFrame vs the compact FoodTable.
+"""
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import DATA_INTERMEDIATE_DIR, FOODS_COMPLETE_CSV, LP_SOLVER_TIMEOUT
+from src.optimizer.catalog import PreparedCatalog, dominance_groups
+from src.optimizer.food_table import memory_report
+from src.optimizer.engine import build_day, build_weekly_plan
+from src.optimizer.lp_day_solver import (
+    MEAL_CONFIG, _ensure_required_cols, _portion_matrix, filter_by_user, solve_one_meal,
+)
+from src.pipelines.synthetic_catalog import generate_catalog, parse_size
+
+DEFAULT_SIZES = ["1k", "10k", "100k", "300k"]
+DEFAULT_OUTPUT = DATA_INTERMEDIATE_DIR / "bench_optimizer.json"
+# Foods in the pruning check (the unpruned pool must stay small enough for
+# CBC to prove optimality)
+PRUNE_CHECK_POOL = 80
+
+# Fixed profile so runs are comparable (30y male, moderate, maintain)
+BENCH_PROFILE = {
+    "inputs": {"allergies": ["dairy"], "conditions": ["diabetes"]},
+    "targets": {
+        "calories": 2500.0,
+        "protein_g": 105.0,
+        "fat_g": 77.8,
+        "carbs_g": 345.0,
+        "fiber_g": 30.0,
+    },
+}
+
+
+def _time_stage(fn: Callable, repeats: int) -> Dict:
+    """Run fn `repeats` times for timing, then once more under tracemalloc"""
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeats": repeats,
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "peak_mb": round(peak / 1e6, 3),
+    }
+
+
+def bench_catalog(n_foods: int, repeats: int = 3, weekly_days: int = 7, seed: int = 0) -> Dict:
+    """Benchmark each optimizer stage on one synthetic catalog size"""
+    raw = generate_catalog(n_foods, seed=seed)
+    inputs = BENCH_PROFILE["inputs"]
+    targets = BENCH_PROFILE["targets"]
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "foods.csv"
+        raw.to_csv(csv_path, index=False)
+        stages["catalog_load"] = _time_stage(lambda: pd.read_csv(csv_path), repeats)
+
+    stages["ensure_required_cols"] = _time_stage(lambda: _ensure_required_cols(raw), repeats)
+    foods = _ensure_required_cols(raw)
+
+    stages["filter_by_user"] = _time_stage(
+        lambda: filter_by_user(foods, inputs["allergies"], inputs["conditions"]), repeats
+    )
+    stages["build_day"] = _time_stage(lambda: build_day(BENCH_PROFILE, raw), repeats)
+
+    stages["prepare_catalog"] = _time_stage(lambda: PreparedCatalog(raw), repeats)
+    catalog = PreparedCatalog(raw)
+    allowed = catalog.user_mask(inputs["allergies"], inputs["conditions"])
+
+    def all_catalog_pools():
+        for _, (_, _, _, pool_name) in MEAL_CONFIG.items():
+            catalog.pool(pool_name, allowed)
+
+    stages["catalog_pool"] = _time_stage(all_catalog_pools, repeats)
+
+    cal_frac, min_i, max_i, pool_name = MEAL_CONFIG["lunch"]
+    pool = catalog.pool(pool_name, allowed)
+    macro = {
+        "protein_g": targets["protein_g"] * cal_frac,
+        "fat_g": targets["fat_g"] * cal_frac,
+        "carbs_g": targets["carbs_g"] * cal_frac,
+        "fiber_g": targets["fiber_g"] * cal_frac,
+    }
+    stages["solve_one_meal"] = _time_stage(
+        lambda: solve_one_meal(pool, targets["calories"] * cal_frac, macro,
+                               max_items=max_i, min_items=min_i),
+        repeats,
+    )
+    stages["build_day_prepared"] = _time_stage(lambda: build_day(BENCH_PROFILE, catalog), repeats)
+
+    # A weekly plan is days x build_day, so a single run is enough
+    stages["build_weekly_plan"] = _time_stage(
+        lambda: build_weekly_plan(BENCH_PROFILE, raw, days=weekly_days), 1
+    )
+
+    return {
+        "n_foods": n_foods,
+        "stages": stages,
+        "pruning": check_pruning(catalog),
+        "memory": memory_report(foods),
+    }
+
+
+def check_pruning(catalog: PreparedCatalog, n_candidates: int = PRUNE_CHECK_POOL) -> Dict:
+    """
+    Pool sizes per slot before/after dominance pruning, and each meal's
+    objective on a sample of foods with and without pruning
+
+    Each sample takes every food from groups with near-duplicates first, so
+    the check covers as many dominated foods as possible, and is grouped on
+    its own (a group's lead in the catalog may lie outside it). The pruned
+    objective is that of the foods the solution expands to, so the delta
+    includes the epsilon-dominance loss.
+    """
+    targets = BENCH_PROFILE["targets"]
+    checks = {}
+    for slot, (cal_frac, min_i, max_i, pool_name) in MEAL_CONFIG.items():
+        macro = {
+            "protein_g": targets["protein_g"] * cal_frac,
+            "fat_g": targets["fat_g"] * cal_frac,
+            "carbs_g": targets["carbs_g"] * cal_frac,
+            "fiber_g": targets["fiber_g"] * cal_frac,
+        }
+
+        sp = catalog.slots[pool_name]
+        has_dup = np.bincount(sp.group)[sp.group] > 1
+        idx = np.concatenate([np.flatnonzero(has_dup), np.flatnonzero(~has_dup)])[:n_candidates]
+        positions = sp.positions[idx]
+        pool = catalog.table.frame(positions)
+        group, rank = dominance_groups(_portion_matrix(pool), catalog.eps, catalog.dominance_eps)
+        pruned = catalog.grouped_frame(positions, group, rank, max_candidates=len(positions))
+
+        solves = {}
+        for name, rows in (("full", pool), ("pruned", pruned)):
+            info = {}
+            solve_one_meal(rows, targets["calories"] * cal_frac, macro,
+                           max_items=max_i, min_items=min_i, info=info, time_limit=LP_SOLVER_TIMEOUT)
+            solves[name] = {k: info.get(k) for k in
+                            ("candidates", "status", "objective", "solve_time_s", "time_limit_hit")}
+
+        full, pruned = solves["full"]["objective"], solves["pruned"]["objective"]
+        checks[slot] = {
+            **solves,
+            "objective_delta": None if full is None or pruned is None else round(pruned - full, 4),
+        }
+
+    return {"slots": catalog.pruning_summary(), "checks": checks}
+
+
+def run_benchmarks(
+    sizes: Optional[List[str]] = None,
+    repeats: int = 3,
+    weekly_days: int = 7,
+    seed: int = 0,
+) -> Dict:
+    """Run the suite over all catalog sizes"""
+    import pulp
+
+    sizes = sizes or DEFAULT_SIZES
+    results = {}
+    for size in sizes:
+        n = parse_size(size)
+        print(f"  ▶️ {n:,} foods...")
+        results[str(n)] = bench_catalog(n, repeats=repeats, weekly_days=weekly_days, seed=seed)
+
+    catalog_memory = None
+    if FOODS_COMPLETE_CSV.exists():
+        print(f"  ▶️ memory of {FOODS_COMPLETE_CSV.name}...")
+        catalog_memory = memory_report(_ensure_required_cols(pd.read_csv(FOODS_COMPLETE_CSV)))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pulp": pulp.__version__,
+            "repeats": repeats,
+            "weekly_days": weekly_days,
+            "seed": seed,
+        },
+        "results": results,
+        "catalog_memory": catalog_memory,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 0.10) -> List[Dict]:
+    """
+    Compare two benchmark runs
+
+    A stage regresses when its median time (or peak memory) grew by more
+    than `threshold` (fraction) over the baseline. Sizes or stages missing
+    from either run are ignored.
+    """
+    regressions = []
+    for size, cur in current.get("results", {}).items():
+        base = baseline.get("results", {}).get(size)
+        if base is None:
+            continue
+        for stage, cur_stats in cur["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None:
+                continue
+            for metric in ("median_s", "peak_mb"):
+                old, new = base_stats.get(metric), cur_stats.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if change > threshold:
+                    regressions.append({
+                        "n_foods": int(size),
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 4),
+                    })
+    return regressions
+
+
+def print_results(report: Dict):
+    for size, res in report["results"].items():
+        print(f"\n📊 {int(size):,} foods")
+        print(f"   {'stage':<22}{'median (s)':>12}{'min (s)':>12}{'peak (MB)':>12}")
+        for stage, st in res["stages"].items():
+            print(f"   {stage:<22}{st['median_s']:>12.4f}{st['min_s']:>12.4f}{st['peak_mb']:>12.2f}")
+
+        pruning = res.get("pruning")
+        if pruning:
+            sizes = ", ".join(f"{slot} {s['foods']}->{s['non_dominated']}"
+                              for slot, s in pruning["slots"].items())
+            print(f"   ✂️ pruning: {sizes}")
+            for slot, check in pruning["checks"].items():
+                print(f"   ✂️ {slot} objective {check['full']['objective']} ({check['full']['candidates']} candidates) "
+                      f"vs {check['pruned']['objective']} ({check['pruned']['candidates']} candidates), "
+                      f"delta {check['objective_delta']}")
+
+        if res.get("memory"):
+            print_memory(res["memory"])
+
+    if report.get("catalog_memory"):
+        print(f"\n📊 {FOODS_COMPLETE_CSV.name}")
+        print_memory(report["catalog_memory"])
+
+
+def print_memory(mem: Dict):
+    print(f"   💾 food table: {mem['dataframe_mb']} MB as DataFrame, "
+          f"{mem['compact_mb']} MB compact ({mem['ratio']:.0%})")
+    for col, size in mem["dataframe"].items():
+        compact = mem["compact"].get(col)
+        compact = f"{compact / 2 ** 20:.2f}" if compact is not None else "-"
+        print(f"      {col:<20}{size / 2 ** 20:>10.2f}{compact:>10}")
+
+
+def main(
+    sizes: Optional[List[str]] = None,
+    repeats: int = 3,
+    weekly_days: int = 7,
+    output: Optional[str] = None,
+    compare: Optional[str] = None,
+    threshold: float = 0.10,
+) -> int:
+    """Run, save and optionally compare; returns a process exit code"""
+    print("⏱️ Running optimizer benchmarks...")
+    report = run_benchmarks(sizes, repeats=repeats, weekly_days=weekly_days)
+    print_results(report)
+
+    out_path = Path(output) if output else DEFAULT_OUTPUT
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {out_path}")
+
+    if compare:
+        with open(compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, threshold=threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {threshold:.0%}:")
+            for r in regressions:
+                print(f"   {r['n_foods']:>8,} {r['stage']:<22} {r['metric']:<9} "
+                      f"{r['baseline']} -> {r['current']} (+{r['change']:.1%})")
+            return 1
+        print(f"\n✅ No regressions over {threshold:.0%} against {compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,353 @@
+"""
+Plan quality vs latency across planner configurations
+
+Runs a fixed corpus of seeded profiles through each planner configuration
+offline, against a synthetic catalog or a snapshot CSV. It records plan
+quality (objective, per-macro deviation from the day targets,
+INFEASIBLE/EMPTY_POOL/... slot rates) and wall time, then marks the
+configurations on the Pareto front:
+
+    python main.py eval --sizes 10k --profiles 30
+    python main.py eval --foods data_output/foods_complete_with_portions.csv \\
+        --configs exact:250 exact:100 fast:250 joint:60
+
+A configuration is "strategy[:pool size[:backend]]":
+
+- exact: build_day, meals solved one after another with the MILP
+  (solve_one_meal on `backend`, default LP_SOLVER_BACKEND)
+- fast: build_day with the heuristic
+- joint: one MILP over all meals of the day (evaluation only)
+
+The first configuration is the baseline the others are compared with.
+"""
+import json
+import platform
+import random
+import re
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pulp import LpMinimize, LpProblem, LpStatus, lpSum, value
+
+from benchmarks.loadtest import sample_profile
+from src.config import DATA_INTERMEDIATE_DIR, LP_SOLVER_BACKEND, LP_SOLVER_TIMEOUT, MAX_CANDIDATES_PER_MEAL
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.lp_day_solver import (
+    MEAL_CONFIG, NUTRIENTS, _add_meal_terms, _extract_items, _finish_plan, _slot_macro,
+    build_day, make_solver, meal_objective, precheck_meal,
+)
+from src.pipelines.synthetic_catalog import generate_catalog, parse_size
+from src.profile.profile_builder import build_profile_targets
+
+DEFAULT_OUTPUT = DATA_INTERMEDIATE_DIR / "planner_eval.json"
+DEFAULT_SIZE = "10k"
+DEFAULT_PROFILES = 30
+DEFAULT_CONFIGS = ["exact:250", "exact:120", "exact:60", "fast:250", "fast:120", "joint:60"]
+STRATEGIES = ("exact", "fast", "joint")
+TARGET_KEYS = {"calories": "calories", "protein": "protein_g", "fat": "fat_g",
+               "carbs": "carbs_g", "fiber": "fiber_g"}
+
+# "⚠️ lunch: INFEASIBLE" (a slot left empty); other warnings carry more text
+_FAILED = re.compile(r"^⚠️ (\w+): ([A-Z_]+)$")
+
+
+# ---------------------------
+# configurations + corpus
+# ---------------------------
+
+def parse_config(text: str) -> Dict:
+    """'exact:120:HiGHS_CMD' -> {"name", "strategy", "max_candidates", "backend"}"""
+    strategy, _, rest = text.partition(":")
+    size, _, backend = rest.partition(":")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}' (choose from {', '.join(STRATEGIES)})")
+    return {
+        "name": text,
+        "strategy": strategy,
+        "max_candidates": int(size) if size else MAX_CANDIDATES_PER_MEAL,
+        "backend": backend or None,
+    }
+
+
+def default_configs() -> List[str]:
+    """DEFAULT_CONFIGS plus the baseline pool on every other installed PuLP solver"""
+    import pulp
+
+    others = [s for s in pulp.listSolvers(onlyAvailable=True) if s != LP_SOLVER_BACKEND]
+    return DEFAULT_CONFIGS + [f"exact:{MAX_CANDIDATES_PER_MEAL}:{s}" for s in others]
+
+
+def sample_corpus(n: int, seed: int = 0) -> List[Dict]:
+    """n user profiles (inputs + targets) drawn like the load test's"""
+    rng = random.Random(seed)
+    return [build_profile_targets(**sample_profile(rng), save=False) for _ in range(n)]
+
+
+def load_catalog(size: Optional[str] = None, foods: Optional[str] = None, seed: int = 0) -> PreparedCatalog:
+    if foods:
+        return PreparedCatalog(pd.read_csv(foods))
+    return PreparedCatalog(generate_catalog(parse_size(size or DEFAULT_SIZE), seed=seed))
+
+
+# ---------------------------
+# planners
+# ---------------------------
+
+def build_day_joint(
+    catalog: PreparedCatalog,
+    targets: Dict,
+    allergies=None,
+    conditions=None,
+    max_candidates: Optional[int] = None,
+    backend: Optional[str] = None,
+    time_limit: Optional[float] = None,
+) -> Dict:
+    """
+    All MEAL_CONFIG slots as one MILP: the sum of the meal objectives, each
+    food in at most one meal (build_day gets the same from used_ids)
+
+    No relaxation ladder; `time_limit` covers the whole day (default
+    LP_SOLVER_TIMEOUT per slot).
+    """
+    allowed = catalog.user_mask(allergies or [], conditions or [])
+    total_cal = float(targets["calories"])
+    plan = {"meals": {}, "totals": {}, "warnings": []}
+    prob = LpProblem("day", LpMinimize)
+    meals, objectives, uses = {}, [], defaultdict(list)
+
+    for slot, (cal_frac, min_i, max_i, pool_name) in MEAL_CONFIG.items():
+        meal_cal, macro = total_cal * cal_frac, _slot_macro(targets, cal_frac)
+        pool = catalog.pool(pool_name, allowed, max_candidates=max_candidates)
+        reason = precheck_meal(pool, meal_cal, macro, min_i, max_i)
+        if reason is not None:
+            plan["meals"][slot] = []
+            plan["warnings"].append(f"⚠️ {slot}: {reason}")
+            continue
+        # one candidate per food (no lead multiplicity), so each food has its own y
+        pool = pool.drop(columns="lead", errors="ignore")
+        x, y, rows, objective = _add_meal_terms(prob, pool, meal_cal, macro, max_i, min_i, prefix=f"{slot}_")
+        meals[slot] = (x, rows)
+        objectives.append(objective)
+        for i, food_id in enumerate(rows["food_id"].astype(str)):
+            uses[food_id].append(y[i])
+
+    for ys in uses.values():
+        if len(ys) > 1:
+            prob += lpSum(ys) <= 1
+    prob += lpSum(objectives)
+
+    status = "EMPTY_POOL"
+    if meals:
+        prob.solve(make_solver(backend, time_limit or LP_SOLVER_TIMEOUT * len(MEAL_CONFIG)))
+        status = LpStatus[prob.status]
+    for slot, (x, rows) in meals.items():
+        items = _extract_items(rows, [value(x[i]) for i in range(len(rows))]) if status == "Optimal" else []
+        plan["meals"][slot] = items
+        if not items:
+            plan["warnings"].append(f"⚠️ {slot}: {'TIMEOUT' if status == 'Not Solved' else 'INFEASIBLE'}")
+
+    objective = float(value(prob.objective) or 0.0) if status == "Optimal" else 0.0
+    return _finish_plan(plan, {"objective": objective}, "exact", False)
+
+
+def run_config(config: Dict, catalog: PreparedCatalog, corpus: List[Dict]) -> List[Dict]:
+    """Plan every corpus profile with one configuration; one record per day"""
+    records = []
+    for profile in corpus:
+        targets, inputs = profile["targets"], profile["inputs"]
+        t0 = time.perf_counter()
+        if config["strategy"] == "joint":
+            plan = build_day_joint(catalog, targets, inputs["allergies"], inputs["conditions"],
+                                   max_candidates=config["max_candidates"], backend=config["backend"])
+        else:
+            plan = build_day(catalog, targets, inputs["allergies"], inputs["conditions"],
+                             max_candidates=config["max_candidates"], mode=config["strategy"],
+                             backend=config["backend"])
+        records.append(score_plan(plan, targets, time.perf_counter() - t0))
+    return records
+
+
+# ---------------------------
+# scoring
+# ---------------------------
+
+def score_plan(plan: Dict, targets: Dict, wall_s: float) -> Dict:
+    """
+    Objective, relative macro deviations and slot outcomes of one day
+
+    The objective is recomputed with meal_objective for every slot against
+    its share of the targets, so all strategies are scored the same way
+    (an empty slot counts with zero totals).
+    """
+    total_cal = float(targets["calories"])
+    objective = 0.0
+    for slot, (cal_frac, _, _, _) in MEAL_CONFIG.items():
+        items = plan["meals"].get(slot) or []
+        totals = [sum(float(it.get(n, 0.0)) for it in items) for n in NUTRIENTS]
+        objective += float(meal_objective(totals, total_cal * cal_frac, _slot_macro(targets, cal_frac)))
+
+    deviation = {}
+    for n, key in TARGET_KEYS.items():
+        target = float(targets[key])
+        deviation[n] = abs(plan["totals"].get(n, 0.0) - target) / target if target else 0.0
+
+    statuses = Counter()
+    for warning in plan["warnings"]:
+        m = _FAILED.match(warning)
+        if m:
+            statuses[m.group(2)] += 1
+        elif "solved with relaxation" in warning:
+            statuses["RELAXED"] += 1
+        elif "TIME_LIMIT" in warning:
+            statuses["TIME_LIMIT"] += 1
+
+    return {"objective": objective, "deviation": deviation, "statuses": dict(statuses), "wall_s": wall_s}
+
+
+def _p95(values: List[float]) -> float:
+    return float(np.percentile(values, 95)) if values else 0.0
+
+
+def summarize(config: Dict, records: List[Dict]) -> Dict:
+    n_slots = len(records) * len(MEAL_CONFIG)
+    statuses = Counter()
+    for r in records:
+        statuses.update(r["statuses"])
+    failed = sum(c for s, c in statuses.items() if s not in ("RELAXED", "TIME_LIMIT"))
+    objectives = [r["objective"] for r in records]
+    walls = [r["wall_s"] for r in records]
+
+    return {
+        "config": config,
+        "days": len(records),
+        "objective": {
+            "mean": round(statistics.fmean(objectives), 3),
+            "median": round(statistics.median(objectives), 3),
+            "p95": round(_p95(objectives), 3),
+        },
+        "deviation_pct": {
+            n: round(100 * statistics.fmean(r["deviation"][n] for r in records), 2) for n in TARGET_KEYS
+        },
+        "slot_rates": {s: round(c / n_slots, 4) for s, c in sorted(statuses.items())},
+        "failed_slot_rate": round(failed / n_slots, 4),
+        "wall_s": {
+            "mean": round(statistics.fmean(walls), 4),
+            "p50": round(statistics.median(walls), 4),
+            "p95": round(_p95(walls), 4),
+            "max": round(max(walls), 4),
+        },
+    }
+
+
+# Lower is better on every axis
+PARETO_AXES = (("objective", "mean"), ("wall_s", "p95"), ("failed_slot_rate", None))
+
+
+def _axes(summary: Dict) -> List[float]:
+    return [summary[k] if sub is None else summary[k][sub] for k, sub in PARETO_AXES]
+
+
+def mark_pareto(summaries: List[Dict]):
+    """Set "pareto" and "dominated_by" on each summary, and the change against the first (baseline)"""
+    for s in summaries:
+        a = _axes(s)
+        s["dominated_by"] = [
+            o["config"]["name"] for o in summaries
+            if o is not s and all(x <= y for x, y in zip(_axes(o), a)) and _axes(o) != a
+        ]
+        s["pareto"] = not s["dominated_by"]
+
+    base = summaries[0]
+    for s in summaries:
+        s["vs_baseline"] = {
+            "objective": round((s["objective"]["mean"] - base["objective"]["mean"])
+                               / max(base["objective"]["mean"], 1e-9), 4),
+            "wall_p95": round(s["wall_s"]["p95"] / max(base["wall_s"]["p95"], 1e-9), 3),
+        }
+
+
+# ---------------------------
+# driver
+# ---------------------------
+
+def run_eval(
+    configs: Optional[List[str]] = None,
+    size: Optional[str] = None,
+    foods: Optional[str] = None,
+    n_profiles: int = DEFAULT_PROFILES,
+    seed: int = 0,
+) -> Dict:
+    import pulp
+
+    configs = [parse_config(c) for c in (configs or default_configs())]
+    catalog = load_catalog(size, foods, seed)
+    corpus = sample_corpus(n_profiles, seed)
+
+    summaries = []
+    for config in configs:
+        print(f"  ▶️ {config['name']} ({len(corpus)} profiles, {len(catalog):,} foods)...")
+        summaries.append(summarize(config, run_config(config, catalog, corpus)))
+    mark_pareto(summaries)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pulp": pulp.__version__,
+            "catalog": foods or f"synthetic {len(catalog)}",
+            "n_foods": len(catalog),
+            "profiles": n_profiles,
+            "seed": seed,
+            "lp_solver_timeout": LP_SOLVER_TIMEOUT,
+        },
+        "results": summaries,
+    }
+
+
+def print_report(report: Dict):
+    meta = report["meta"]
+    print(f"\n📊 {meta['profiles']} profiles on {meta['catalog']}")
+    print(f"   {'config':<28}{'objective':>10}{'cal %':>8}{'pro %':>8}{'fat %':>8}{'carb %':>8}"
+          f"{'fib %':>8}{'failed':>8}{'p50 (s)':>9}{'p95 (s)':>9}  pareto")
+    for s in report["results"]:
+        dev = s["deviation_pct"]
+        print(f"   {s['config']['name']:<28}{s['objective']['mean']:>10.1f}{dev['calories']:>8.1f}"
+              f"{dev['protein']:>8.1f}{dev['fat']:>8.1f}{dev['carbs']:>8.1f}{dev['fiber']:>8.1f}"
+              f"{s['failed_slot_rate']:>8.1%}{s['wall_s']['p50']:>9.3f}{s['wall_s']['p95']:>9.3f}"
+              f"  {'⭐' if s['pareto'] else ''}")
+        rates = ", ".join(f"{k} {v:.1%}" for k, v in s["slot_rates"].items())
+        if rates:
+            print(f"   {'':<28}{rates}")
+
+
+def main(
+    configs: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None,
+    foods: Optional[str] = None,
+    n_profiles: int = DEFAULT_PROFILES,
+    seed: int = 0,
+    output: Optional[str] = None,
+) -> int:
+    """Run, print and save; returns a process exit code"""
+    print("⚖️ Evaluating planner configurations...")
+    report = run_eval(configs, size=(sizes or [DEFAULT_SIZE])[0], foods=foods,
+                      n_profiles=n_profiles, seed=seed)
+    print_report(report)
+
+    out_path = Path(output) if output else DEFAULT_OUTPUT
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
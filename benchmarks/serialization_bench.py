@@ -0,0 +1,137 @@
+"""
+Response encoding benchmark
+
+Encode time and bytes on the wire for the two largest responses, a 14-day
+weekly plan and a 10k-food /api/v1/foods page, with every installed
+encoder, raw and compressed:
+
+    python main.py bench-encoding --output encoding.json
+
+"fastapi" is FastAPI's default for a returned dict (jsonable_encoder, then
+JSONResponse's json.dumps); the others are the encoders of
+src/api/serialization.py.
+"""
+import gzip
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from src.api import serialization
+from src.config import DATA_INTERMEDIATE_DIR
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.engine import build_weekly_plan
+from src.pipelines.synthetic_catalog import generate_catalog
+
+DEFAULT_OUTPUT = DATA_INTERMEDIATE_DIR / "bench_encoding.json"
+PLAN_DAYS = 14
+FOODS_PAGE = 10_000
+
+PROFILE = {
+    "inputs": {"age": 30, "gender": "male", "allergies": [], "conditions": []},
+    "targets": {"calories": 2500.0, "protein_g": 105.0, "fat_g": 77.8, "carbs_g": 345.0, "fiber_g": 30.0},
+}
+
+
+def sample_payloads(seed: int = 0) -> Dict[str, Dict]:
+    """The weekly plan and foods page responses, as the API builds them"""
+    catalog = PreparedCatalog(generate_catalog(max(FOODS_PAGE, 20_000), seed=seed))
+    weekly = build_weekly_plan(PROFILE, catalog, days=PLAN_DAYS, mode="fast")
+    table = catalog.table
+    foods = table.frame(table.search(None, FOODS_PAGE), name_norm=False).to_dict(orient="records")
+    return {
+        f"weekly_plan_{PLAN_DAYS}d": {"status": "success", "catalog_version": 1,
+                                      "profile": PROFILE, "weekly_plan": weekly},
+        f"foods_{FOODS_PAGE // 1000}k": {"status": "success", "count": len(foods), "total_foods": len(catalog),
+                                         "catalog_version": 1, "search": None, "foods": foods},
+    }
+
+
+def _fastapi_default(obj) -> bytes:
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encoders() -> Dict[str, Callable]:
+    json_name = "json" if serialization.orjson is None else "orjson"
+    found = {"fastapi": _fastapi_default, json_name: serialization.dumps_json}
+    if serialization.msgpack is not None:
+        found["msgpack"] = serialization.dumps_msgpack
+    return found
+
+
+def compressors() -> Dict[str, Callable]:
+    found = {"gzip": lambda b: gzip.compress(b, compresslevel=serialization.GZIP_LEVEL)}
+    if serialization.brotli is not None:
+        found["br"] = lambda b: serialization.brotli.compress(b, quality=serialization.BROTLI_QUALITY)
+    return found
+
+
+def _time(fn: Callable, repeats: int):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, statistics.median(times)
+
+
+def bench_payload(payload: Dict, repeats: int = 5) -> Dict:
+    results = {}
+    for enc_name, enc in encoders().items():
+        body, enc_s = _time(lambda: enc(payload), repeats)
+        results[enc_name] = {"encode_ms": round(enc_s * 1e3, 2), "bytes": len(body)}
+        for comp_name, comp in compressors().items():
+            packed, comp_s = _time(lambda: comp(body), repeats)
+            results[f"{enc_name}+{comp_name}"] = {
+                "encode_ms": round((enc_s + comp_s) * 1e3, 2),
+                "bytes": len(packed),
+            }
+    return results
+
+
+def run_benchmarks(repeats: int = 5, seed: int = 0) -> Dict:
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orjson": getattr(serialization.orjson, "__version__", None),
+            "msgpack": ".".join(map(str, serialization.msgpack.version)) if serialization.msgpack else None,
+            "brotli": getattr(serialization.brotli, "__version__", None),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "results": {name: bench_payload(p, repeats) for name, p in sample_payloads(seed).items()},
+    }
+
+
+def print_results(report: Dict):
+    for name, res in report["results"].items():
+        base = res["fastapi"]
+        print(f"\n📦 {name}")
+        print(f"   {'encoding':<18}{'encode (ms)':>12}{'bytes':>12}{'vs fastapi':>12}")
+        for enc, r in res.items():
+            print(f"   {enc:<18}{r['encode_ms']:>12.2f}{r['bytes']:>12,}{r['bytes'] / base['bytes']:>12.0%}")
+
+
+def main(output: Optional[str] = None, repeats: int = 5, seed: int = 0) -> int:
+    print("⏱️ Running encoding benchmarks...")
+    report = run_benchmarks(repeats=repeats, seed=seed)
+    print_results(report)
+
+    out_path = Path(output) if output else DEFAULT_OUTPUT
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,6 @@ Main entry point for AI Nutrition Recommendation System
 """
 import argparse
 import sys
-import uvicorn
 from pathlib import Path
 
 # Add src to path
@@ -12,6 +11,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 def run_api(host="0.0.0.0", port=8000, reload=True):
     """Run the FastAPI application"""
+    import uvicorn
     uvicorn.run(
         "src.api.main:app",
         host=host,
@@ -44,7 +44,8 @@ def main():
     
     parser.add_argument(
         "command",
-        choices=["api", "pipeline", "test"],
+        choices=["api", "pipeline", "test", "bench", "loadtest", "broker", "worker", "plan-batch", "eval", "bench-encoding",
+                 "plan-library"],
         help="Command to run"
     )
     
@@ -73,6 +74,170 @@ def main():
         help="Pipeline steps to run (e.g., step1 step2)"
     )
     
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        help="Benchmark catalog sizes (e.g., 1k 10k 100k 300k)"
+    )
+    
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Benchmark repetitions per stage (default: 3)"
+    )
+    
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=7,
+        help="Number of days for weekly plans (default: 7)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        help="Output file for benchmark results (plan-batch: output directory, plan-library: library file)"
+    )
+    
+    parser.add_argument(
+        "--compare",
+        help="Previous benchmark results to compare against"
+    )
+    
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Regression threshold as a fraction (default: 0.10)"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Load test: simultaneous clients (default: 16)"
+    )
+    
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        help="Load test: duration in seconds (default: 30)"
+    )
+    
+    parser.add_argument(
+        "--requests",
+        type=int,
+        help="Load test: stop after this many requests instead of --duration"
+    )
+    
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        help="Load test: request mix weights (e.g., targets=5 daily=3 weekly=1 foods=1)"
+    )
+    
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Load test: start a local API server for the run"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Load test: uvicorn workers for the spawned server (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--broker",
+        help="Broker/worker: broker address host:port (default: SOLVER_BROKER)"
+    )
+    
+    parser.add_argument(
+        "--input",
+        help="Plan batch / plan library: profiles CSV (age, gender, height_cm, weight_kg, ...)"
+    )
+    
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Plan batch / plan library: worker processes (default: CPU count)"
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Plan batch: profiles per chunk and checkpoint (default: 500)"
+    )
+    
+    parser.add_argument(
+        "--mode",
+        choices=["exact", "fast"],
+        default="exact",
+        help="Plan batch: solver mode (default: exact)"
+    )
+    
+    parser.add_argument(
+        "--deadline-s",
+        type=float,
+        help="Plan batch: latency budget per user in seconds (default: PLAN_DEADLINE_S); plan library: per bucket"
+    )
+    
+    parser.add_argument(
+        "--format",
+        choices=["auto", "parquet", "csv"],
+        default="auto",
+        help="Plan batch: part file format (default: parquet if available, else csv)"
+    )
+    
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Plan batch: ignore an existing checkpoint and start over"
+    )
+    
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        help="Eval: planner configs strategy[:pool[:backend]] (e.g., exact:250 fast:120 joint:60)"
+    )
+    
+    parser.add_argument(
+        "--profiles",
+        type=int,
+        default=30,
+        help="Eval: seeded profiles in the corpus (default: 30)"
+    )
+    
+    parser.add_argument(
+        "--foods",
+        help="Eval: food catalog CSV snapshot (default: synthetic catalog of the first --sizes); "
+             "plan library: catalog CSV (default: the food database)"
+    )
+    
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Plan library: most frequent target buckets to solve (default: all)"
+    )
+    
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=1,
+        help="Plan library: profiles a bucket needs to be solved (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for sampled profiles (default: 0)"
+    )
+    
     args = parser.parse_args()
     
     if args.command == "api":
@@ -90,6 +255,105 @@ def main():
         print("🧪 Running tests...")
         # Run your tests here
         print("✅ Tests completed!")
+    
+    elif args.command == "bench":
+        from benchmarks.optimizer_bench import main as run_bench
+        sys.exit(run_bench(
+            sizes=args.sizes,
+            repeats=args.repeats,
+            weekly_days=args.days,
+            output=args.output,
+            compare=args.compare,
+            threshold=args.threshold,
+        ))
+    
+    elif args.command == "loadtest":
+        from benchmarks.loadtest import main as run_loadtest
+        sys.exit(run_loadtest(
+            host=args.host,
+            port=args.port,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            total_requests=args.requests,
+            mix=args.mix,
+            weekly_days=args.days,
+            spawn=args.spawn,
+            workers=args.workers,
+            output=args.output,
+            seed=args.seed,
+        ))
+    
+    elif args.command == "broker":
+        from src.config import SOLVER_BROKER, SOLVER_BROKER_AUTHKEY
+        from src.workers.transport import serve_broker
+        address = args.broker or SOLVER_BROKER
+        print(f"📮 Solver job broker on {address}")
+        serve_broker(address, SOLVER_BROKER_AUTHKEY)
+    
+    elif args.command == "worker":
+        import logging
+        from src.config import SOLVER_BROKER, SOLVER_BROKER_AUTHKEY
+        from src.workers.transport import TcpTransport
+        from src.workers.worker import run_worker
+        logging.basicConfig(level=logging.INFO)
+        address = args.broker or SOLVER_BROKER
+        print(f"🔧 Solver worker connecting to {address}")
+        run_worker(TcpTransport(address, SOLVER_BROKER_AUTHKEY))
+    
+    elif args.command == "bench-encoding":
+        from benchmarks.serialization_bench import main as run_encoding_bench
+        sys.exit(run_encoding_bench(output=args.output, repeats=args.repeats, seed=args.seed))
+    
+    elif args.command == "eval":
+        from benchmarks.planner_eval import main as run_eval
+        sys.exit(run_eval(
+            configs=args.configs,
+            sizes=args.sizes,
+            foods=args.foods,
+            n_profiles=args.profiles,
+            seed=args.seed,
+            output=args.output,
+        ))
+    
+    elif args.command == "plan-batch":
+        import logging
+        from src.pipelines.batch_planner import DEFAULT_OUTPUT, run_batch
+        if not args.input:
+            parser.error("plan-batch needs --input")
+        logging.basicConfig(level=logging.INFO)
+        output = args.output or DEFAULT_OUTPUT
+        print(f"🗂️ Planning {args.input} ({args.days} days) -> {output}")
+        state = run_batch(
+            args.input,
+            output,
+            days=args.days,
+            processes=args.processes,
+            chunk_size=args.chunk_size,
+            mode=args.mode,
+            deadline_s=args.deadline_s,
+            fmt=args.format,
+            fresh=args.fresh,
+        )
+        print(f"✅ {state['users_done'] - state['errors']} users planned, {state['errors']} errors")
+    
+    elif args.command == "plan-library":
+        import logging
+        from src.pipelines.plan_library_builder import build_library
+        if not args.input:
+            parser.error("plan-library needs --input")
+        logging.basicConfig(level=logging.INFO)
+        print(f"📚 Building the plan library from {args.input}")
+        meta = build_library(
+            args.input,
+            args.output,
+            top=args.top,
+            min_count=args.min_count,
+            processes=args.processes,
+            deadline_s=args.deadline_s,
+            foods_path=args.foods,
+        )
+        print(f"✅ {meta['buckets']} buckets, {meta['meals']} meals, "
+              f"{meta['coverage']:.0%} of profiles covered")
 
 
 if __name__ == "__main__":
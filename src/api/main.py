@@ -1,18 +1,38 @@
 """
 Complete FastAPI Application for AI Nutrition Recommendation System
+
+The planner stack (pandas, NumPy, PuLP) is imported by the catalog load in
+a background thread, not at module import, so the server binds and answers
+liveness checks right away; routes that need the catalog return 503 until
+/api/v1/ready does.
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
-import pandas as pd
 from datetime import date, datetime
+import hmac
 import json
 import logging
+import threading
+import time
 
-from src.config import DATA_OUT, FOODS_COMPLETE_CSV, USER_TARGETS_JSON, MEAL_PLAN_JSON
-from src.optimizer.engine import build_profile, build_day, build_weekly_plan
+from src.config import (
+    DATA_OUT, FOODS_COMPLETE_CSV, FOODS_CLUSTERS_NPZ, USER_TARGETS_JSON, MEAL_PLAN_JSON, MEAL_PLAN_CSV,
+    METRICS_TIMING_HEADER,
+    ADMIN_TOKEN, LOG_DIR, PLAN_DEADLINE_S, CATALOG_WATCH_INTERVAL_S,
+    SOLVER_TRANSPORT, SOLVER_WORKERS, SOLVER_BROKER, SOLVER_BROKER_AUTHKEY, SOLVER_JOB_TIMEOUT_S,
+    UPLOAD_CONCURRENCY, SWEEP_MAX_POINTS, FOOD_CATALOGS, DEFAULT_CATALOG_ID, CATALOG_MEMORY_BUDGET_MB,
+)
+from src.profile.profile_builder import build_profile_targets as build_profile
+from src.catalog_manager import CatalogManager, CatalogSnapshot, sample_foods
+from src.catalog_registry import CatalogRegistry, UnknownCatalog
+from src.metrics import (
+    REGISTRY, HTTP_SECONDS, stage, start_request_timings, server_timing_header,
+)
+from src.profiling import profile_call, ProfilerBusy
+from src.api.serialization import negotiated, write_json
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -33,34 +53,146 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load food database on startup
-foods_db = None
 
-@app.on_event("startup")
-async def load_food_database():
-    global foods_db
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency and optionally echo per-stage planner timings"""
+    timings = start_request_timings()
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - t0
+
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(
+        elapsed,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+
+    if timings and (METRICS_TIMING_HEADER or request.headers.get("x-debug-timings") == "1"):
+        response.headers["Server-Timing"] = server_timing_header(
+            {**timings, "total": elapsed}
+        )
+    return response
+
+
+# Versioned food catalog; requests take one snapshot and use it throughout
+catalog_manager = CatalogManager(FOODS_COMPLETE_CSV, FOODS_CLUSTERS_NPZ, fallback=sample_foods)
+# Regional catalogs (?catalog_id=), loaded on first use under a memory budget
+catalog_registry = CatalogRegistry(FOOD_CATALOGS, CATALOG_MEMORY_BUDGET_MB)
+
+
+# Seconds since the startup event per startup phase (logged, and on /api/v1/ready)
+startup_timings: Dict[str, float] = {}
+
+
+def load_food_database(t0: float):
+    """Background startup: import the planner, build the catalog, start the watcher"""
     try:
-        if FOODS_COMPLETE_CSV.exists():
-            foods_db = pd.read_csv(FOODS_COMPLETE_CSV)
-            logger.info(f"✅ Loaded {len(foods_db)} foods from database")
-        else:
-            logger.warning(f"⚠️ Food database not found at {FOODS_COMPLETE_CSV}")
-            # Create a minimal sample database for testing
-            foods_db = pd.DataFrame({
-                'food_id': range(100),
-                'food_name': [f'Sample Food {i}' for i in range(100)],
-                'calories': [i * 10 for i in range(100)],
-                'protein': [i * 0.5 for i in range(100)],
-                'fat': [i * 0.3 for i in range(100)],
-                'carbs': [i * 0.8 for i in range(100)],
-                'fiber': [i * 0.1 for i in range(100)],
-                'grams_per_portion': [100] * 100,
-                'portion_unit': ['portion'] * 100,
-            })
-            logger.info("Created sample food database for testing")
+        t = time.perf_counter()
+        import src.optimizer.engine  # noqa: F401  (pandas, NumPy, PuLP)
+        startup_timings["import_planner"] = time.perf_counter() - t
+
+        snapshot = catalog_manager.reload("startup")
+        startup_timings.update(snapshot.timings)
+        if snapshot.catalog is not None:
+            summary = snapshot.catalog.pruning_summary().values()
+            kept = sum(s["non_dominated"] for s in summary)
+            total = sum(s["foods"] for s in summary)
+            logger.info(f"✅ Prepared catalog: {kept}/{total} slot foods after dominance pruning")
     except Exception as e:
         logger.error(f"❌ Error loading food database: {e}")
-        foods_db = pd.DataFrame()
+    startup_timings["total"] = time.perf_counter() - t0
+    logger.info("🚀 Startup: " + ", ".join(f"{k} {v:.2f}s" for k, v in startup_timings.items()))
+    catalog_manager.start_watching(CATALOG_WATCH_INTERVAL_S)
+
+
+# Solver worker tier (SOLVER_TRANSPORT); None solves in this process
+solver_client = None
+local_workers: List = []
+
+
+def start_solver_tier():
+    """Connect to (or spawn) the solver workers; falls back to in-process solving"""
+    global solver_client, local_workers
+    if not SOLVER_TRANSPORT:
+        return
+    from src.workers.client import SolverClient
+    from src.workers.transport import LocalTransport, TcpTransport
+    from src.workers.worker import spawn_local_workers
+
+    try:
+        if SOLVER_TRANSPORT == "local":
+            transport = LocalTransport()
+            local_workers = spawn_local_workers(SOLVER_WORKERS, transport)
+            where = f"{SOLVER_WORKERS} local worker processes"
+        elif SOLVER_TRANSPORT == "tcp":
+            transport = TcpTransport(SOLVER_BROKER, SOLVER_BROKER_AUTHKEY)
+            where = f"broker {SOLVER_BROKER}"
+        else:
+            raise ValueError(f"Unknown SOLVER_TRANSPORT: {SOLVER_TRANSPORT}")
+        solver_client = SolverClient(transport).start()
+        logger.info(f"✅ Plan requests are solved by {where}")
+    except Exception as e:
+        logger.error(f"❌ Solver worker tier unavailable, solving in-process: {e}")
+
+
+@app.on_event("startup")
+async def start_catalog_loading():
+    threading.Thread(target=load_food_database, args=(time.perf_counter(),),
+                     daemon=True, name="catalog-startup").start()
+    # connecting to a broker can block; requests solve in-process until it is up
+    threading.Thread(target=start_solver_tier, daemon=True, name="solver-tier-startup").start()
+
+
+@app.on_event("shutdown")
+def stop_catalog_watcher():
+    catalog_manager.stop_watching()
+    if solver_client is None:
+        return
+    if local_workers:
+        from src.workers.worker import stop_local_workers
+        stop_local_workers(local_workers, solver_client.transport)
+    solver_client.close()
+
+
+def _require_catalog(catalog_id: Optional[str] = None) -> CatalogSnapshot:
+    if catalog_id and catalog_id != DEFAULT_CATALOG_ID:
+        return _require_regional_catalog(catalog_id)
+    snapshot = catalog_manager.current
+    if snapshot is None or not snapshot.ready:
+        if catalog_manager.state == "loading":
+            raise HTTPException(status_code=503, detail="Food database is loading, retry shortly",
+                                headers={"Retry-After": "5"})
+        raise HTTPException(
+            status_code=503,
+            detail="Food database not available. Please ensure the database is loaded."
+        )
+    return snapshot
+
+
+def _require_regional_catalog(catalog_id: str) -> CatalogSnapshot:
+    try:
+        snapshot = catalog_registry.get(catalog_id)
+    except UnknownCatalog:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog_id: {catalog_id}")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Catalog '{catalog_id}' could not be loaded: {e}")
+    if not snapshot.ready:
+        raise HTTPException(status_code=503, detail=f"Catalog '{catalog_id}' has no foods")
+    return snapshot
+
+
+# Regional food catalog query parameter (FOOD_CATALOGS)
+CATALOG_ID_QUERY = Query(None, description="Regional food catalog (FOOD_CATALOGS); default catalog when omitted")
+# Precomputed plan library (python main.py plan-library)
+LIBRARY_QUERY = Query(True, description="Serve precomputed library meals when they fit the targets")
+
+
+def _library_allowed(library: bool, catalog_id: Optional[str]) -> bool:
+    # the library is built on the default catalog
+    return library and (catalog_id or DEFAULT_CATALOG_ID) == DEFAULT_CATALOG_ID
 
 
 # Pydantic models
@@ -96,31 +228,137 @@ class WeeklyPlanRequest(BaseModel):
     days: int = Field(default=7, ge=1, le=14, description="Number of days to generate")
 
 
+class SweepRequest(BaseModel):
+    profile: UserProfile
+    calories_min: float = Field(..., ge=800, le=6000, description="First day calorie target")
+    calories_max: float = Field(..., ge=800, le=6000, description="Last day calorie target")
+    step: float = Field(default=100, gt=0, description="Calories between targets")
+
+
+class ReplanRequest(BaseModel):
+    profile: UserProfile
+    plan: Dict = Field(..., description="Previous daily plan (the 'plan' of generate_daily_plan)")
+    locked_slots: List[str] = Field(default_factory=list, description="Meal slots to keep, e.g. ['breakfast']")
+    locked_items: List[str] = Field(default_factory=list, description="food_ids to keep in their slot")
+
+
+class SubstituteRequest(BaseModel):
+    food_id: str = Field(..., description="food_id of the plan item to replace")
+    slot: str = Field(..., description="Meal slot, e.g. 'lunch' or 'snack1'")
+    portions: float = Field(default=1.0, ge=0.01, le=10, description="Portions of the item in the plan")
+    allergies: List[str] = Field(default_factory=list, description="Allergies: e.g., ['peanut', 'dairy']")
+    conditions: List[str] = Field(default_factory=list, description="Health conditions: e.g., ['diabetes']")
+    exclude_ids: List[str] = Field(default_factory=list, description="food_ids to skip (e.g. the rest of the plan)")
+    k: int = Field(default=5, ge=1, le=50, description="Number of substitutes")
+
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin features are disabled (ADMIN_TOKEN not set)")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _run_planner(fn, user_profile: Dict, snapshot: CatalogSnapshot, kind: Optional[str] = None,
+                 catalog_id: Optional[str] = None, profile: bool = False, profile_output: str = "response",
+                 admin_token: Optional[str] = None, **kwargs):
+    """
+    Run fn(user_profile, snapshot.catalog, **kwargs), optionally under the profiler
+
+    With a solver worker tier, calls with a job `kind` are sent to the
+    workers, which solve on their own copy of the catalog of `catalog_id`
+    (profiled calls always run here).
+
+    Returns (result, profiling, catalog_version): profiling is None, the
+    profiling report, or {"file": path} when profile_output="file" (written
+    to logs/); catalog_version is the version of the catalog actually used.
+    """
+    if not profile:
+        if kind is not None and solver_client is not None:
+            result = _solve_on_workers(kind, user_profile, catalog_id, **kwargs)
+            return result.value, None, result.catalog_version
+        return fn(user_profile, snapshot.catalog, **kwargs), None, snapshot.version
+
+    _require_admin(admin_token)
+    try:
+        result, report = profile_call(fn, user_profile, snapshot.catalog, **kwargs)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if profile_output == "file":
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = LOG_DIR / f"profile_{fn.__name__}_{datetime.now():%Y%m%d_%H%M%S_%f}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"📝 Wrote profile to {path}")
+        return result, {"file": str(path)}, snapshot.version
+    return result, report, snapshot.version
+
+
+def _solve_on_workers(kind: str, user_profile: Dict, catalog_id: Optional[str] = None, **kwargs):
+    """The worker's Result for a planning job"""
+    from src.workers.client import SolverTimeout, WorkerError
+
+    # the job may queue behind others: allow its own deadline on top
+    timeout_s = SOLVER_JOB_TIMEOUT_S + (kwargs.get("deadline_s") or 0)
+    try:
+        return solver_client.solve(kind, user_profile, timeout_s=timeout_s,
+                                   catalog_id=catalog_id or "", **kwargs)
+    except SolverTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except WorkerError as e:
+        raise HTTPException(status_code=500, detail=f"Solver worker failed: {e}")
+
+
 # API Endpoints
 
 @app.get("/")
 def root():
     """Health check endpoint"""
+    snapshot = catalog_manager.current
     return {
         "status": "running",
         "service": "AI Nutrition Recommendation System",
         "version": "1.0.0",
-        "foods_loaded": len(foods_db) if foods_db is not None else 0,
-        "database_ready": foods_db is not None and len(foods_db) > 0
+        "foods_loaded": snapshot.food_count if snapshot is not None else 0,
+        "database_ready": snapshot is not None and snapshot.ready,
+        "catalog_version": snapshot.version if snapshot is not None else None,
+    }
+
+
+@app.get("/api/v1/ready")
+def readiness_check():
+    """Readiness probe: 200 once the food catalog and its indexes are built, else 503"""
+    snapshot = catalog_manager.current
+    state = catalog_manager.state
+    body = {
+        "ready": state == "ready",
+        "state": state,
+        "catalog_version": snapshot.version if snapshot is not None else None,
+        "startup_s": {k: round(v, 3) for k, v in startup_timings.items()},
     }
+    if state != "ready":
+        body["error"] = catalog_manager.last_error
+        return JSONResponse(status_code=503, content=body)
+    return body
 
 
 @app.get("/api/v1/health")
 def health_check():
     """Detailed health check"""
+    snapshot = catalog_manager.current
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "database": {
-            "loaded": foods_db is not None,
-            "food_count": len(foods_db) if foods_db is not None else 0,
-            "path": str(FOODS_COMPLETE_CSV)
+            "loaded": snapshot is not None,
+            "food_count": snapshot.food_count if snapshot is not None else 0,
+            "path": str(FOODS_COMPLETE_CSV),
+            "catalog": snapshot.info() if snapshot is not None else None,
+            "stale": catalog_manager.is_stale(),
+            "last_reload_error": catalog_manager.last_error,
         },
+        "regional_catalogs": catalog_registry.status(),
         "directories": {
             "data_output": str(DATA_OUT),
             "exists": DATA_OUT.exists()
@@ -128,6 +366,26 @@ def health_check():
     }
 
 
+@app.get("/api/v1/catalogs")
+def list_catalogs():
+    """Configured food catalogs: the default one and the regional ones with their load state"""
+    snapshot = catalog_manager.current
+    return {
+        "default": {
+            "catalog_id": DEFAULT_CATALOG_ID,
+            "state": catalog_manager.state,
+            "catalog": snapshot.info() if snapshot is not None else None,
+        },
+        **catalog_registry.status(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text-format metrics (stage timings, solver outcomes, pool sizes)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/v1/calculate_targets")
 def calculate_targets(user: UserProfile):
     """
@@ -148,108 +406,433 @@ def calculate_targets(user: UserProfile):
 
 
 @app.post("/api/v1/generate_daily_plan")
-def generate_daily_plan(user: UserProfile):
+def generate_daily_plan(
+    user: UserProfile,
+    http_request: Request,
+    profile: bool = Query(False, description="Admin only: profile this request"),
+    profile_output: str = Query("response", pattern="^(response|file)$"),
+    deadline_s: Optional[float] = Query(None, gt=0, le=120, description="Latency budget in seconds"),
+    mode: str = Query("exact", pattern="^(exact|fast)$", description="exact (MILP) or fast (heuristic)"),
+    report_gap: bool = Query(False, description="Also solve the MILP and report the fast mode's objective gap"),
+    library: bool = LIBRARY_QUERY,
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+    x_admin_token: Optional[str] = Header(None),
+):
     """
     Generate a complete daily meal plan optimized for the user's targets
+
+    deadline_s (default PLAN_DEADLINE_S) bounds the total solve time; meals
+    whose solve hits its share return the best plan found with a warning.
+
+    mode=fast uses the heuristic solver (tens of ms); with report_gap=1 the
+    plan's "solver" section also has the exact MILP objective and the gap.
+
+    With ?profile=1 and a valid X-Admin-Token header the plan is built under
+    cProfile/tracemalloc and a "profiling" section is added to the response
+    (or written under logs/ with profile_output=file).
+
+    Meals of the precomputed plan library (PLAN_LIBRARY_PATH, default
+    catalog only) are served when they fit the targets; the plan's
+    "library" section lists them and the other meals are solved live.
     """
-    if foods_db is None or len(foods_db) == 0:
-        raise HTTPException(
-            status_code=503,
-            detail="Food database not available. Please ensure the database is loaded."
-        )
+    snapshot = _require_catalog(catalog_id)
+    from src.optimizer.engine import build_day
     
     try:
         # Build profile
-        profile = build_profile(**user.model_dump())
+        user_profile = build_profile(**user.model_dump())
         
         # Generate meal plan
-        plan = build_day(profile, foods_db)
+        plan, profiling, catalog_version = _run_planner(
+            build_day, user_profile, snapshot, kind="daily", catalog_id=catalog_id,
+            deadline_s=deadline_s or PLAN_DEADLINE_S, mode=mode, report_gap=report_gap,
+            use_library=_library_allowed(library, catalog_id),
+            profile=profile, profile_output=profile_output, admin_token=x_admin_token,
+        )
         
         # Save to file
         output_data = {
             "date": str(date.today()),
             "timestamp": datetime.now().isoformat(),
-            "profile": profile,
+            "profile": user_profile,
             "plan": plan
         }
         
-        with open(MEAL_PLAN_JSON, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        write_json(MEAL_PLAN_JSON, output_data)
+        # Same rows as `plan-batch` items, for one user
+        from src.pipelines.batch_planner import write_plan_csv
+        write_plan_csv(plan, MEAL_PLAN_CSV)
         
         logger.info(f"✅ Generated daily plan for user")
         
-        return {
+        response = {
             "status": "success",
             "date": str(date.today()),
-            "profile": profile,
+            "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+            "catalog_version": catalog_version,
+            "profile": user_profile,
             "plan": plan
         }
+        if profiling is not None:
+            response["profiling"] = profiling
+        return negotiated(http_request, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error generating daily plan: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/generate_weekly_plan")
-def generate_weekly_plan(request: WeeklyPlanRequest):
+def generate_weekly_plan(
+    request: WeeklyPlanRequest,
+    http_request: Request,
+    profile: bool = Query(False, description="Admin only: profile this request"),
+    profile_output: str = Query("response", pattern="^(response|file)$"),
+    deadline_s: Optional[float] = Query(None, gt=0, le=600, description="Latency budget in seconds"),
+    mode: str = Query("exact", pattern="^(exact|fast)$", description="exact (MILP) or fast (heuristic)"),
+    report_gap: bool = Query(False, description="Also solve the MILP and report the fast mode's objective gap"),
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+    x_admin_token: Optional[str] = Header(None),
+):
     """
     Generate a weekly meal plan (7 days by default)
+
+    deadline_s (default PLAN_DEADLINE_S) is shared by all days of the plan.
+
+    Supports the same admin-only ?profile=1 option as the daily plan.
     """
-    if foods_db is None or len(foods_db) == 0:
-        raise HTTPException(
-            status_code=503,
-            detail="Food database not available."
-        )
+    snapshot = _require_catalog(catalog_id)
+    from src.optimizer.engine import build_weekly_plan
     
     try:
         # Build profile
-        profile = build_profile(**request.profile.model_dump())
+        user_profile = build_profile(**request.profile.model_dump())
         
         # Generate weekly plan
-        weekly = build_weekly_plan(profile, foods_db, days=request.days)
+        weekly, profiling, catalog_version = _run_planner(
+            build_weekly_plan, user_profile, snapshot, kind="weekly", catalog_id=catalog_id,
+            days=request.days,
+            deadline_s=deadline_s or PLAN_DEADLINE_S, mode=mode, report_gap=report_gap,
+            profile=profile, profile_output=profile_output, admin_token=x_admin_token,
+        )
         
         logger.info(f"✅ Generated {request.days}-day plan")
         
-        return {
+        response = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
-            "profile": profile,
+            "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+            "catalog_version": catalog_version,
+            "profile": user_profile,
             "weekly_plan": weekly
         }
+        if profiling is not None:
+            response["profiling"] = profiling
+        return negotiated(http_request, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error generating weekly plan: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/replan")
+def replan_daily_plan(
+    request: ReplanRequest,
+    http_request: Request,
+    deadline_s: Optional[float] = Query(None, gt=0, le=120, description="Latency budget in seconds"),
+    mode: str = Query("exact", pattern="^(exact|fast)$", description="exact (MILP) or fast (heuristic)"),
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+):
+    """
+    Re-solve only the unlocked meals of an existing daily plan
+
+    Locked slots and items stay; their nutrients are subtracted from the
+    day's targets and the rest is split over the re-solved meals. In exact
+    mode the previous meals warm-start the solver.
+    """
+    snapshot = _require_catalog(catalog_id)
+    from src.optimizer.engine import replan_day
+    from src.optimizer.lp_day_solver import MEAL_CONFIG
+    unknown = [s for s in request.locked_slots if s not in MEAL_CONFIG]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown slot(s): {', '.join(unknown)}")
+    if not isinstance(request.plan.get("meals", request.plan), dict):
+        raise HTTPException(status_code=422, detail="plan must contain a 'meals' object")
+
+    try:
+        user_profile = build_profile(**request.profile.model_dump())
+        plan, _, catalog_version = _run_planner(
+            replan_day, user_profile, snapshot, kind="replan", catalog_id=catalog_id,
+            previous_plan=request.plan,
+            locked_slots=request.locked_slots, locked_items=request.locked_items,
+            deadline_s=deadline_s or PLAN_DEADLINE_S, mode=mode,
+        )
+        logger.info(f"✅ Re-planned {', '.join(plan['replanned']) or 'no'} slots")
+        return negotiated(http_request, {
+            "status": "success",
+            "date": str(date.today()),
+            "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+            "catalog_version": catalog_version,
+            "profile": user_profile,
+            "plan": plan
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error re-planning: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/plan_sweep")
+def plan_sweep(
+    request: SweepRequest,
+    http_request: Request,
+    deadline_s: Optional[float] = Query(None, gt=0, le=600, description="Latency budget in seconds"),
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+):
+    """
+    Daily plans for a range of calorie targets (calories_min to calories_max
+    in `step` kcal), to compare before picking one
+
+    Macro targets are recomputed for each calorie target from the profile.
+    The meal models are built once and only their targets change between
+    points; each solve is warm-started from the previous point. deadline_s
+    defaults to PLAN_DEADLINE_S per point.
+    """
+    if request.calories_max < request.calories_min:
+        raise HTTPException(status_code=422, detail="calories_max is below calories_min")
+    n_points = int((request.calories_max - request.calories_min) / request.step + 1e-9) + 1
+    if n_points > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=422,
+                            detail=f"{n_points} targets requested, at most {SWEEP_MAX_POINTS} per sweep")
+    calories = [request.calories_min + i * request.step for i in range(n_points)]
+
+    snapshot = _require_catalog(catalog_id)
+    from src.optimizer.engine import sweep_calories
+
+    try:
+        user_profile = build_profile(**request.profile.model_dump())
+        sweep, _, catalog_version = _run_planner(
+            sweep_calories, user_profile, snapshot, kind="sweep", catalog_id=catalog_id,
+            calories=calories, deadline_s=deadline_s or PLAN_DEADLINE_S * n_points,
+        )
+        logger.info(f"✅ Generated a {n_points}-point calorie sweep")
+        return negotiated(http_request, {
+            "status": "success",
+            "date": str(date.today()),
+            "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+            "catalog_version": catalog_version,
+            "profile": user_profile,
+            "sweep": sweep,
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error generating plan sweep: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/substitute")
+def substitute_food(request: SubstituteRequest, catalog_id: Optional[str] = CATALOG_ID_QUERY):
+    """
+    Suggest the k foods closest in macro profile to a plan item, with
+    portions rescaled to the same calories (no solver call)
+    """
+    snapshot = _require_catalog(catalog_id)
+    from src.optimizer.lp_day_solver import MEAL_CONFIG, MEAL_RULES
+    if request.slot not in MEAL_CONFIG and request.slot not in MEAL_RULES:
+        raise HTTPException(status_code=422, detail=f"Unknown slot: {request.slot}")
+
+    try:
+        with stage("substitute"):
+            item, substitutes = snapshot.catalog.substitutes(
+                request.food_id, request.slot, portions=request.portions,
+                allergies=request.allergies, conditions=request.conditions,
+                exclude_ids=request.exclude_ids, k=request.k,
+            )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown food_id: {request.food_id}")
+    except Exception as e:
+        logger.error(f"❌ Error finding substitutes: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    logger.info(f"✅ {len(substitutes)} substitutes for {request.food_id} ({request.slot})")
+    return {
+        "status": "success",
+        "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+        "catalog_version": snapshot.version,
+        "slot": request.slot,
+        "item": item,
+        "substitutes": substitutes,
+    }
+
+
+@app.post("/api/v1/upload/profiles")
+def upload_profiles(
+    file: UploadFile = File(..., description="CSV with UserProfile columns (+ optional user_id); "
+                                             "conditions/allergies are ';'-separated"),
+    output: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Response format"),
+    plans: bool = Query(False, description="Also generate a daily plan per row"),
+    deadline_s: Optional[float] = Query(None, gt=0, le=120, description="Latency budget per plan in seconds"),
+    mode: str = Query("exact", pattern="^(exact|fast)$", description="exact (MILP) or fast (heuristic)"),
+    library: bool = LIBRARY_QUERY,
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+):
+    """
+    Calculate targets (and with plans=1, daily plans) for a CSV of profiles
+
+    Rows are parsed and validated one at a time and processed
+    UPLOAD_CONCURRENCY at once (plans go to the solver workers when they are
+    configured). Results stream back in input order, one NDJSON line or CSV
+    row per input row; invalid or failing rows get status "error" and the
+    upload carries on.
+    """
+    from src.api.uploads import csv_lines, missing_columns, ndjson_lines, open_csv, ordered_map, parse_row
+
+    snapshot = _require_catalog(catalog_id) if plans else None
+    reader = open_csv(file.file)
+    missing = missing_columns(reader, UserProfile)
+    if missing:
+        raise HTTPException(status_code=422, detail=f"CSV is missing column(s): {', '.join(missing)}")
+    if plans:
+        from src.optimizer.engine import build_day
+
+    def process(item) -> Dict:
+        index, row = item
+        record = {"row": index, "user_id": row.get("user_id") or None}
+        try:
+            record["user_id"], user = parse_row(row, UserProfile)
+            user_profile = build_profile(**user.model_dump(), save=False)
+            record.update(status="ok", profile=user_profile)
+            if plans:
+                record["plan"], _, record["catalog_version"] = _run_planner(
+                    build_day, user_profile, snapshot, kind="daily", catalog_id=catalog_id,
+                    deadline_s=deadline_s or PLAN_DEADLINE_S, mode=mode,
+                    use_library=_library_allowed(library, catalog_id),
+                )
+        except HTTPException as e:
+            record.update(status="error", error=str(e.detail))
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        return record
+
+    def results():
+        ok = failed = 0
+        t0 = time.perf_counter()
+        workers = SOLVER_WORKERS if plans and solver_client is not None else UPLOAD_CONCURRENCY
+        for record in ordered_map(process, enumerate(reader, start=1), max(1, workers)):
+            if record["status"] == "ok":
+                ok += 1
+            else:
+                failed += 1
+            yield record
+        logger.info(f"✅ Processed profile upload: {ok} rows ok, {failed} errors "
+                    f"({time.perf_counter() - t0:.1f}s)")
+
+    extra = {"catalog_id": catalog_id or DEFAULT_CATALOG_ID} if snapshot is not None else {}
+    if output == "csv":
+        return StreamingResponse(csv_lines(results(), plans), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=profiles_results.csv"})
+    return StreamingResponse(ndjson_lines(dict(r, **extra) for r in results()),
+                             media_type="application/x-ndjson")
+
+
 @app.get("/api/v1/foods")
-def get_foods(limit: int = 100, search: Optional[str] = None):
+def get_foods(
+    http_request: Request,
+    limit: int = 100,
+    search: Optional[str] = None,
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+):
     """
     Get list of available foods in database
     """
-    if foods_db is None or len(foods_db) == 0:
-        raise HTTPException(status_code=503, detail="Food database not available")
+    snapshot = _require_catalog(catalog_id)
     
     try:
-        df = foods_db.copy()
-        
-        if search:
-            df = df[df['food_name'].str.contains(search, case=False, na=False)]
-        
-        df = df.head(limit)
+        table = snapshot.catalog.table
+        df = table.frame(table.search(search, limit), name_norm=False)
         
         foods_list = df.to_dict(orient='records')
         
-        return {
+        return negotiated(http_request, {
             "status": "success",
             "count": len(foods_list),
-            "total_foods": len(foods_db),
+            "total_foods": snapshot.food_count,
+            "catalog_id": catalog_id or DEFAULT_CATALOG_ID,
+            "catalog_version": snapshot.version,
             "search": search,
             "foods": foods_list
-        }
+        })
     except Exception as e:
         logger.error(f"❌ Error retrieving foods: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/admin/reload_catalog")
+def reload_catalog(
+    wait: bool = Query(True, description="Wait for the new catalog to be active"),
+    catalog_id: Optional[str] = CATALOG_ID_QUERY,
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Admin only: reload the food database without a restart
+
+    The new catalog is built next to the active one and swapped in when
+    complete; requests already running finish on their version. If the
+    reload fails, the active version keeps serving.
+
+    With a regional catalog_id that catalog is (re)loaded instead.
+    """
+    _require_admin(x_admin_token)
+    if catalog_id and catalog_id != DEFAULT_CATALOG_ID:
+        return _reload_regional_catalog(catalog_id, wait)
+    previous = catalog_manager.current
+    if not wait:
+        catalog_manager.reload_async("admin")
+        return {
+            "status": "accepted",
+            "catalog_version": previous.version if previous is not None else None,
+        }
+
+    try:
+        snapshot = catalog_manager.reload("admin")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving version "
+                   f"{previous.version if previous is not None else None}: {e}"
+        )
+    return {
+        "status": "success",
+        "previous_version": previous.version if previous is not None else None,
+        "catalog": snapshot.info(),
+    }
+
+
+def _reload_regional_catalog(catalog_id: str, wait: bool) -> Dict:
+    if catalog_id not in catalog_registry:
+        raise HTTPException(status_code=404, detail=f"Unknown catalog_id: {catalog_id}")
+    if not wait:
+        threading.Thread(target=_reload_regional_quietly, args=(catalog_id,), daemon=True,
+                         name="catalog-reload").start()
+        return {"status": "accepted", "catalog_id": catalog_id}
+    try:
+        snapshot = catalog_registry.reload(catalog_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload of catalog '{catalog_id}' failed: {e}")
+    return {"status": "success", "catalog_id": catalog_id, "catalog": snapshot.info()}
+
+
+def _reload_regional_quietly(catalog_id: str):
+    try:
+        catalog_registry.reload(catalog_id)
+    except Exception:
+        pass  # logged and kept in the registry status
+
+
 @app.get("/api/v1/download/meal_plan")
 def download_meal_plan():
     """
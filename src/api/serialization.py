@@ -0,0 +1,100 @@
+"""
+Response encoding for large plan and catalog payloads
+
+Plans and food pages are big nested dicts of floats. FastAPI's default path
+walks them with jsonable_encoder before json.dumps. Here they are encoded
+once, with the fastest encoder installed:
+
+- JSON via orjson when installed, else compact standard-library json
+- MessagePack when the client sends `Accept: application/msgpack` and
+  msgpack is installed (otherwise JSON)
+- gzip, or brotli when installed, for bodies of COMPRESS_MIN_BYTES or
+  more when `Accept-Encoding` allows it
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.config import COMPRESS_MIN_BYTES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _default(o):
+    # numpy scalars and arrays in plans
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    raise TypeError(f"{type(o).__name__} is not serializable")
+
+
+def dumps_json(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def dumps_msgpack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def write_json(path: Union[str, Path], obj: Any):
+    """Indented JSON file (saved plans), through orjson when installed"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, default=_default,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False, default=_default)
+
+
+def encode(obj: Any, accept: str = "") -> Tuple[bytes, str]:
+    """(body, media type) for the client's Accept header"""
+    if msgpack is not None and any(t in accept for t in MSGPACK_TYPES):
+        return dumps_msgpack(obj), MSGPACK
+    return dumps_json(obj), JSON
+
+
+def compress(body: bytes, accept_encoding: str = "") -> Tuple[bytes, Optional[str]]:
+    """(body, Content-Encoding) for the client's Accept-Encoding header"""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if brotli is not None and "br" in accept_encoding:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if "gzip" in accept_encoding:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def negotiated(request: Request, content: Dict, status_code: int = 200) -> Response:
+    """Encode `content` as the request asks: JSON or MessagePack, maybe compressed"""
+    body, media_type = encode(content, request.headers.get("accept", ""))
+    body, encoding = compress(body, request.headers.get("accept-encoding", ""))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
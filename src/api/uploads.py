@@ -0,0 +1,122 @@
+"""
+Bulk profile uploads
+
+Helpers for POST /api/v1/upload/profiles: a CSV of profiles is read one
+row at a time, each row is validated against the API's profile model and
+processed on a bounded pool, and results are yielded in input order as
+NDJSON lines or CSV rows. A bad row becomes an error record; it does not
+stop the upload.
+"""
+import csv
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from src.api.serialization import dumps_json
+
+# ";"-separated in the CSV ("peanut;dairy")
+LIST_FIELDS = ("conditions", "allergies")
+METRICS = ["bmi", "bmr_kcal", "tdee_kcal"]
+TARGETS = ["calories", "protein_g", "fat_g", "carbs_g", "fiber_g"]
+NUTRIENTS = ["calories", "protein", "fat", "carbs", "fiber"]
+
+
+# ---------------------------
+# input
+# ---------------------------
+
+def open_csv(binary: IO[bytes]) -> csv.DictReader:
+    """DictReader over an uploaded file; rows are decoded as they are read"""
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    return csv.DictReader(text)
+
+
+def missing_columns(reader: csv.DictReader, model: Type[BaseModel]) -> List[str]:
+    columns = set(reader.fieldnames or [])
+    return [name for name, f in model.model_fields.items() if f.is_required() and name not in columns]
+
+
+def parse_row(row: Dict[str, str], model: Type[BaseModel]) -> Tuple[Optional[str], BaseModel]:
+    """(user_id, validated profile); raises ValueError with a readable message"""
+    data = {k: v.strip() for k, v in row.items() if k and isinstance(v, str) and v.strip()}
+    user_id = data.pop("user_id", None)
+    for name in LIST_FIELDS:
+        if name in data:
+            data[name] = [v.strip() for v in data[name].split(";") if v.strip()]
+    try:
+        return user_id, model.model_validate(data)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )) from None
+
+
+# ---------------------------
+# processing
+# ---------------------------
+
+def ordered_map(fn: Callable, items: Iterable, workers: int) -> Iterator:
+    """
+    fn over items on `workers` threads, yielding results in input order
+
+    At most 2 * workers items are in flight, so a large input is never
+    held in memory. fn should not raise.
+    """
+    pending = deque()
+    with ThreadPoolExecutor(workers, thread_name_prefix="upload") as pool:
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # client went away: drop the rows not started yet
+            for future in pending:
+                future.cancel()
+
+
+# ---------------------------
+# output
+# ---------------------------
+
+def ndjson_lines(records: Iterable[Dict]) -> Iterator[bytes]:
+    for record in records:
+        yield dumps_json(record) + b"\n"
+
+
+def csv_columns(plans: bool) -> List[str]:
+    columns = ["row", "user_id", "status", "error"] + METRICS + [f"target_{t}" for t in TARGETS]
+    if plans:
+        columns += [f"plan_{n}" for n in NUTRIENTS] + ["plan_items", "plan_warnings"]
+    return columns
+
+
+def csv_row(record: Dict, plans: bool) -> Dict:
+    """Flatten one result record for CSV output"""
+    out = {k: record.get(k) for k in ("row", "user_id", "status", "error")}
+    profile = record.get("profile") or {}
+    out.update({m: profile.get("metrics", {}).get(m) for m in METRICS})
+    out.update({f"target_{t}": profile.get("targets", {}).get(t) for t in TARGETS})
+    if plans and record.get("plan"):
+        plan = record["plan"]
+        out.update({f"plan_{n}": plan.get("totals", {}).get(n) for n in NUTRIENTS})
+        out["plan_items"] = sum(len(items or []) for items in plan.get("meals", {}).values())
+        out["plan_warnings"] = " | ".join(plan.get("warnings", []))
+    return out
+
+
+def csv_lines(records: Iterable[Dict], plans: bool) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=csv_columns(plans), extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(csv_row(record, plans))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
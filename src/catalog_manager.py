@@ -0,0 +1,285 @@
+"""
+Versioned food catalog with hot reload
+
+The CatalogManager owns the active catalog snapshot: the PreparedCatalog
+built from the food table (compact table, slot pools, clusters, neighbor
+index) and a version number; the raw DataFrame is not kept. A reload
+builds a complete new snapshot off to the side and then swaps it in with a
+single assignment, so requests that already took a snapshot finish on the
+version they started with while new requests get the new one. Anything cached on a PreparedCatalog goes away
+with its snapshot; other caches can subscribe to swaps with on_swap().
+
+Reloads are triggered explicitly (admin endpoint) or by a polling watcher
+on the catalog file's mtime and size.
+
+pandas and the planner modules are imported on the first reload, so the
+API process can start serving liveness checks before they are loaded.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from src.metrics import REGISTRY, CATALOG_FOODS, collect_timings
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.optimizer.catalog import PreparedCatalog
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = REGISTRY.gauge(
+    "planner_catalog_version", "Version of the active food catalog")
+CATALOG_RELOADS = REGISTRY.counter(
+    "planner_catalog_reloads_total", "Catalog reload attempts", ["outcome"])
+
+
+@dataclass
+class CatalogSnapshot:
+    """One immutable catalog version"""
+    version: int
+    catalog: Optional["PreparedCatalog"]    # None for an empty table
+    source: str
+    loaded_at: str
+    build_s: float
+    file_stamp: Optional[tuple] = field(default=None, repr=False)
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per load stage
+
+    @property
+    def food_count(self) -> int:
+        return len(self.catalog) if self.catalog is not None else 0
+
+    @property
+    def ready(self) -> bool:
+        return self.food_count > 0
+
+    @property
+    def memory_mb(self) -> float:
+        if self.catalog is None:
+            return 0.0
+        return round(sum(self.catalog.memory_usage().values()) / 2 ** 20, 2)
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "food_count": self.food_count,
+            "memory_mb": self.memory_mb,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "build_s": round(self.build_s, 3),
+            "timings": {k: round(v, 3) for k, v in self.timings.items()},
+        }
+
+
+def _file_stamp(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def sample_foods() -> "pd.DataFrame":
+    """Minimal sample database for testing when the real one is missing"""
+    import pandas as pd
+
+    logger.warning("⚠️ Food database not found, using a sample database for testing")
+    return pd.DataFrame({
+        'food_id': range(100),
+        'food_name': [f'Sample Food {i}' for i in range(100)],
+        'calories': [i * 10 for i in range(100)],
+        'protein': [i * 0.5 for i in range(100)],
+        'fat': [i * 0.3 for i in range(100)],
+        'carbs': [i * 0.8 for i in range(100)],
+        'fiber': [i * 0.1 for i in range(100)],
+        'grams_per_portion': [100] * 100,
+        'portion_unit': ['portion'] * 100,
+    })
+
+
+class CatalogManager:
+    """
+    Loads, versions and hot-swaps the food catalog
+
+    Args:
+        path: catalog CSV
+        clusters_path: where PreparedCatalog saves/reuses nutrient clusters
+        fallback: builds a table when `path` does not exist (e.g. sample data)
+        catalog_id: name of a regional catalog (CatalogRegistry); only the
+            default catalog (None) sets the unlabelled catalog metrics
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        clusters_path: Optional[Path] = None,
+        fallback: Optional[Callable[[], "pd.DataFrame"]] = None,
+        catalog_id: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.catalog_id = catalog_id
+        self.clusters_path = clusters_path
+        self.fallback = fallback
+        self._current: Optional[CatalogSnapshot] = None
+        self._next_version = 1
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[CatalogSnapshot], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_error: Optional[str] = None
+        self._failed_stamp: Optional[tuple] = None
+        self.loading = False
+
+    @property
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The active snapshot; keep the returned object for a whole request"""
+        return self._current
+
+    def on_swap(self, fn: Callable[[CatalogSnapshot], None]):
+        """Call fn(new_snapshot) after every swap (e.g. to drop version-keyed caches)"""
+        self._listeners.append(fn)
+
+    @property
+    def state(self) -> str:
+        """Load state: ready, loading (no usable snapshot yet) or failed"""
+        snap = self._current
+        if snap is not None and snap.ready:
+            return "ready"
+        if self.loading or (snap is None and self.last_error is None):
+            return "loading"
+        return "failed"
+
+    def _read(self):
+        import pandas as pd
+
+        stamp = _file_stamp(self.path)
+        if stamp is not None:
+            return pd.read_csv(self.path), str(self.path), stamp
+        if self.fallback is not None:
+            return self.fallback(), "fallback", None
+        raise FileNotFoundError(self.path)
+
+    def reload(self, reason: str = "manual") -> CatalogSnapshot:
+        """
+        Build a new snapshot and swap it in; the active one keeps serving
+        until the swap. Concurrent reloads queue behind each other. On error
+        the active snapshot stays and the exception propagates.
+        """
+        with self._reload_lock:
+            self.loading = True
+            t0 = time.perf_counter()
+            try:
+                with collect_timings() as timings:
+                    t = time.perf_counter()
+                    from src.optimizer.catalog import PreparedCatalog
+                    timings["import_catalog"] = time.perf_counter() - t
+
+                    t = time.perf_counter()
+                    foods, source, stamp = self._read()
+                    timings["read"] = time.perf_counter() - t
+
+                    clusters_path = self.clusters_path if stamp is not None else None
+                    catalog = PreparedCatalog(foods, clusters_path=clusters_path) if len(foods) else None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._failed_stamp = _file_stamp(self.path)
+                if self.catalog_id is None:
+                    CATALOG_RELOADS.inc(outcome="error")
+                logger.error(f"❌ {self._label}reload ({reason}) failed: {e}")
+                self.loading = False
+                raise
+
+            snapshot = CatalogSnapshot(
+                version=self._next_version,
+                catalog=catalog,
+                source=source,
+                loaded_at=datetime.now().isoformat(),
+                build_s=time.perf_counter() - t0,
+                file_stamp=stamp,
+                timings=timings,
+            )
+            self._next_version += 1
+            self._current = snapshot
+            self.last_error = None
+            self.loading = False
+
+        if self.catalog_id is None:
+            CATALOG_RELOADS.inc(outcome="ok")
+            CATALOG_VERSION.set(snapshot.version)
+            CATALOG_FOODS.set(len(foods))
+        logger.info(f"✅ {self._label}v{snapshot.version} active ({len(foods)} foods from {source}, "
+                    f"{snapshot.build_s:.2f}s, {reason})")
+        for fn in self._listeners:
+            try:
+                fn(snapshot)
+            except Exception as e:
+                logger.error(f"❌ Catalog swap listener failed: {e}")
+        return snapshot
+
+    @property
+    def _label(self) -> str:
+        return "Catalog " if self.catalog_id is None else f"Catalog '{self.catalog_id}' "
+
+    def unload(self):
+        """Drop the active snapshot (requests holding it finish on it); the next reload continues the versions"""
+        with self._reload_lock:
+            self._current = None
+
+    def reload_async(self, reason: str = "manual") -> threading.Thread:
+        """Reload in a background thread"""
+        t = threading.Thread(target=self._reload_quietly, args=(reason,), daemon=True,
+                             name="catalog-reload")
+        t.start()
+        return t
+
+    def _reload_quietly(self, reason: str):
+        try:
+            self.reload(reason)
+        except Exception:
+            pass  # logged and kept in last_error
+
+    def is_stale(self) -> bool:
+        """True when the catalog file changed since the active snapshot was read"""
+        snap = self._current
+        stamp = _file_stamp(self.path)
+        if stamp is None:
+            return False
+        return snap is None or snap.file_stamp != stamp
+
+    # ---------------------------
+    # file watcher
+    # ---------------------------
+
+    def start_watching(self, interval_s: float):
+        """Poll the catalog file and reload after it changed and then stayed unchanged for one interval"""
+        if self._watcher is not None or interval_s <= 0:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval_s,), daemon=True,
+                                         name="catalog-watcher")
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval_s: float):
+        pending = None
+        while not self._stop.wait(interval_s):
+            if not self.is_stale():
+                pending = None
+                continue
+            stamp = _file_stamp(self.path)
+            if stamp == self._failed_stamp:
+                continue
+            # wait until the writer is done (same stamp on two polls)
+            if stamp != pending:
+                pending = stamp
+                continue
+            pending = None
+            self._reload_quietly("file changed")
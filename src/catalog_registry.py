@@ -0,0 +1,190 @@
+"""
+Regional food catalogs
+
+Requests name a catalog with `catalog_id`. The default catalog stays with
+the API's CatalogManager, which loads it at startup. The registry holds the
+regional catalogs (FOOD_CATALOGS). Each one is loaded, PreparedCatalog
+indexes included, on its first use; requests that arrive during the load
+wait for it and share the one snapshot.
+
+Loaded regional catalogs are kept under CATALOG_MEMORY_BUDGET_MB. Before a
+load, the least recently used ones are unloaded until the new catalog fits
+at its last measured size (the CSV size on first load), and again after it
+when the measured size is larger. Their managers stay, so a reload
+continues the version numbers. Requests that hold an unloaded snapshot
+finish on it.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.catalog_manager import CatalogManager, CatalogSnapshot
+from src.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CATALOG_LOOKUPS = REGISTRY.counter(
+    "planner_catalog_lookups_total", "Regional catalog lookups", ["catalog", "outcome"])
+CATALOG_LOADS = REGISTRY.counter(
+    "planner_catalog_loads_total", "Regional catalog loads", ["catalog", "outcome"])
+CATALOG_LOAD_SECONDS = REGISTRY.histogram(
+    "planner_catalog_load_seconds", "Regional catalog load time", ["catalog"])
+CATALOG_EVICTIONS = REGISTRY.counter(
+    "planner_catalog_evictions_total", "Regional catalogs unloaded to fit the memory budget", ["catalog"])
+CATALOG_MEMORY = REGISTRY.gauge(
+    "planner_catalog_memory_mb", "Memory of a loaded regional catalog (0 when unloaded)", ["catalog"])
+
+
+class UnknownCatalog(KeyError):
+    """catalog_id is not configured"""
+
+
+def clusters_path_for(path: Path) -> Path:
+    """foods_bd.csv -> foods_bd_clusters.npz next to it"""
+    return path.with_name(f"{path.stem}_clusters.npz")
+
+
+class CatalogRegistry:
+    """
+    Regional catalogs by id, loaded on demand under a memory budget
+
+    Args:
+        paths: catalog_id -> catalog CSV
+        budget_mb: memory for loaded regional catalogs together
+    """
+
+    def __init__(self, paths: Dict[str, Path], budget_mb: float):
+        self.budget_mb = budget_mb
+        self._managers = {
+            cid: CatalogManager(path, clusters_path_for(Path(path)), catalog_id=cid)
+            for cid, path in paths.items()
+        }
+        self._load_locks = {cid: threading.Lock() for cid in paths}
+        self._lru: "OrderedDict[str, float]" = OrderedDict()  # loaded id -> memory MB
+        self._last_mb: Dict[str, float] = {}  # id -> memory MB at its last load
+        self._lock = threading.Lock()
+
+    def __contains__(self, catalog_id: str) -> bool:
+        return catalog_id in self._managers
+
+    def get(self, catalog_id: str) -> CatalogSnapshot:
+        """
+        The catalog's snapshot, loading it if needed
+
+        Raises UnknownCatalog for ids that are not configured, and the load
+        error when the catalog cannot be built.
+        """
+        manager = self._managers.get(catalog_id)
+        if manager is None:
+            raise UnknownCatalog(catalog_id)
+
+        with self._lock:
+            snapshot = manager.current
+            if snapshot is not None and catalog_id in self._lru:
+                self._lru.move_to_end(catalog_id)
+        if snapshot is not None:
+            CATALOG_LOOKUPS.inc(catalog=catalog_id, outcome="hit")
+            return snapshot
+
+        with self._load_locks[catalog_id]:
+            # loaded by the request we waited for
+            snapshot = manager.current
+            if snapshot is not None:
+                CATALOG_LOOKUPS.inc(catalog=catalog_id, outcome="hit")
+                return snapshot
+            snapshot = self._load(catalog_id, "first use")
+        CATALOG_LOOKUPS.inc(catalog=catalog_id, outcome="miss")
+        return snapshot
+
+    def reload(self, catalog_id: str) -> CatalogSnapshot:
+        """Rebuild a catalog from its file (admin), whether or not it is loaded"""
+        if catalog_id not in self._managers:
+            raise UnknownCatalog(catalog_id)
+        with self._load_locks[catalog_id]:
+            return self._load(catalog_id, "manual")
+
+    def _load(self, catalog_id: str, reason: str) -> CatalogSnapshot:
+        """Evict to make room, reload under the catalog's load lock, then evict to fit the budget"""
+        with self._lock:
+            victims = self._evict(keep=catalog_id, incoming=self._estimate_mb(catalog_id))
+        self._unload(victims)
+
+        t0 = time.perf_counter()
+        try:
+            snapshot = self._managers[catalog_id].reload(reason)
+        except Exception:
+            CATALOG_LOADS.inc(catalog=catalog_id, outcome="error")
+            raise
+        CATALOG_LOADS.inc(catalog=catalog_id, outcome="ok")
+        CATALOG_LOAD_SECONDS.observe(time.perf_counter() - t0, catalog=catalog_id)
+
+        memory = snapshot.memory_mb
+        CATALOG_MEMORY.set(memory, catalog=catalog_id)
+        with self._lock:
+            self._lru[catalog_id] = self._last_mb[catalog_id] = memory
+            self._lru.move_to_end(catalog_id)
+            victims = self._evict(keep=catalog_id)
+        self._unload(victims)
+        if memory > self.budget_mb:
+            logger.warning(f"⚠️ Catalog '{catalog_id}' alone ({memory} MB) exceeds "
+                           f"CATALOG_MEMORY_BUDGET_MB ({self.budget_mb} MB)")
+        return snapshot
+
+    def _estimate_mb(self, catalog_id: str) -> float:
+        """Expected memory of a load: its last measured size, else its CSV size"""
+        if catalog_id in self._last_mb:
+            return self._last_mb[catalog_id]
+        try:
+            return self._managers[catalog_id].path.stat().st_size / 2**20
+        except OSError:
+            return 0.0
+
+    def _evict(self, keep: str, incoming: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Drop least recently used catalogs from the LRU (under _lock) until the
+        rest plus `keep` (at `incoming` MB, default its loaded size) fit;
+        returns them for _unload
+        """
+        victims = []
+        others = [cid for cid in self._lru if cid != keep]
+        used = sum(self._lru[cid] for cid in others)
+        used += self._lru.get(keep, 0.0) if incoming is None else incoming
+        for victim in others:
+            if used <= self.budget_mb:
+                break
+            memory = self._lru.pop(victim)
+            used -= memory
+            victims.append((victim, memory))
+        return victims
+
+    def _unload(self, victims: List[Tuple[str, float]]):
+        """Unload evicted catalogs outside _lock (unload waits for a running reload)"""
+        for victim, memory in victims:
+            self._managers[victim].unload()
+            CATALOG_EVICTIONS.inc(catalog=victim)
+            CATALOG_MEMORY.set(0, catalog=victim)
+            logger.info(f"♻️ Unloaded catalog '{victim}' ({memory} MB, least recently used)")
+
+    def status(self) -> Dict:
+        """Configured catalogs with their load state, for health checks"""
+        with self._lock:
+            loaded = dict(self._lru)
+        catalogs = {}
+        for cid, manager in self._managers.items():
+            snapshot = manager.current
+            catalogs[cid] = {
+                "path": str(manager.path),
+                "loaded": snapshot is not None,
+                "version": snapshot.version if snapshot is not None else None,
+                "food_count": snapshot.food_count if snapshot is not None else 0,
+                "memory_mb": loaded.get(cid, 0.0),
+                "last_error": manager.last_error,
+            }
+        return {
+            "budget_mb": self.budget_mb,
+            "loaded_mb": round(sum(loaded.values()), 2),
+            "catalogs": catalogs,
+        }
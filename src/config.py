@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Project root = .../ai_nutrition
@@ -7,6 +8,7 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_OUTPUT_DIR = ROOT_DIR / "data_output"
 DATA_INTERMEDIATE_DIR = ROOT_DIR / "data_intermediate"
 DATA_RAW_DIR = ROOT_DIR / "data_raw"
+LOG_DIR = ROOT_DIR / "logs"
 
 # Alias for backward compatibility
 DATA_OUT = DATA_OUTPUT_DIR
@@ -14,12 +16,79 @@ DATA_OUT = DATA_OUTPUT_DIR
 # Master food database
 FOODS_MASTER_CSV = DATA_OUTPUT_DIR / "master_food_table_fdc_full.csv"
 FOODS_COMPLETE_CSV = DATA_OUTPUT_DIR / "foods_complete_with_portions.csv"
+# Nutrient clusters of the complete database (rebuilt when the CSV changes)
+FOODS_CLUSTERS_NPZ = DATA_OUTPUT_DIR / "foods_complete_clusters.npz"
+# Poll the database file and hot-reload it when it changes (seconds, 0 = off)
+CATALOG_WATCH_INTERVAL_S = float(os.getenv("CATALOG_WATCH_INTERVAL_S", "0"))
+# Regional food catalogs next to the default one, "id=path,id=path" (paths
+# relative to the project root); requests pick one with ?catalog_id= and it
+# is loaded on first use
+FOOD_CATALOGS = {
+    cid.strip(): ROOT_DIR / path.strip()
+    for cid, _, path in (item.partition("=") for item in os.getenv("FOOD_CATALOGS", "").split(","))
+    if cid.strip() and path.strip()
+}
+# Name of the default catalog (FOODS_COMPLETE_CSV) in ?catalog_id=
+DEFAULT_CATALOG_ID = os.getenv("DEFAULT_CATALOG_ID", "default")
+# Memory for loaded regional catalogs in MB; least recently used ones are
+# unloaded past it (the default catalog is always loaded)
+CATALOG_MEMORY_BUDGET_MB = float(os.getenv("CATALOG_MEMORY_BUDGET_MB", "512"))
 
 # User profile and meal plan outputs
 USER_TARGETS_JSON = DATA_OUTPUT_DIR / "user_targets.json"
 MEAL_PLAN_JSON = DATA_OUTPUT_DIR / "meal_plan_lp.json"
 MEAL_PLAN_CSV = DATA_OUTPUT_DIR / "meal_plan_lp.csv"
 
+# Optimization parameters (see .env.example)
+LP_SOLVER_TIMEOUT = float(os.getenv("LP_SOLVER_TIMEOUT", "10"))
+# PuLP solver for the meal MILPs (pulp.listSolvers(onlyAvailable=True)); CBC ships with PuLP
+LP_SOLVER_BACKEND = os.getenv("LP_SOLVER_BACKEND", "PULP_CBC_CMD")
+MAX_CANDIDATES_PER_MEAL = int(os.getenv("MAX_CANDIDATES_PER_MEAL", "250"))
+# Per-request latency budget in seconds, split across the meal solves (0 = off)
+PLAN_DEADLINE_S = float(os.getenv("PLAN_DEADLINE_S", "0"))
+# Relaxations tried in order when a meal is infeasible (empty = none)
+RELAXATION_LADDER = [
+    s.strip() for s in os.getenv("RELAXATION_LADDER", "widen_band,lower_fiber,extra_item,unfiltered_pool").split(",")
+    if s.strip()
+]
+
+# Precomputed plan library (python main.py plan-library), relative to the
+# project root; "" disables it.
+# A library meal is served when its macros, scaled to the request's
+# calories, are within PLAN_LIBRARY_TOLERANCE (relative) of the targets
+PLAN_LIBRARY_PATH = os.getenv("PLAN_LIBRARY_PATH", "data_output/plan_library.json")
+PLAN_LIBRARY_JSON = ROOT_DIR / PLAN_LIBRARY_PATH if PLAN_LIBRARY_PATH else None
+PLAN_LIBRARY_TOLERANCE = float(os.getenv("PLAN_LIBRARY_TOLERANCE", "0.10"))
+
+# Solver workers (src/workers): "" solves in the API process, "local" spawns
+# SOLVER_WORKERS processes on this host, "tcp" sends jobs through the broker
+# at SOLVER_BROKER (python main.py broker / python main.py worker)
+SOLVER_TRANSPORT = os.getenv("SOLVER_TRANSPORT", "").strip().lower()
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", "2"))
+SOLVER_BROKER = os.getenv("SOLVER_BROKER", "127.0.0.1:5557")
+SOLVER_BROKER_AUTHKEY = os.getenv("SOLVER_BROKER_AUTHKEY", "change-me")
+# Seconds the API waits for a job's result, and resends after a timeout
+SOLVER_JOB_TIMEOUT_S = float(os.getenv("SOLVER_JOB_TIMEOUT_S", "30"))
+SOLVER_JOB_RETRIES = int(os.getenv("SOLVER_JOB_RETRIES", "1"))
+
+# Rows of a bulk profile upload processed at once (each row's plan goes to
+# the solver workers when SOLVER_TRANSPORT is set)
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+
+# Most target points in one /api/v1/plan_sweep request
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "25"))
+
+# Compress responses of at least this many bytes when the client accepts
+# gzip (or br, with brotli installed)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "4096"))
+
+# Observability: always echo per-stage timings in a Server-Timing header
+# (otherwise only when the request sends "X-Debug-Timings: 1")
+METRICS_TIMING_HEADER = os.getenv("METRICS_TIMING_HEADER", "false").lower() in ("1", "true", "yes")
+
+# Admin token for operator features (e.g. ?profile=1); empty disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # Ensure directories exist
 for directory in [DATA_OUTPUT_DIR, DATA_INTERMEDIATE_DIR, DATA_RAW_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
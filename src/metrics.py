@@ -0,0 +1,189 @@
+"""
+Lightweight in-process metrics
+
+Counters, gauges and fixed-bucket histograms rendered in the Prometheus
+text exposition format (served on /metrics). Planner code wraps its stages
+in `stage("name")`, which feeds the stage histogram and, when a request has
+opted in, a per-request timing dict used for the Server-Timing header.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+# Seconds: 0.5 ms .. 30 s
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Row counts: pools and catalogs
+SIZE_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 50000,
+                100000, 300000, 1000000)
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> str:
+        return f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}" for k, v in items]
+        return self.header() + "".join(line + "\n" for line in lines)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = TIME_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (+Inf last), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> str:
+        out = [self.header()]
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = f'le="{_fmt_value(bound)}"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.label_names, key, le)} {cumulative}\n")
+            out.append(f"{self.name}_sum{_fmt_labels(self.label_names, key)} {_fmt_value(total)}\n")
+            out.append(f"{self.name}_count{_fmt_labels(self.label_names, key)} {count}\n")
+        return "".join(out)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = TIME_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self._metrics.values())
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "planner_stage_seconds", "Time spent in each planning stage", ["stage"])
+SOLVER_STATUS = REGISTRY.counter(
+    "planner_meal_status_total", "Meal solve outcomes (Optimal, INFEASIBLE, EMPTY_POOL)", ["status"])
+POOL_SIZE = REGISTRY.histogram(
+    "planner_pool_size", "Candidate foods per meal pool", ["slot"], buckets=SIZE_BUCKETS)
+CATALOG_FOODS = REGISTRY.gauge(
+    "planner_catalog_foods", "Foods in the loaded catalog")
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"])
+
+
+# ---------------------------
+# per-request stage timings
+# ---------------------------
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = \
+    contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Collect stage timings for the current request (returns the live dict)"""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def collect_timings():
+    """Collect stage timings of a block outside of a request (e.g. catalog loads)"""
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a planning stage into STAGE_SECONDS and the request timings"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + dt
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value (milliseconds)"""
+    return ", ".join(f"{name};dur={secs * 1000.0:.2f}" for name, secs in timings.items())
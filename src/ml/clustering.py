@@ -0,0 +1,213 @@
+"""
+Nutrient-space clustering of the food catalog
+
+Foods are clustered once at catalog load by their per-portion macro profile
+(energy split between protein/fat/carbs, fiber density and portion size)
+with a numpy mini-batch k-means. Candidate pools then take a stratified
+top-k over the clusters, closest-to-centroid first, so pools keep their
+variety, are reproducible, and spend the solver's budget on foods that
+represent their cluster.
+
+Clusters are saved as .npz next to the catalog and reused as long as the
+catalog fingerprint matches.
+"""
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+N_CLUSTERS = 48
+BATCH_SIZE = 2048
+N_ITER = 60
+# Rows per chunk when assigning the full catalog to centers
+ASSIGN_CHUNK = 65536
+# Bump when the features change so saved clusters are rebuilt
+FEATURE_VERSION = 1
+
+
+@dataclass
+class FoodClusters:
+    """Cluster label and distance to its centroid for every catalog row"""
+    labels: np.ndarray          # (n,) int32
+    distance: np.ndarray        # (n,) float32
+    centers: np.ndarray         # (k, d) in standardized feature space
+    fingerprint: str
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.centers)
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # np.savez appends .npz unless the name already ends with it
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, labels=self.labels, distance=self.distance, centers=self.centers,
+                 fingerprint=np.array(self.fingerprint))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FoodClusters":
+        with np.load(path) as z:
+            return cls(labels=z["labels"], distance=z["distance"], centers=z["centers"],
+                       fingerprint=str(z["fingerprint"]))
+
+
+def nutrient_features(M: np.ndarray) -> np.ndarray:
+    """
+    Features from per-portion nutrients M (n, 5) in NUTRIENTS order:
+    protein/fat/carbs share of energy, fiber per 100 kcal (log) and kcal
+    per portion (log)
+    """
+    kcal = np.maximum(M[:, 0], 1e-6)
+    energy = M[:, 1:4] * np.array([4.0, 9.0, 4.0])
+    share = energy / np.maximum(energy.sum(axis=1, keepdims=True), 1e-6)
+    fiber = np.log1p(M[:, 4] / kcal * 100.0)
+    return np.column_stack([share, fiber, np.log(kcal)]).astype(np.float32)
+
+
+def _standardize(X: np.ndarray) -> np.ndarray:
+    mu = X.mean(axis=0)
+    sd = X.std(axis=0)
+    return (X - mu) / np.where(sd > 0, sd, 1.0)
+
+
+def _sq_dist(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Squared euclidean distances (n, k)"""
+    d = (X * X).sum(axis=1)[:, None] - 2.0 * X @ C.T + (C * C).sum(axis=1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def _kmeans_pp(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding"""
+    centers = [X[rng.integers(len(X))]]
+    d = _sq_dist(X, centers[0][None, :])[:, 0]
+    for _ in range(1, k):
+        total = d.sum()
+        i = rng.choice(len(X), p=d / total) if total > 0 else rng.integers(len(X))
+        centers.append(X[i])
+        d = np.minimum(d, _sq_dist(X, X[i][None, :])[:, 0])
+    return np.array(centers)
+
+
+def assign(X: np.ndarray, centers: np.ndarray):
+    """Nearest center and its distance for every row, in chunks"""
+    labels = np.empty(len(X), dtype=np.int32)
+    dist = np.empty(len(X), dtype=np.float32)
+    for s in range(0, len(X), ASSIGN_CHUNK):
+        d = _sq_dist(X[s:s + ASSIGN_CHUNK], centers)
+        lab = d.argmin(axis=1)
+        labels[s:s + ASSIGN_CHUNK] = lab
+        dist[s:s + ASSIGN_CHUNK] = np.sqrt(d[np.arange(len(lab)), lab])
+    return labels, dist
+
+
+def minibatch_kmeans(
+    X: np.ndarray,
+    k: int = N_CLUSTERS,
+    batch_size: int = BATCH_SIZE,
+    n_iter: int = N_ITER,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Mini-batch k-means (Sculley 2010): each step moves the centers toward
+    a random batch with per-center learning rates 1/count
+
+    Returns the (k, d) centers.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(X))
+    init = X[rng.choice(len(X), size=min(len(X), 10 * batch_size), replace=False)]
+    C = _kmeans_pp(init, k, rng).astype(np.float64)
+    counts = np.zeros(k)
+
+    for _ in range(n_iter):
+        batch = X[rng.integers(0, len(X), size=min(batch_size, len(X)))]
+        lab = _sq_dist(batch, C).argmin(axis=1)
+        n = np.bincount(lab, minlength=k).astype(float)
+        sums = np.zeros_like(C)
+        np.add.at(sums, lab, batch)
+        hit = n > 0
+        counts[hit] += n[hit]
+        # closed form of the per-sample updates with rate 1/count
+        eta = n[hit] / counts[hit]
+        C[hit] = (1.0 - eta)[:, None] * C[hit] + eta[:, None] * (sums[hit] / n[hit][:, None])
+    return C
+
+
+def catalog_fingerprint(food_ids: np.ndarray, M: np.ndarray, k: int, seed: int) -> str:
+    h = hashlib.sha1()
+    h.update(f"v{FEATURE_VERSION}:k{k}:s{seed}:n{len(M)}".encode())
+    h.update("\x1f".join(map(str, food_ids)).encode())
+    h.update(np.round(M, 4).astype(np.float64).tobytes())
+    return h.hexdigest()
+
+
+def cluster_foods(food_ids: np.ndarray, M: np.ndarray, k: int = N_CLUSTERS, seed: int = 0) -> FoodClusters:
+    """Cluster foods with per-portion nutrients M (n, 5)"""
+    fingerprint = catalog_fingerprint(food_ids, M, k, seed)
+    if len(M) == 0:
+        return FoodClusters(np.zeros(0, np.int32), np.zeros(0, np.float32),
+                            np.zeros((0, 5), np.float32), fingerprint)
+
+    X = _standardize(nutrient_features(M))
+    centers = minibatch_kmeans(X, k=k, seed=seed).astype(np.float32)
+    labels, dist = assign(X, centers)
+    return FoodClusters(labels, dist, centers, fingerprint)
+
+
+def load_or_cluster(
+    food_ids: np.ndarray,
+    M: np.ndarray,
+    path: Optional[Union[str, Path]] = None,
+    k: int = N_CLUSTERS,
+    seed: int = 0,
+) -> FoodClusters:
+    """Reuse clusters saved at `path` if they match the catalog, else build (and save)"""
+    if path is not None and Path(path).exists():
+        try:
+            saved = FoodClusters.load(path)
+            if saved.fingerprint == catalog_fingerprint(food_ids, M, k, seed):
+                return saved
+        except (OSError, KeyError, ValueError):
+            pass
+
+    clusters = cluster_foods(food_ids, M, k=k, seed=seed)
+    if path is not None:
+        clusters.save(path)
+    return clusters
+
+
+def stratified_top_k(labels: np.ndarray, distance: np.ndarray, k: int, rotation: int = 0) -> np.ndarray:
+    """
+    Pick k of the given foods, stratified by cluster
+
+    First the most central food of every cluster (largest clusters first),
+    then further foods in proportion to cluster size, each cluster in order
+    of distance to its centroid. Returns positions into `labels`,
+    deterministic for the same inputs.
+
+    rotation > 0 starts each cluster that many shares further down its
+    order (wrapping around), e.g. a different pool per day of a week.
+    """
+    n = len(labels)
+    if n <= k:
+        return np.arange(n)
+
+    order = np.lexsort((distance, labels))
+    lab = labels[order]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = lab[1:] != lab[:-1]
+    first_pos = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    rank = np.arange(n) - first_pos
+    size = np.bincount(lab)[lab]
+    if rotation:
+        share = np.ceil(k * size / n).astype(int)
+        rank = (rank - rotation * share) % size
+
+    # Sainte-Lague style priority: proportional share after one per cluster
+    priority = np.where(rank == 0, -size.astype(float), (rank + 0.5) / size)
+    pick = np.lexsort((np.arange(n), priority))[:k]
+    return np.sort(order[pick])
@@ -0,0 +1,74 @@
+"""
+Nearest-neighbor index over food nutrient profiles
+
+Foods are indexed by their macro profile per 100 kcal (protein, fat, carbs,
+fiber), each scaled by its weight in the meal objective. The distance is
+the Euclidean (L2) distance between these weighted profiles. It is not the
+objective itself, which sums weighted absolute deviations (L1), but it
+ranks foods with similar calorie shares of each macro first, which are the
+closest swaps for a plan item once its portion is rescaled to the same
+calories.
+
+Queries are a blocked brute-force scan in NumPy: exact, no build step
+beyond one (n, 4) float32 matrix, and a few ms for 300k foods.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.optimizer.lp_day_solver import OBJECTIVE_WEIGHTS, FIBER_WEIGHT
+
+# Rows scanned per block (bounds the temporary distance arrays)
+BLOCK = 65536
+PROFILE_WEIGHTS = np.append(OBJECTIVE_WEIGHTS[1:], FIBER_WEIGHT).astype(np.float32)
+
+
+def macro_profiles(M: np.ndarray) -> np.ndarray:
+    """Weighted protein/fat/carbs/fiber per 100 kcal from per-portion nutrients M (n, 5)"""
+    kcal = np.maximum(M[:, 0], 1e-6)
+    return (M[:, 1:] / kcal[:, None] * 100.0 * PROFILE_WEIGHTS).astype(np.float32)
+
+
+class NutrientIndex:
+    """Exact k-nearest-neighbor search over macro profiles"""
+
+    def __init__(self, M: np.ndarray):
+        self.kcal = M[:, 0].astype(np.float32)
+        self.X = macro_profiles(M)
+        self.sq_norms = (self.X * self.X).sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    def query(self, position: int, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The k foods closest to the food at `position`
+
+        Args:
+            position: catalog row of the query food
+            k: number of neighbors
+            mask: boolean mask of eligible rows (None = all)
+
+        Returns:
+            (positions, distances) sorted by distance
+        """
+        q = self.X[position]
+        best_pos = np.zeros(0, dtype=np.int64)
+        best_d = np.zeros(0, dtype=np.float32)
+
+        for s in range(0, len(self.X), BLOCK):
+            block = slice(s, s + BLOCK)
+            d = self.sq_norms[block] - 2.0 * (self.X[block] @ q) + q @ q
+            if mask is not None:
+                d = np.where(mask[block], d, np.inf)
+            m = min(k, len(d))
+            top = np.argpartition(d, m - 1)[:m]
+            top = top[np.isfinite(d[top])]
+            best_pos = np.concatenate([best_pos, top + s])
+            best_d = np.concatenate([best_d, d[top]])
+            if len(best_pos) > k:
+                keep = np.argpartition(best_d, k - 1)[:k]
+                best_pos, best_d = best_pos[keep], best_d[keep]
+
+        order = np.argsort(best_d, kind="stable")
+        return best_pos[order], np.sqrt(np.maximum(best_d[order], 0.0))
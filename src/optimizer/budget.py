@@ -0,0 +1,83 @@
+"""
+Request latency budget and adaptive candidate pool sizing
+
+A Deadline splits a request's time budget (e.g. a 2 s SLO) across the meal
+solves still to run. The AdaptivePoolSizer picks how many candidates each
+slot may send to the MILP so its solve is expected to fit its share, based
+on recently observed solve times for that slot.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+MIN_CANDIDATES = 20
+# Floor for a solve's time limit once the deadline is (nearly) spent
+MIN_TIME_LIMIT = 0.2
+# Aim for this fraction of the per-solve budget (process spawn, model build)
+SAFETY = 0.6
+# Weight of the newest observation in the moving average
+EWMA_ALPHA = 0.3
+
+
+class Deadline:
+    """Time budget shared by `parts` solves (e.g. days x meal slots)"""
+
+    def __init__(self, seconds: float, parts: int = 1):
+        self.seconds = float(seconds)
+        self.expires_at = time.perf_counter() + self.seconds
+        self.parts_left = max(int(parts), 1)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.perf_counter(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def next_share(self) -> float:
+        """Budget for the next solve: remaining time split over the solves left"""
+        share = self.remaining() / self.parts_left
+        self.parts_left = max(self.parts_left - 1, 1)
+        return share
+
+
+class AdaptivePoolSizer:
+    """
+    Chooses per-slot pool sizes from observed solve times
+
+    Keeps an exponentially weighted average of seconds-per-candidate for
+    each slot. A solve that hit its time limit was cut short, so its rate is
+    inflated to push the next pool down faster.
+    """
+
+    def __init__(self, min_candidates: int = MIN_CANDIDATES):
+        self.min_candidates = min_candidates
+        self._rate: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, slot: str, budget_s: Optional[float], max_candidates: int) -> int:
+        if budget_s is None:
+            return max_candidates
+        with self._lock:
+            rate = self._rate.get(slot)
+        if not rate:
+            return max_candidates
+        n = int(budget_s * SAFETY / rate)
+        return max(self.min_candidates, min(n, max_candidates))
+
+    def observe(self, slot: str, n_candidates: int, solve_time_s: float, time_limit_hit: bool = False):
+        if n_candidates <= 0 or solve_time_s is None:
+            return
+        rate = solve_time_s / n_candidates
+        if time_limit_hit:
+            rate *= 2.0
+        with self._lock:
+            old = self._rate.get(slot)
+            self._rate[slot] = rate if old is None else (1 - EWMA_ALPHA) * old + EWMA_ALPHA * rate
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._rate)
+
+
+# Shared by all requests in this process
+POOL_SIZER = AdaptivePoolSizer()
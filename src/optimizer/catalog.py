@@ -0,0 +1,362 @@
+"""
+Prepared food catalog
+
+Normalizes the raw food table once and precomputes, for every MEAL_RULES
+slot, the foods allowed in it. Within each slot pool, foods dominated by
+another food are grouped behind it so the MILP only sees one candidate per
+group.
+
+Dominance, in two steps over the macro profile per 100 kcal:
+- duplicate collapse: foods whose profiles match within PRUNE_EPS
+  (relative) are one food in different portion sizes; the many "Rice,
+  white, cooked" variants collapse to one group
+- epsilon-dominance: groups whose leading foods' profiles, weighted as in
+  the meal objective, fall in the same DOMINANCE_EPS cell are merged.
+  Replacing a food by another of its cell at the same calories moves each
+  weighted macro by at most DOMINANCE_EPS per 100 kcal, which bounds the
+  objective cost (the benchmark measures it)
+
+A group's lead is its food with the most calories per portion, so it can
+stand in for any amount of the others. Meals that need several foods of a
+group are covered by portion multiplicity instead of extra candidates:
+pools list up to GROUP_COPIES members per group behind their lead, the
+MILP gives the lead an integer copy count with the members' combined
+portion caps (_add_meal_terms), and the solution is spread back over that
+many members (_lead_portions).
+
+The table itself is kept as a compact FoodTable (float32 values, packed
+strings); pools and substitutes are materialized as regular DataFrames.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import MAX_CANDIDATES_PER_MEAL
+from src.metrics import stage
+from src.ml.clustering import load_or_cluster, stratified_top_k
+from src.ml.neighbors import PROFILE_WEIGHTS, NutrientIndex
+from src.optimizer.food_table import FoodTable
+from src.optimizer.lp_day_solver import (
+    MAX_PORTIONS, MEAL_CONFIG, MEAL_RULES, _ensure_required_cols, _extract_items, _portion_matrix, slot_mask, user_exclusion_patterns,
+)
+
+# Relative resolution of the per-kcal macro profile for duplicate collapse
+PRUNE_EPS = 0.03
+# Cell size for epsilon-dominance, in objective-weighted grams per 100 kcal
+# (0 keeps duplicate collapse only)
+DOMINANCE_EPS = 3.0
+# Members a pool lists per group: a meal uses at most the largest max_items
+GROUP_COPIES = max(max_i for _, _, max_i, _ in MEAL_CONFIG.values())
+# Distinct allergy/condition combinations whose food masks are cached
+USER_MASK_CACHE_SIZE = 64
+
+
+@dataclass
+class SlotPool:
+    """Foods allowed in one slot (positions into the catalog) and their dominance groups"""
+    positions: np.ndarray       # catalog row positions of all slot foods
+    group: np.ndarray           # dominance group of each food
+    rank: np.ndarray            # rank in its group by calories per portion (0 = lead)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def kept(self) -> np.ndarray:
+        """True for the foods that lead their group"""
+        return self.rank == 0
+
+
+def _rank_within(group: np.ndarray, kcal: np.ndarray) -> np.ndarray:
+    """Rank of each food in its group, largest kcal per portion first"""
+    n = len(group)
+    order = np.lexsort((-kcal, group))
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = group[order][1:] != group[order][:-1]
+    first_pos = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    rank = np.empty(n, dtype=int)
+    rank[order] = np.arange(n) - first_pos
+    return rank
+
+
+def dominance_groups(M: np.ndarray, eps: float = PRUNE_EPS, dominance_eps: float = DOMINANCE_EPS):
+    """
+    Group foods with per-portion nutrients M (n, 5) by macro profile per 100 kcal
+
+    Near-duplicates (profiles equal within relative `eps`, on a log scale)
+    form one group first; groups whose leads' weighted profiles share a
+    `dominance_eps` cell are then merged. Returns (group, rank): the group
+    id of each food and its rank in the group, largest kcal per portion
+    first (rank 0 leads the group).
+    """
+    n = len(M)
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    kcal = M[:, 0]
+    profile = M[:, 1:] / np.maximum(kcal, 1e-9)[:, None] * 100.0
+    keys = np.round(np.log1p(profile) / eps).astype(np.int64)
+    _, group = np.unique(keys, axis=0, return_inverse=True)
+    group = group.ravel()
+
+    if dominance_eps > 0:
+        # every food takes the cell of its duplicate group's lead
+        rank = _rank_within(group, kcal)
+        lead_of = np.empty(group.max() + 1, dtype=int)
+        lead_of[group[rank == 0]] = np.flatnonzero(rank == 0)
+        cells = np.floor(profile * PROFILE_WEIGHTS / dominance_eps).astype(np.int64)
+        _, group = np.unique(cells[lead_of[group]], axis=0, return_inverse=True)
+        group = group.ravel()
+
+    return group, _rank_within(group, kcal)
+
+
+class PreparedCatalog:
+    """
+    A normalized food table plus per-slot candidate pools
+
+    Build once at catalog load and pass to build_day in place of the raw
+    DataFrame; per request only the user's exclusions and the top-k
+    selection are computed. Foods are stored in a FoodTable and addressed
+    by row position; food_id strings only appear in the pools handed to
+    the solver.
+
+    Foods are also clustered by macro profile (src.ml.clustering); pools
+    take a stratified top-k over the clusters, so the same request always
+    gets the same pool. With `clusters_path` the clusters are saved there
+    and reused while the catalog is unchanged. A NutrientIndex over the
+    same foods serves single-item substitutions.
+    """
+
+    def __init__(
+        self,
+        foods_df: pd.DataFrame,
+        prune: bool = True,
+        eps: float = PRUNE_EPS,
+        dominance_eps: float = DOMINANCE_EPS,
+        clusters_path: Optional[Union[str, Path]] = None,
+    ):
+        with stage("normalize"):
+            foods = _ensure_required_cols(foods_df)
+            self.table = FoodTable(foods)
+        self.prune = prune
+        self.eps = eps
+        self.dominance_eps = dominance_eps
+        self.slots: Dict[str, SlotPool] = {}
+
+        M = _portion_matrix(self.table.numeric_frame())
+        name_norm = foods["name_norm"]
+        with stage("slot_pools"):
+            for slot in MEAL_RULES:
+                positions = np.flatnonzero(slot_mask(name_norm, slot)).astype(np.int32)
+                if prune:
+                    group, rank = dominance_groups(M[positions], eps, dominance_eps)
+                else:
+                    group, rank = np.arange(len(positions)), np.zeros(len(positions), dtype=int)
+                self.slots[slot] = SlotPool(positions=positions, group=group.astype(np.int32),
+                                            rank=rank.astype(np.int32))
+
+        with stage("cluster"):
+            self.clusters = load_or_cluster(foods["food_id"].to_numpy(), M, clusters_path)
+        with stage("index"):
+            self.index = NutrientIndex(M)
+            self.name_codes = pd.factorize(name_norm)[0].astype(np.int32)
+        self._user_masks: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def user_mask(self, allergies: Optional[List[str]], conditions: Optional[List[str]]) -> np.ndarray:
+        """Boolean mask over catalog rows of foods allowed for the user (cached, read-only)"""
+        patterns = tuple(user_exclusion_patterns(allergies, conditions))
+        mask = self._user_masks.get(patterns)
+        if mask is not None:
+            return mask
+
+        mask = np.ones(len(self.table), dtype=bool)
+        if patterns:
+            name_norm = self.table.name_norm()
+            for pattern in patterns:
+                mask &= ~name_norm.str.contains(pattern, na=False).to_numpy(dtype=bool)
+        mask.flags.writeable = False
+
+        if len(self._user_masks) >= USER_MASK_CACHE_SIZE:
+            self._user_masks.pop(next(iter(self._user_masks)), None)
+        self._user_masks[patterns] = mask
+        return mask
+
+    def position(self, food_id: str) -> int:
+        """Catalog row of a food_id; raises KeyError if unknown"""
+        pos = self.table.positions([food_id])[0]
+        if pos < 0:
+            raise KeyError(food_id)
+        return int(pos)
+
+    def substitutes(
+        self,
+        food_id: str,
+        slot: str,
+        portions: float = 1.0,
+        allergies: Optional[List[str]] = None,
+        conditions: Optional[List[str]] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
+        k: int = 5,
+    ):
+        """
+        The k foods closest in macro profile to a plan item, with portions
+        rescaled to the item's calories
+
+        Candidates must be allowed in the slot (MEAL_CONFIG or MEAL_RULES
+        name) and for the user, need at most MAX_PORTIONS portions, and
+        exclude the item itself, its same-name variants and `exclude_ids`.
+
+        Returns:
+            (item, substitutes) in the plan item format; each substitute has
+            "macro_distance", the weighted L2 distance between its and the
+            item's per-100-kcal macro profiles, times the item's kcal / 100
+        """
+        pool_name = MEAL_CONFIG[slot][3] if slot in MEAL_CONFIG else slot
+        sp = self.slots[pool_name]
+        pos = self.position(food_id)
+        target_kcal = float(self.index.kcal[pos]) * portions
+
+        mask = np.zeros(len(self.table), dtype=bool)
+        mask[sp.positions] = True
+        mask &= self.user_mask(allergies, conditions)
+        # 0.01 .. MAX_PORTIONS portions reach the item's calories
+        mask &= (self.index.kcal * MAX_PORTIONS >= target_kcal) & (self.index.kcal * 0.01 <= target_kcal)
+        mask &= self.name_codes != self.name_codes[pos]
+        if exclude_ids:
+            excluded = self.table.positions(exclude_ids)
+            mask[excluded[excluded >= 0]] = False
+
+        hits, dist = self.index.query(pos, k, mask)
+        rows = self.table.frame(np.append(pos, hits))
+        new_portions = target_kcal / self.index.kcal[hits].astype(float)
+        items = _extract_items(rows, [portions] + new_portions.tolist())
+        for item, d in zip(items[1:], dist):
+            item["macro_distance"] = round(float(d) * target_kcal / 100.0, 2)
+        return items[0], items[1:]
+
+    def pool(
+        self,
+        slot: str,
+        allowed: Optional[np.ndarray] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
+        max_candidates: Optional[int] = None,
+        rotation: int = 0,
+        slot_rules: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Candidate foods for a slot
+
+        Args:
+            slot: MEAL_RULES slot name
+            allowed: user_mask() result (None = no user exclusions)
+            exclude_ids: food_ids already used today
+            max_candidates: pool cap (default MAX_CANDIDATES_PER_MEAL)
+            rotation: shifts the pick within each cluster (see stratified_top_k)
+            slot_rules: False ignores the slot's MEAL_RULES (any food the
+                user may eat; relaxation fallback)
+        """
+        excluded = self.table.positions(exclude_ids or [])
+        excluded = excluded[excluded >= 0]
+        if not slot_rules:
+            ok = np.ones(len(self.table), dtype=bool) if allowed is None else allowed.copy()
+            ok[excluded] = False
+            return self._top_k(np.flatnonzero(ok), max_candidates, rotation)
+
+        sp = self.slots[slot]
+        ok = np.ones(len(sp), dtype=bool) if allowed is None else allowed[sp.positions].copy()
+        if len(excluded):
+            ok &= ~np.isin(sp.positions, excluded)
+        return self.grouped_frame(sp.positions[ok], sp.group[ok], sp.rank[ok], max_candidates, rotation)
+
+    def grouped_frame(
+        self,
+        positions: np.ndarray,
+        group: np.ndarray,
+        rank: np.ndarray,
+        max_candidates: Optional[int] = None,
+        rotation: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Pool of the given foods, one candidate per dominance group
+
+        The best-ranked food left of each group (user restrictions and
+        foods used today are already removed) leads it; the top-k picks
+        leads only. The frame lists the picked leads first, then up to
+        GROUP_COPIES - 1 further members of their groups by rank; the
+        "lead" column gives each row's lead food_id (its own for leads).
+        """
+        order = np.lexsort((rank, group))
+        positions, group = positions[order], group[order]
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = group[1:] != group[:-1]
+        first_pos = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+        nth = np.arange(len(order)) - first_pos
+
+        leads = positions[nth == 0]
+        pick = stratified_top_k(self.clusters.labels[leads], self.clusters.distance[leads],
+                                max_candidates or MAX_CANDIDATES_PER_MEAL, rotation)
+        picked = group[nth == 0][pick]
+        members = (nth > 0) & (nth < GROUP_COPIES) & np.isin(group, picked)
+
+        # picked is sorted by group, like the members
+        frame = self.table.frame(np.concatenate([leads[pick], positions[members]]))
+        lead_ids = frame["food_id"].to_numpy()[:len(pick)]
+        frame["lead"] = np.concatenate([lead_ids, lead_ids[np.searchsorted(picked, group[members])]])
+        return frame
+
+    def _top_k(self, rows: np.ndarray, max_candidates: Optional[int], rotation: int) -> pd.DataFrame:
+        pick = stratified_top_k(self.clusters.labels[rows], self.clusters.distance[rows],
+                                max_candidates or MAX_CANDIDATES_PER_MEAL, rotation)
+        return self.table.frame(rows[pick])
+
+    def with_foods(
+        self,
+        pool: pd.DataFrame,
+        food_ids: Iterable[str],
+        allowed: Optional[np.ndarray] = None,
+        exclude_ids: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """Add the given foods to a pool (if known, allowed, not excluded or already in it)"""
+        skip = set(pool["food_id"]) | {str(i) for i in (exclude_ids or [])}
+        ids = [str(i) for i in food_ids if str(i) not in skip]
+        pos = self.table.positions(ids)
+        pos = pos[pos >= 0]
+        if allowed is not None:
+            pos = pos[allowed[pos]]
+        if len(pos) == 0:
+            return pool
+        added = self.table.frame(pos)
+        if "lead" in pool.columns:
+            # each added food is a candidate of its own
+            added["lead"] = added["food_id"]
+        return pd.concat([pool, added], ignore_index=True)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held by the table, slot pools, clusters and indexes"""
+        usage = {f"table.{k}": v for k, v in self.table.memory_usage().items()}
+        usage["slot_pools"] = sum(sp.positions.nbytes + sp.group.nbytes + sp.rank.nbytes
+                                  for sp in self.slots.values())
+        usage["clusters"] = self.clusters.labels.nbytes + self.clusters.distance.nbytes
+        usage["nutrient_index"] = self.index.X.nbytes + self.index.kcal.nbytes + self.index.sq_norms.nbytes
+        usage["name_codes"] = self.name_codes.nbytes
+        return usage
+
+    def pruning_summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            slot: {"foods": len(sp), "non_dominated": int(sp.kept.sum())}
+            for slot, sp in self.slots.items()
+        }
+
+
+def as_catalog(foods) -> PreparedCatalog:
+    """Use a PreparedCatalog as is; prepare a raw DataFrame"""
+    if isinstance(foods, PreparedCatalog):
+        return foods
+    return PreparedCatalog(foods)
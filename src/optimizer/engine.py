@@ -4,13 +4,18 @@ Integrates profile building and day planning for the API
 """
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 # Import from profile_builder
-from src.profile.profile_builder import build_profile_targets
+from src.profile.profile_builder import build_profile_targets, targets_for_calories
 
 # Import from lp_day_solver
-from src.optimizer.lp_day_solver import build_day as lp_build_day
+from src.optimizer.lp_day_solver import (
+    build_day as lp_build_day, replan_day as lp_replan_day, sweep_day as lp_sweep_day, MEAL_CONFIG,
+)
+from src.optimizer.budget import Deadline
+from src.optimizer.catalog import PreparedCatalog, as_catalog
+from src.optimizer.plan_library import library_day
 
 
 def build_profile(
@@ -40,16 +45,33 @@ def build_profile(
     )
 
 
-def build_day(profile: Dict, foods_df: pd.DataFrame) -> Dict:
+def build_day(
+    profile: Dict,
+    foods_df: Union[pd.DataFrame, PreparedCatalog],
+    deadline_s: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    mode: str = "exact",
+    report_gap: bool = False,
+    rotation: int = 0,
+    use_library: bool = False,
+) -> Dict:
     """
     Build a complete daily meal plan using LP optimization
     
     Args:
         profile: User profile dict with 'targets', 'inputs' keys
-        foods_df: DataFrame with food database
+        foods_df: PreparedCatalog (or raw DataFrame) with food database
+        deadline_s: Latency budget in seconds for the whole day (optional)
+        deadline: Shared Deadline, used instead of deadline_s (weekly plans)
+        mode: "exact" (MILP) or "fast" (heuristic, tens of ms)
+        report_gap: Also solve the MILP and report the objective gap
+        rotation: Candidate pool variant (weekly plans use the day index)
+        use_library: Serve meals from the precomputed plan library where
+            they fit (not with report_gap or a rotation)
     
     Returns:
-        Dict with 'meals', 'totals', 'warnings'
+        Dict with 'meals', 'totals', 'warnings' (and 'library' when
+        library meals were served)
     """
     targets = profile.get("targets", {})
     inputs = profile.get("inputs", {})
@@ -57,29 +79,137 @@ def build_day(profile: Dict, foods_df: pd.DataFrame) -> Dict:
     allergies = inputs.get("allergies", [])
     conditions = inputs.get("conditions", [])
     
+    if use_library and not report_gap and rotation == 0:
+        plan = library_day(as_catalog(foods_df), targets, allergies, conditions,
+                           deadline=deadline, deadline_s=deadline_s, mode=mode)
+        if plan is not None:
+            return plan
+    
+    if deadline is None and deadline_s:
+        deadline = Deadline(deadline_s, parts=len(MEAL_CONFIG))
+    
     # Call the LP solver
     plan = lp_build_day(
-        foods_df=foods_df,
+        foods=foods_df,
         targets=targets,
         allergies=allergies,
         conditions=conditions,
+        deadline=deadline,
+        mode=mode,
+        report_gap=report_gap,
+        rotation=rotation,
     )
     
     return plan
 
 
-def build_weekly_plan(profile: Dict, foods_df: pd.DataFrame, days: int = 7) -> Dict:
+def replan_day(
+    profile: Dict,
+    foods_df: Union[pd.DataFrame, PreparedCatalog],
+    previous_plan: Dict,
+    locked_slots: Optional[List[str]] = None,
+    locked_items: Optional[List[str]] = None,
+    deadline_s: Optional[float] = None,
+    mode: str = "exact",
+) -> Dict:
+    """
+    Re-plan the unlocked meals of an existing daily plan
+    
+    Args:
+        profile: User profile dict with 'targets', 'inputs' keys
+        foods_df: PreparedCatalog (or raw DataFrame) with food database
+        previous_plan: Plan from build_day (or its 'meals' dict)
+        locked_slots: Meal slots kept as they are
+        locked_items: food_ids kept in their slot
+        deadline_s: Latency budget in seconds for the re-solved slots (optional)
+        mode: "exact" (MILP, warm-started from the previous plan) or "fast"
+    
+    Returns:
+        Dict with 'meals', 'totals', 'warnings', 'replanned'
+    """
+    targets = profile.get("targets", {})
+    inputs = profile.get("inputs", {})
+    
+    open_slots = [s for s in MEAL_CONFIG if s not in set(locked_slots or [])]
+    deadline = Deadline(deadline_s, parts=len(open_slots)) if deadline_s and open_slots else None
+    
+    return lp_replan_day(
+        foods=foods_df,
+        targets=targets,
+        previous_plan=previous_plan,
+        locked_slots=locked_slots,
+        locked_items=locked_items,
+        allergies=inputs.get("allergies", []),
+        conditions=inputs.get("conditions", []),
+        deadline=deadline,
+        mode=mode,
+    )
+
+
+def sweep_calories(
+    profile: Dict,
+    foods_df: Union[pd.DataFrame, PreparedCatalog],
+    calories: List[float],
+    deadline_s: Optional[float] = None,
+) -> Dict:
+    """
+    Daily plans for a range of calorie targets (exact mode)
+    
+    Each point's macro targets follow the profile's rules for that calorie
+    target. The meal models are built once and re-solved per point.
+    
+    Args:
+        profile: User profile dict with 'targets', 'inputs' keys
+        foods_df: PreparedCatalog (or raw DataFrame) with food database
+        calories: Day calorie targets, solved in this order
+        deadline_s: Latency budget in seconds for all points together (optional)
+    
+    Returns:
+        Dict with 'points' (calories, targets, plan per point) and 'warnings'
+    """
+    inputs = profile.get("inputs", {})
+    targets_list = [targets_for_calories(profile, c) for c in calories]
+    deadline = Deadline(deadline_s, parts=len(calories) * len(MEAL_CONFIG)) if deadline_s and calories else None
+    
+    plans = lp_sweep_day(
+        foods=foods_df,
+        targets_list=targets_list,
+        allergies=inputs.get("allergies", []),
+        conditions=inputs.get("conditions", []),
+        deadline=deadline,
+    )
+    
+    sweep = {"points": [], "warnings": []}
+    for targets, plan in zip(targets_list, plans):
+        sweep["points"].append({"calories": targets["calories"], "targets": targets, "plan": plan})
+        sweep["warnings"].extend(f"{targets['calories']:.0f} kcal: {w}" for w in plan["warnings"])
+    return sweep
+
+
+def build_weekly_plan(
+    profile: Dict,
+    foods_df: Union[pd.DataFrame, PreparedCatalog],
+    days: int = 7,
+    deadline_s: Optional[float] = None,
+    mode: str = "exact",
+    report_gap: bool = False,
+) -> Dict:
     """
     Build a weekly meal plan (multiple days)
     
     Args:
         profile: User profile
-        foods_df: Food database
+        foods_df: Food database (prepared once for all days if a DataFrame)
         days: Number of days to generate (default 7)
+        deadline_s: Latency budget in seconds for all days together (optional)
+        mode: "exact" (MILP) or "fast" (heuristic)
+        report_gap: Also solve the MILP and report the objective gap
     
     Returns:
         Dict with weekly plan structure
     """
+    deadline = Deadline(deadline_s, parts=days * len(MEAL_CONFIG)) if deadline_s else None
+    catalog = as_catalog(foods_df)
     weekly = {"days": [], "weekly_totals": {}, "warnings": []}
     
     grand_totals = {
@@ -91,7 +221,8 @@ def build_weekly_plan(profile: Dict, foods_df: pd.DataFrame, days: int = 7) -> D
     }
     
     for day_num in range(1, days + 1):
-        day_plan = build_day(profile, foods_df)
+        day_plan = build_day(profile, catalog, deadline=deadline, mode=mode,
+                             report_gap=report_gap, rotation=day_num - 1)
         day_plan["day_number"] = day_num
         
         # Accumulate totals
@@ -0,0 +1,204 @@
+"""
+Compact columnar food table
+
+The normalized food table (see _ensure_required_cols) stored column by
+column in the smallest types that keep the planner exact enough:
+
+- nutrients and grams_per_portion as float32 arrays
+- portion_unit as a pandas Categorical (a few distinct units)
+- food_id as an int32 (or int64) array when every id is a plain decimal
+  integer, as most catalog ids are; other ids fall back to a string table
+- food_name as a packed string table: one UTF-8 buffer plus offsets,
+  instead of one Python object per row
+- name_norm is not stored; it is food_name lowercased and rebuilt on demand
+
+Inside the catalog a food is its row position; ids and names become
+strings only when frame() materializes rows (candidate pools, API
+responses), which is also where float32 values are widened back to float64.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLS = ["calories", "protein", "fat", "carbs", "fiber", "grams_per_portion"]
+# Decimals kept when widening float32 values (drops float32 noise like 52.099998)
+FLOAT_DECIMALS = 4
+# Separator between packed strings
+SEP = "\x1f"
+# food_ids stored as integers: decimal, no leading zeros, within int64
+INTEGER_ID = r"0|-?[1-9][0-9]{0,17}"
+
+
+class StringTable:
+    """Strings packed into one UTF-8 buffer with offsets"""
+
+    def __init__(self, values: Sequence[str]):
+        values = [str(v) for v in values]
+        if any(SEP in v for v in values):
+            raise ValueError("strings must not contain the \\x1f separator")
+        lengths = np.fromiter((len(v.encode("utf-8")) + 1 for v in values), dtype=np.int64, count=len(values))
+        ends = np.cumsum(lengths)
+        dtype = np.uint32 if len(ends) == 0 or ends[-1] < 2 ** 32 else np.int64
+        self.offsets = np.zeros(len(values) + 1, dtype=dtype)
+        self.offsets[1:] = ends
+        self.buffer = SEP.join(values).encode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1] - 1].decode("utf-8")
+
+    def take(self, positions: Iterable[int]) -> List[str]:
+        buf, off = self.buffer, self.offsets
+        return [buf[off[i]:off[i + 1] - 1].decode("utf-8") for i in positions]
+
+    def to_list(self) -> List[str]:
+        if len(self) == 0:
+            return []
+        return self.buffer.decode("utf-8").split(SEP)
+
+    def keys(self, values: Sequence[str]):
+        """(sortable lookup keys, mask of values that can match) for searchsorted"""
+        return pd.util.hash_array(np.asarray(values, dtype=object)), np.ones(len(values), dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes
+
+
+class IntegerIds:
+    """Integer food_ids kept as numbers and formatted as strings on access"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    @classmethod
+    def parse(cls, values: Sequence[str]) -> Optional["IntegerIds"]:
+        """IntegerIds when every value matches INTEGER_ID (so str() round-trips), else None"""
+        values = pd.Series(values, dtype=object)
+        if not values.str.fullmatch(INTEGER_ID).all():
+            return None
+        ints = values.astype(np.int64).to_numpy()
+        info = np.iinfo(np.int32)
+        fits = len(ints) == 0 or (ints.min() >= info.min and ints.max() <= info.max)
+        return cls(ints.astype(np.int32) if fits else ints)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.values[i])
+
+    def take(self, positions: Iterable[int]) -> List[str]:
+        return [str(v) for v in self.values[np.asarray(positions, dtype=np.int64)].tolist()]
+
+    def to_list(self) -> List[str]:
+        return [str(v) for v in self.values.tolist()]
+
+    def keys(self, values: Sequence[str]):
+        """(sortable lookup keys, mask of values that can match) for searchsorted"""
+        values = pd.Series(values, dtype=object)
+        valid = values.str.fullmatch(INTEGER_ID).to_numpy(dtype=bool)
+        keys = np.zeros(len(values), dtype=np.int64)
+        keys[valid] = values[valid].astype(np.int64).to_numpy()
+        return keys, valid
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+class FoodTable:
+    """Compact copy of a normalized food table"""
+
+    def __init__(self, foods: pd.DataFrame):
+        ids = foods["food_id"].astype(str).tolist()
+        self.ids = IntegerIds.parse(ids) or StringTable(ids)
+        self.names = StringTable(foods["food_name"].astype(str))
+        self.numeric = {c: foods[c].to_numpy(dtype=np.float32) for c in NUMERIC_COLS}
+        self.portion_unit = pd.Categorical(foods["portion_unit"].astype(str))
+
+        # food_id lookup: sorted keys (the integer ids, or 64-bit hashes
+        # verified against the string table)
+        keys, _ = self.ids.keys(ids)
+        order = np.argsort(keys, kind="stable")
+        self._id_keys = keys[order]
+        self._id_order = order.astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, food_ids: Iterable) -> np.ndarray:
+        """Row positions of the given food_ids (-1 where unknown)"""
+        ids = [str(i) for i in food_ids]
+        if not ids or len(self) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        keys, valid = self.ids.keys(ids)
+        i = np.minimum(np.searchsorted(self._id_keys, keys), len(self._id_keys) - 1)
+        pos = self._id_order[i].astype(np.int64)
+        found = valid & (self._id_keys[i] == keys)
+        for j in np.flatnonzero(found):
+            found[j] = self.ids[pos[j]] == ids[j]
+        return np.where(found, pos, -1)
+
+    def numeric_frame(self) -> pd.DataFrame:
+        """The float32 numeric columns as a DataFrame (no strings)"""
+        return pd.DataFrame(self.numeric, copy=False)
+
+    def name_norm(self, positions: Optional[np.ndarray] = None) -> pd.Series:
+        """Lowercased food names (all rows, or the given positions)"""
+        names = self.names.to_list() if positions is None else self.names.take(positions)
+        return pd.Series(names, dtype=object).str.lower()
+
+    def search(self, text: Optional[str], limit: int) -> np.ndarray:
+        """Positions of the first `limit` foods whose name matches `text` (case-insensitive)"""
+        if not text:
+            return np.arange(min(max(limit, 0), len(self)))
+        hits = pd.Series(self.names.to_list(), dtype=object).str.contains(text, case=False, na=False)
+        return np.flatnonzero(hits.to_numpy(dtype=bool))[:max(limit, 0)]
+
+    def frame(self, positions: Sequence[int], name_norm: bool = True) -> pd.DataFrame:
+        """Materialize rows in the normalized DataFrame layout (string ids, float64 values)"""
+        positions = np.asarray(positions, dtype=np.int64)
+        names = self.names.take(positions)
+        data = {
+            "food_id": self.ids.take(positions),
+            "food_name": names,
+        }
+        for c in NUMERIC_COLS:
+            data[c] = np.round(self.numeric[c][positions].astype(np.float64), FLOAT_DECIMALS)
+        data["portion_unit"] = self.portion_unit.categories.to_numpy()[self.portion_unit.codes[positions]]
+        if name_norm:
+            data["name_norm"] = [n.lower() for n in names]
+        return pd.DataFrame(data)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes per column"""
+        usage = {
+            "food_id": self.ids.nbytes + self._id_keys.nbytes + self._id_order.nbytes,
+            "food_name": self.names.nbytes,
+        }
+        usage.update({c: a.nbytes for c, a in self.numeric.items()})
+        usage["portion_unit"] = int(self.portion_unit.codes.nbytes
+                                    + pd.Series(self.portion_unit.categories).memory_usage(deep=True))
+        return usage
+
+
+def memory_report(foods: pd.DataFrame) -> Dict:
+    """
+    Bytes per column of a normalized food table as a default DataFrame and
+    as a FoodTable
+    """
+    frame = foods.memory_usage(deep=True, index=False).to_dict()
+    compact = FoodTable(foods).memory_usage()
+    frame_total, compact_total = int(sum(frame.values())), int(sum(compact.values()))
+    return {
+        "n_foods": len(foods),
+        "dataframe": {k: int(v) for k, v in frame.items()},
+        "compact": compact,
+        "dataframe_mb": round(frame_total / 2 ** 20, 2),
+        "compact_mb": round(compact_total / 2 ** 20, 2),
+        "ratio": round(compact_total / frame_total, 3) if frame_total else None,
+    }
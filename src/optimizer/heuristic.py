@@ -0,0 +1,253 @@
+"""
+Low-latency heuristic meal solver
+
+Vectorized greedy construction + swap search over the per-portion
+nutrient matrix, where each candidate food set gets least-squares portions
+(batched over all candidates at once), then a portion refinement and a
+repair step for the calorie band. Scores use the same objective as the MILP in
+solve_one_meal (see meal_objective), with constraint violations penalized,
+so results are directly comparable.
+
+Least squares is only a proxy for the MILP's weighted absolute deviations,
+so the chosen foods' portions are finally polished with the meal MILP
+restricted to them (_polish): at most max_items variables, one short CBC
+call. The result is optimal for its food set, which leaves only the choice
+of foods to the heuristic. Typical solve time is 10-20 ms, most of it CBC
+start-up.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from pulp import LpStatus, value
+
+from src.optimizer.lp_day_solver import (
+    CAL_BAND, FIBER_FLOOR, MAX_PORTIONS, OBJECTIVE_WEIGHTS,
+    _build_meal_model, _portion_matrix, _extract_items, make_solver, meal_objective,
+)
+
+# smallest portion of a chosen food, so every chosen food counts as an item
+MIN_PORTION = 0.1
+# portion steps tried when refining one food's portion (0 drops the food)
+FINE_GRID = np.concatenate([[0.0], np.linspace(MIN_PORTION, MAX_PORTIONS, 57)])
+RIDGE = 1e-3
+# objective units per unit of constraint violation (kcal or g)
+PENALTY = 1000.0
+# relative slack on the bounds when checking the final meal
+TOLERANCE = 1e-3
+LOCAL_SEARCH_PASSES = 3
+# time limit of the portion polish (a MILP over the chosen foods only)
+POLISH_TIME_LIMIT = 1.0
+
+
+def _score(T: np.ndarray, target_cal: float, macro_target: dict,
+           band: float = CAL_BAND, floor: float = FIBER_FLOOR) -> np.ndarray:
+    """Objective plus penalties for the calorie band and fiber bounds"""
+    fib_t = float(macro_target["fiber_g"])
+    lo, hi = target_cal * (1 - band), target_cal * (1 + band)
+    viol = (
+        np.maximum(lo - T[..., 0], 0.0) + np.maximum(T[..., 0] - hi, 0.0)
+        + np.maximum(fib_t * floor - T[..., 4], 0.0)
+        # the MILP caps fiber at its target (fiber has only an under-deviation)
+        + np.maximum(T[..., 4] - fib_t, 0.0)
+    )
+    return meal_objective(T, target_cal, macro_target) + PENALTY * viol
+
+
+def _feasible(T: np.ndarray, target_cal: float, macro_target: dict,
+              band: float = CAL_BAND, floor: float = FIBER_FLOOR) -> bool:
+    fib_t = float(macro_target["fiber_g"])
+    lo, hi = 1 - TOLERANCE, 1 + TOLERANCE
+    return bool(
+        target_cal * (1 - band) * lo <= T[0] <= target_cal * (1 + band) * hi
+        and fib_t * floor * lo <= T[4] <= fib_t * hi
+    )
+
+
+def _fit_portions(A: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """
+    Batched weighted least-squares portions, clipped to [MIN_PORTION, MAX_PORTIONS]
+
+    A: (b, 4, k) per-portion calories/protein/fat/carbs of k foods, for b
+    candidate sets. Returns (b, k) portions. A small ridge term keeps
+    near-duplicate foods well conditioned.
+    """
+    w = OBJECTIVE_WEIGHTS[:, None]
+    Aw = A * w
+    tw = target * OBJECTIVE_WEIGHTS
+    G = np.einsum("bik,bil->bkl", Aw, Aw) + RIDGE * np.eye(A.shape[2])
+    rhs = np.einsum("bik,i->bk", Aw, tw)
+    P = np.linalg.solve(G, rhs[..., None])[..., 0]
+    return np.clip(P, MIN_PORTION, MAX_PORTIONS)
+
+
+def _eval_sets(M, base, cand, target, target_cal, macro_target, band=CAL_BAND, floor=FIBER_FLOOR):
+    """Score `base` foods + each candidate food with fitted portions"""
+    sets = np.concatenate([np.broadcast_to(base, (len(cand), len(base))), cand[:, None]], axis=1)
+    A = np.transpose(M[sets][:, :, :4], (0, 2, 1))                   # (b, 4, k)
+    P = _fit_portions(A, target)
+
+    # pull sets whose fit misses the calorie band back to the target
+    cal = np.einsum("bk,bk->b", P, M[sets][:, :, 0])
+    lo, hi = target_cal * (1 - band), target_cal * (1 + band)
+    off = (cal > 0) & ((cal < lo) | (cal > hi))
+    P[off] = np.clip(P[off] * (target_cal / cal[off])[:, None], MIN_PORTION, MAX_PORTIONS)
+
+    T = np.einsum("bk,bkj->bj", P, M[sets])
+    return sets, P, _score(T, target_cal, macro_target, band, floor)
+
+
+def _greedy(M, target_cal, macro_target, max_items, min_items, band=CAL_BAND, floor=FIBER_FLOOR):
+    n = len(M)
+    target = np.array([target_cal, macro_target["protein_g"], macro_target["fat_g"], macro_target["carbs_g"]])
+    chosen = np.array([], dtype=int)
+    portions = np.zeros(n)
+    cur_score = float(_score(np.zeros(M.shape[1]), target_cal, macro_target, band, floor))
+
+    while len(chosen) < min(max_items, n):
+        cand = np.setdiff1d(np.arange(n), chosen)
+        sets, P, scores = _eval_sets(M, chosen, cand, target, target_cal, macro_target, band, floor)
+        b = int(np.argmin(scores))
+        if scores[b] >= cur_score - 1e-9 and len(chosen) >= min_items:
+            break
+        chosen = sets[b]
+        portions[:] = 0.0
+        portions[chosen] = P[b]
+        cur_score = float(scores[b])
+    return portions, [int(c) for c in chosen]
+
+
+def _swap_search(M, portions, chosen, target_cal, macro_target, band=CAL_BAND, floor=FIBER_FLOOR):
+    """Replace one chosen food at a time with the best outside food"""
+    n = len(M)
+    target = np.array([target_cal, macro_target["protein_g"], macro_target["fat_g"], macro_target["carbs_g"]])
+    cur_score = float(_score(portions @ M, target_cal, macro_target, band, floor))
+
+    for _ in range(LOCAL_SEARCH_PASSES):
+        improved = False
+        for pos in range(len(chosen)):
+            base = np.array([c for i, c in enumerate(chosen) if i != pos], dtype=int)
+            cand = np.setdiff1d(np.arange(n), chosen)
+            if len(cand) == 0:
+                break
+            sets, P, scores = _eval_sets(M, base, cand, target, target_cal, macro_target, band, floor)
+            b = int(np.argmin(scores))
+            if scores[b] < cur_score - 1e-9:
+                chosen = [int(c) for c in sets[b]]
+                portions[:] = 0.0
+                portions[chosen] = P[b]
+                cur_score = float(scores[b])
+                improved = True
+        if not improved:
+            break
+    return portions, chosen
+
+
+def _refine(M, portions, chosen, target_cal, macro_target, min_items, band=CAL_BAND, floor=FIBER_FLOOR):
+    """Coordinate search on each chosen food's portion (may drop foods)"""
+    for _ in range(LOCAL_SEARCH_PASSES):
+        improved = False
+        cur = portions @ M
+        cur_score = float(_score(cur, target_cal, macro_target, band, floor))
+        for j in list(chosen):
+            rest = cur - portions[j] * M[j]
+            grid = FINE_GRID if len(chosen) > min_items else FINE_GRID[1:]
+            scores = _score(rest + grid[:, None] * M[j], target_cal, macro_target, band, floor)
+            g = int(np.argmin(scores))
+            if scores[g] < cur_score - 1e-9:
+                portions[j] = grid[g]
+                cur = rest + grid[g] * M[j]
+                cur_score = float(scores[g])
+                improved = True
+                if grid[g] == 0.0:
+                    chosen.remove(j)
+        if not improved:
+            break
+    return portions, chosen
+
+
+def _repair(M, portions, chosen, target_cal, macro_target, band=CAL_BAND):
+    """
+    Scale portions uniformly (capped at MAX_PORTIONS) into the calorie
+    band, then below the fiber cap if needed; the final feasibility check
+    catches what scaling cannot fix
+    """
+    total = portions @ M
+    if total[0] <= 0:
+        return portions
+    lo, hi = target_cal * (1 - band), target_cal * (1 + band)
+    if not lo <= total[0] <= hi:
+        portions[chosen] = np.clip(portions[chosen] * target_cal / total[0], MIN_PORTION, MAX_PORTIONS)
+        total = portions @ M
+
+    fib_t = float(macro_target["fiber_g"])
+    if total[4] > fib_t > 0:
+        portions[chosen] = np.clip(portions[chosen] * fib_t / total[4], MIN_PORTION, MAX_PORTIONS)
+    return portions
+
+
+def _polish(rows, portions, chosen, target_cal, macro_target, min_items,
+            band=CAL_BAND, floor=FIBER_FLOOR, backend=None):
+    """
+    Optimal portions for the chosen foods (the meal MILP over them only,
+    which may still drop foods down to min_items); `portions` unchanged
+    when it has no optimal solution or leaves too few items
+    """
+    if not chosen or len(chosen) < min_items:
+        return portions
+    sub = rows.iloc[chosen].drop(columns="lead", errors="ignore")
+    prob, x, _, _ = _build_meal_model(sub, target_cal, macro_target, len(chosen), min_items, band, floor)
+    prob.solve(make_solver(backend, POLISH_TIME_LIMIT))
+    if LpStatus[prob.status] != "Optimal":
+        return portions
+
+    polished = np.zeros_like(portions)
+    polished[chosen] = [value(x[i]) or 0.0 for i in range(len(chosen))]
+    return polished if (polished >= 0.01).sum() >= min_items else portions
+
+
+def solve_meal_fast(
+    pool: pd.DataFrame,
+    target_cal: float,
+    macro_target: dict,
+    max_items: int = 3,
+    min_items: int = 1,
+    info: dict = None,
+    cal_band: float = CAL_BAND,
+    fiber_floor: float = FIBER_FLOOR,
+    backend: str = None,
+):
+    """
+    Heuristic counterpart of solve_one_meal (same inputs and item format)
+
+    Returns None when no candidate set satisfies the calorie band, fiber
+    bounds and item counts after repair and polish. `info` receives the objective,
+    solve time and status ("Heuristic" or "Heuristic infeasible").
+    """
+    details = info if info is not None else {}
+    rows = pool.reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    M = _portion_matrix(rows)
+    band, floor = cal_band, fiber_floor
+    portions, chosen = _greedy(M, target_cal, macro_target, max_items, min_items, band, floor)
+    portions, chosen = _swap_search(M, portions, chosen, target_cal, macro_target, band, floor)
+    portions, chosen = _refine(M, portions, chosen, target_cal, macro_target, min_items, band, floor)
+    portions = _repair(M, portions, chosen, target_cal, macro_target, band)
+    portions = _polish(rows, portions, chosen, target_cal, macro_target, min_items, band, floor, backend)
+    totals = portions @ M
+    n_items = int((portions >= 0.01).sum())
+    ok = _feasible(totals, target_cal, macro_target, band, floor) and min_items <= n_items <= max_items
+
+    details.update({
+        "variables": len(rows),
+        "status": "Heuristic" if ok else "Heuristic infeasible",
+        "objective": round(float(meal_objective(totals, target_cal, macro_target)), 4),
+        "solve_time_s": round(time.perf_counter() - t0, 4),
+    })
+    if not ok:
+        return None
+
+    result = _extract_items(rows, portions.tolist())
+    return result if result else None
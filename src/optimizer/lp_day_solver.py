@@ -1,10 +1,18 @@
+import time
+
 import numpy as np
 import pandas as pd
 
 from pulp import (
-    LpProblem, LpMinimize, LpVariable, lpSum, LpStatus, value, PULP_CBC_CMD
+    LpProblem, LpMinimize, LpVariable, lpSum, LpStatus, LpSolutionIntegerFeasible,
+    value, PULP_CBC_CMD, getSolver,
 )
 
+from src.config import LP_SOLVER_BACKEND, LP_SOLVER_TIMEOUT, MAX_CANDIDATES_PER_MEAL, RELAXATION_LADDER
+from src.metrics import stage, SOLVER_STATUS, POOL_SIZE
+from src.profiling import record_solve
+from src.optimizer.budget import Deadline, POOL_SIZER, MIN_TIME_LIMIT
+
 # ============================================================
 # FIXED LP DAY SOLVER (stable + realistic + no scope bugs)
 # ============================================================
@@ -45,6 +53,27 @@ MEAL_RULES = {
     },
 }
 
+NUTRIENTS = ["calories", "protein", "fat", "carbs", "fiber"]
+
+# objective weights on |deviation| for calories, protein, fat, carbs
+OBJECTIVE_WEIGHTS = np.array([1.0, 1.5, 0.7, 1.1])
+FIBER_WEIGHT = 1.0
+
+# meal constraints: calories within +-CAL_BAND of target, fiber at least
+# FIBER_FLOOR of target, at most MAX_PORTIONS portions of any food
+CAL_BAND = 0.10
+FIBER_FLOOR = 0.30
+MAX_PORTIONS = 1.5
+
+# relaxation ladder steps (RELAXATION_LADDER picks and orders them)
+RELAXATIONS = ("widen_band", "lower_fiber", "extra_item", "unfiltered_pool")
+RELAXED_CAL_BAND = 0.20
+RELAXED_FIBER_FLOOR = 0.10
+
+_unknown = sorted(set(RELAXATION_LADDER) - set(RELAXATIONS))
+if _unknown:
+    raise ValueError(f"Unknown RELAXATION_LADDER step(s): {', '.join(_unknown)}")
+
 MEAL_CONFIG = {
     "breakfast": (0.25,  2, 3, "breakfast"),
     "snack1":    (0.10,  1, 2, "snack"),
@@ -150,64 +179,56 @@ def _ensure_required_cols(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def filter_by_user(df: pd.DataFrame, allergies: list, conditions: list) -> pd.DataFrame:
+ALLERGY_PATTERNS = {
+    "peanut":   r"peanut",
+    "nuts":     r"almond|cashew|walnut|pistachio|pecan|nut",
+    "tree_nut": r"almond|cashew|walnut|pistachio|pecan|nut",
+    "dairy":    r"milk|cheese|yogurt|butter|cream|whey|casein",
+    "egg":      r"egg",
+    "seafood":  r"fish|shrimp|crab|salmon|tuna|cod|sardine|lobster|tilapia",
+    "fish":     r"fish|shrimp|crab|salmon|tuna|cod|sardine|lobster|tilapia",
+}
+
+DIABETES_PATTERN = r"sugar|soda|candy|cake|sweet|chocolate|syrup|jam"
+
+
+def user_exclusion_patterns(allergies: list, conditions: list) -> list:
+    """Name regexes excluded for a user's allergies and conditions"""
     allergies  = [a.lower() for a in (allergies or [])]
     conditions = [c.lower() for c in (conditions or [])]
-    out = df.copy()
 
-    allergy_map = {
-        "peanut":   r"peanut",
-        "nuts":     r"almond|cashew|walnut|pistachio|pecan|nut",
-        "tree_nut": r"almond|cashew|walnut|pistachio|pecan|nut",
-        "dairy":    r"milk|cheese|yogurt|butter|cream|whey|casein",
-        "egg":      r"egg",
-        "seafood":  r"fish|shrimp|crab|salmon|tuna|cod|sardine|lobster|tilapia",
-        "fish":     r"fish|shrimp|crab|salmon|tuna|cod|sardine|lobster|tilapia",
-    }
+    patterns = [ALLERGY_PATTERNS[a] for a in allergies if a in ALLERGY_PATTERNS]
+    if any("diabetes" in c for c in conditions):
+        patterns.append(DIABETES_PATTERN)
+    return patterns
 
-    for a in allergies:
-        pattern = allergy_map.get(a)
-        if pattern:
-            out = out[~out["name_norm"].str.contains(pattern, na=False)]
 
-    if any("diabetes" in c for c in conditions):
-        out = out[~out["name_norm"].str.contains(
-            r"sugar|soda|candy|cake|sweet|chocolate|syrup|jam", na=False)]
+def filter_by_user(df: pd.DataFrame, allergies: list, conditions: list) -> pd.DataFrame:
+    out = df.copy()
+
+    for pattern in user_exclusion_patterns(allergies, conditions):
+        out = out[~out["name_norm"].str.contains(pattern, na=False)]
 
     return out.reset_index(drop=True)
 
 
-def get_pool(df: pd.DataFrame, slot: str, max_candidates: int = 250) -> pd.DataFrame:
+def slot_mask(name_norm: pd.Series, slot: str) -> np.ndarray:
+    """
+    Foods allowed in a MEAL_RULES slot: not blacklisted or blocked, and
+    matching a slot keyword (or every allowed food if none matches)
+    """
     rules = MEAL_RULES[slot]
-    out = df.copy()
-
-    # blacklist
-    for kw in BLACKLIST:
-        out = out[~out["name_norm"].str.contains(kw, na=False)]
 
-    # blocked
-    for kw in rules["blocked"]:
-        out = out[~out["name_norm"].str.contains(kw, na=False)]
+    # blacklist + blocked
+    excluded = "|".join(BLACKLIST + rules["blocked"])
+    allowed = ~name_norm.str.contains(excluded, na=False).to_numpy(dtype=bool)
 
     # strict keywords
     pattern = "|".join(rules["keywords"])
-    strict = out[out["name_norm"].str.contains(pattern, na=False)].reset_index(drop=True)
+    strict = allowed & name_norm.str.contains(pattern, na=False).to_numpy(dtype=bool)
 
     # fallback if strict empty
-    if strict.empty:
-        strict = out.copy()
-
-    # sample for speed + variety
-    if len(strict) > max_candidates:
-        strict["_score"] = (
-            (strict["protein"] / (strict["calories"] + 1e-6)) * 0.35 +
-            (strict["fiber"]   / (strict["calories"] + 1e-6)) * 0.25 +
-            np.random.rand(len(strict)) * 0.40
-        )
-        strict = strict.sort_values("_score", ascending=False).head(max_candidates)
-        strict = strict.drop(columns=["_score"]).reset_index(drop=True)
-
-    return strict
+    return strict if strict.any() else allowed
 
 
 # ---------------------------
@@ -220,89 +241,320 @@ def solve_one_meal(
     macro_target: dict,
     max_items: int = 3,
     min_items: int = 1,
+    info: dict = None,
+    time_limit: float = None,
+    mode: str = "exact",
+    report_gap: bool = False,
+    warm_start: dict = None,
+    cal_band: float = CAL_BAND,
+    fiber_floor: float = FIBER_FLOOR,
+    backend: str = None,
 ):
+    """
+    Solve one meal as a MILP over the candidate pool
+
+    CBC stops after `time_limit` seconds (default LP_SOLVER_TIMEOUT) and the
+    best incumbent found so far is returned. If `info` is given it is filled
+    with solver details (candidates, variables, constraints, status,
+    objective, solve time and whether the time limit was hit); the same dict
+    goes to an active profiling session.
+
+    mode="fast" uses the greedy/local-search heuristic instead of CBC. With
+    report_gap=True the exact MILP is solved as well and the relative
+    objective gap is added to `info`.
+
+    warm_start ({food_id: portions}, e.g. the slot's previous meal) is
+    passed to CBC as the initial solution; the fast mode ignores it.
+    cal_band and fiber_floor override CAL_BAND and FIBER_FLOOR (relaxation).
+    backend names the PuLP solver (default LP_SOLVER_BACKEND); warm starts
+    are only passed to CBC.
+    """
+    details = info if info is not None else {}
+    details["candidates"] = pool_candidates(pool)
+    details["mode"] = mode
     if pool.empty:
+        details["status"] = "EMPTY_POOL"
+        record_solve(details)
+        return None
+
+    if mode == "fast":
+        return _solve_one_meal_fast(pool, target_cal, macro_target, max_items, min_items,
+                                    details, time_limit, report_gap, cal_band, fiber_floor, backend)
+
+    time_limit = time_limit or LP_SOLVER_TIMEOUT
+    with stage("model_build"):
+        prob, x, y, rows = _build_meal_model(pool, target_cal, macro_target, max_items, min_items,
+                                             cal_band, fiber_floor)
+        if warm_start:
+            _set_warm_start(rows, x, y, warm_start)
+
+    with stage("solve"):
+        t0 = time.perf_counter()
+        prob.solve(make_solver(backend, time_limit, warm_start=bool(warm_start)))
+        solve_time = time.perf_counter() - t0
+
+    details.update({
+        "backend": backend or LP_SOLVER_BACKEND,
+        "variables": prob.numVariables(),
+        "constraints": prob.numConstraints(),
+        "status": LpStatus[prob.status],
+        "objective": round(float(value(prob.objective) or 0.0), 4),
+        "solve_time_s": round(solve_time, 4),
+        "time_limit_s": round(float(time_limit), 3),
+        "time_limit_hit": prob.sol_status == LpSolutionIntegerFeasible,
+        "warm_start": bool(warm_start),
+    })
+    record_solve(details)
+
+    if LpStatus[prob.status] != "Optimal":
+        return None
+
+    with stage("extract"):
+        portions = _lead_portions(rows, x, y)
+        result = _extract_items(rows, portions)
+    # members only match their lead's profile within the dominance cell
+    details["objective"] = _realized_objective(rows, portions, target_cal, macro_target)
+
+    return result if result else None
+
+
+def _solve_one_meal_fast(pool, target_cal, macro_target, max_items, min_items,
+                         details, time_limit, report_gap, cal_band=CAL_BAND, fiber_floor=FIBER_FLOOR,
+                         backend=None):
+    from src.optimizer.heuristic import solve_meal_fast
+
+    with stage("heuristic"):
+        result = solve_meal_fast(pool, target_cal, macro_target, max_items=max_items,
+                                 min_items=min_items, info=details,
+                                 cal_band=cal_band, fiber_floor=fiber_floor, backend=backend)
+
+    if report_gap:
+        exact = {"slot": details.get("slot")}
+        solve_one_meal(pool, target_cal, macro_target, max_items=max_items,
+                       min_items=min_items, info=exact, time_limit=time_limit,
+                       cal_band=cal_band, fiber_floor=fiber_floor, backend=backend)
+        details["milp_objective"] = exact.get("objective") if exact.get("status") == "Optimal" else None
+        details["milp_time_limit_hit"] = exact.get("time_limit_hit", False)
+        details["gap"] = objective_gap(
+            details["objective"] if result is not None else None, details["milp_objective"]
+        )
+
+    record_solve(details)
+    return result
+
+
+def make_solver(backend: str = None, time_limit: float = None, warm_start: bool = False):
+    """PuLP solver by name (default LP_SOLVER_BACKEND), quiet and time-limited"""
+    backend = backend or LP_SOLVER_BACKEND
+    time_limit = time_limit or LP_SOLVER_TIMEOUT
+    if backend == "PULP_CBC_CMD":
+        return PULP_CBC_CMD(msg=0, timeLimit=time_limit, warmStart=warm_start)
+    return getSolver(backend, msg=0, timeLimit=time_limit)
+
+
+def objective_gap(objective, milp_objective):
+    """Relative gap of a heuristic objective over the MILP objective"""
+    if objective is None or milp_objective is None:
         return None
+    return round((objective - milp_objective) / max(abs(milp_objective), 1.0), 4)
 
+
+def _build_meal_model(
+    pool: pd.DataFrame,
+    target_cal: float,
+    macro_target: dict,
+    max_items: int,
+    min_items: int,
+    cal_band: float = CAL_BAND,
+    fiber_floor: float = FIBER_FLOOR,
+):
+    prob = LpProblem("meal", LpMinimize)
+    x, y, rows, objective = _add_meal_terms(prob, pool, target_cal, macro_target, max_items, min_items,
+                                            cal_band, fiber_floor)
+    prob += objective
+    return prob, x, y, rows
+
+
+def _add_meal_terms(
+    prob: LpProblem,
+    pool: pd.DataFrame,
+    target_cal: float,
+    macro_target: dict,
+    max_items: int,
+    min_items: int,
+    cal_band: float = CAL_BAND,
+    fiber_floor: float = FIBER_FLOOR,
+    prefix: str = "",
+):
+    """
+    Add one meal's variables and constraints to `prob`
+
+    Returns (x, y, rows, objective); variable and constraint names start
+    with `prefix`, so several meals can share one problem. The constraints
+    that hold targets are named (see MealModel.set_targets).
+    """
     rows = pool.reset_index(drop=True)
 
     # arrays (per-portion = grams_per_portion/100 scaling)
-    cal = []
-    pro = []
-    fat = []
-    carb = []
-    fib = []
-
-    for _, r in rows.iterrows():
-        gpp = float(r["grams_per_portion"])
-        scale = gpp / 100.0
-
-        cal.append(float(r["calories"]) * scale)
-        pro.append(float(r["protein"])  * scale)
-        fat.append(float(r["fat"])      * scale)
-        carb.append(float(r["carbs"])   * scale)
-        fib.append(float(r.get("fiber", 0.0)) * scale)
-
-    n = len(rows)
-    solver = PULP_CBC_CMD(msg=0, timeLimit=10)
-
-    x = {i: LpVariable(f"x{i}", lowBound=0, upBound=1.5) for i in range(n)}
-    y = {i: LpVariable(f"y{i}", cat="Binary") for i in range(n)}
-
-    T_cal  = lpSum(cal[i]  * x[i] for i in range(n))
-    T_pro  = lpSum(pro[i]  * x[i] for i in range(n))
-    T_fat  = lpSum(fat[i]  * x[i] for i in range(n))
-    T_carb = lpSum(carb[i] * x[i] for i in range(n))
-    T_fib  = lpSum(fib[i]  * x[i] for i in range(n))
+    M = _portion_matrix(rows)
+    cal, pro, fat, carb, fib = (M[:, j].tolist() for j in range(len(NUTRIENTS)))
+
+    # one candidate per lead (every row without a "lead" column); x is in
+    # portions of the lead, y the number of its members used
+    members = _lead_members(rows)
+    caps = {i: _copy_caps(M[:, 0], m) for i, m in members.items()}
+    x = {i: LpVariable(f"{prefix}x{i}", lowBound=0, upBound=MAX_PORTIONS * caps[i][-1]) for i in members}
+    y = {
+        i: LpVariable(f"{prefix}y{i}", cat="Binary") if len(caps[i]) == 1 else
+        LpVariable(f"{prefix}y{i}", lowBound=0, upBound=len(caps[i]), cat="Integer")
+        for i in members
+    }
 
-    prob = LpProblem("meal", LpMinimize)
+    T_cal  = lpSum(cal[i]  * x[i] for i in x)
+    T_pro  = lpSum(pro[i]  * x[i] for i in x)
+    T_fat  = lpSum(fat[i]  * x[i] for i in x)
+    T_carb = lpSum(carb[i] * x[i] for i in x)
+    T_fib  = lpSum(fib[i]  * x[i] for i in x)
 
-    for i in range(n):
-        prob += x[i] <= 1.5 * y[i]
+    for i in x:
+        # k members hold up to MAX_PORTIONS * caps[k - 1] lead portions;
+        # the caps are concave in k, so one line per segment is exact
+        prev = 0.0
+        for k, cap in enumerate(caps[i]):
+            prob += x[i] <= MAX_PORTIONS * (prev + (cap - prev) * (y[i] - k))
+            prev = cap
 
     # calorie band (reasonable)
-    prob += T_cal >= target_cal * 0.90
-    prob += T_cal <= target_cal * 1.10
+    prob += T_cal >= target_cal * (1 - cal_band), f"{prefix}cal_lo"
+    prob += T_cal <= target_cal * (1 + cal_band), f"{prefix}cal_hi"
 
     # minimum fiber (relaxed)
-    prob += T_fib >= macro_target["fiber_g"] * 0.30
+    prob += T_fib >= macro_target["fiber_g"] * fiber_floor, f"{prefix}fib_floor"
 
-    prob += lpSum(y[i] for i in range(n)) >= min_items
-    prob += lpSum(y[i] for i in range(n)) <= max_items
+    prob += lpSum(y.values()) >= min_items, f"{prefix}items_min"
+    prob += lpSum(y.values()) <= max_items, f"{prefix}items_max"
 
     # deviation vars
-    cal_o  = LpVariable("cal_o",  lowBound=0)
-    cal_u  = LpVariable("cal_u",  lowBound=0)
-    pro_o  = LpVariable("pro_o",  lowBound=0)
-    pro_u  = LpVariable("pro_u",  lowBound=0)
-    fat_o  = LpVariable("fat_o",  lowBound=0)
-    fat_u  = LpVariable("fat_u",  lowBound=0)
-    carb_o = LpVariable("carb_o", lowBound=0)
-    carb_u = LpVariable("carb_u", lowBound=0)
-    fib_u  = LpVariable("fib_u",  lowBound=0)
-
-    prob += T_cal  == float(target_cal)                + cal_o  - cal_u
-    prob += T_pro  == float(macro_target["protein_g"]) + pro_o  - pro_u
-    prob += T_fat  == float(macro_target["fat_g"])     + fat_o  - fat_u
-    prob += T_carb == float(macro_target["carbs_g"])   + carb_o - carb_u
-    prob += T_fib  == float(macro_target["fiber_g"])   + 0      - fib_u
+    cal_o  = LpVariable(f"{prefix}cal_o",  lowBound=0)
+    cal_u  = LpVariable(f"{prefix}cal_u",  lowBound=0)
+    pro_o  = LpVariable(f"{prefix}pro_o",  lowBound=0)
+    pro_u  = LpVariable(f"{prefix}pro_u",  lowBound=0)
+    fat_o  = LpVariable(f"{prefix}fat_o",  lowBound=0)
+    fat_u  = LpVariable(f"{prefix}fat_u",  lowBound=0)
+    carb_o = LpVariable(f"{prefix}carb_o", lowBound=0)
+    carb_u = LpVariable(f"{prefix}carb_u", lowBound=0)
+    fib_u  = LpVariable(f"{prefix}fib_u",  lowBound=0)
+
+    prob += T_cal  == float(target_cal)                + cal_o  - cal_u,  f"{prefix}cal_dev"
+    prob += T_pro  == float(macro_target["protein_g"]) + pro_o  - pro_u,  f"{prefix}pro_dev"
+    prob += T_fat  == float(macro_target["fat_g"])     + fat_o  - fat_u,  f"{prefix}fat_dev"
+    prob += T_carb == float(macro_target["carbs_g"])   + carb_o - carb_u, f"{prefix}carb_dev"
+    prob += T_fib  == float(macro_target["fiber_g"])   + 0      - fib_u,  f"{prefix}fib_dev"
 
     # objective weights
-    prob += (
-        1.0 * (cal_o  + cal_u) +
-        1.1 * (carb_o + carb_u) +
-        1.5 * (pro_o  + pro_u) +
-        0.7 * (fat_o  + fat_u) +
-        1.0 * fib_u
+    w_cal, w_pro, w_fat, w_carb = OBJECTIVE_WEIGHTS.tolist()
+    objective = (
+        w_cal  * (cal_o  + cal_u) +
+        w_carb * (carb_o + carb_u) +
+        w_pro  * (pro_o  + pro_u) +
+        w_fat  * (fat_o  + fat_u) +
+        FIBER_WEIGHT * fib_u
     )
 
-    prob.solve(solver)
-    if LpStatus[prob.status] != "Optimal":
-        return None
+    return x, y, rows, objective
+
+
+def _set_warm_start(rows: pd.DataFrame, x: dict, y: dict, warm_start: dict):
+    """Initial values for CBC: the warm-start foods at their portions, all others 0"""
+    ids = rows["food_id"].astype(str).tolist()
+    kcal = _portion_matrix(rows)[:, 0]
+    for i, members in _lead_members(rows).items():
+        amount, copies = 0.0, 0
+        for j in members:
+            portions = min(float(warm_start.get(ids[j], 0.0)), MAX_PORTIONS)
+            if portions > 0:
+                amount += portions * kcal[j] / max(float(kcal[i]), 1e-9)
+                copies += 1
+        x[i].setInitialValue(amount)
+        y[i].setInitialValue(copies)
+
+
+def _portion_matrix(rows: pd.DataFrame) -> np.ndarray:
+    """Per-portion nutrients, shape (n, 5) in NUTRIENTS order"""
+    scale = rows["grams_per_portion"].to_numpy(dtype=float) / 100.0
+    cols = [rows[c].to_numpy(dtype=float) if c in rows.columns else np.zeros(len(rows))
+            for c in NUTRIENTS]
+    return np.column_stack(cols) * scale[:, None]
+
+
+def _realized_objective(rows: pd.DataFrame, portions: list, target_cal: float, macro_target: dict) -> float:
+    """meal_objective of the foods at the given portions"""
+    totals = np.asarray(portions, dtype=float) @ _portion_matrix(rows)
+    return round(float(meal_objective(totals, target_cal, macro_target)), 4)
+
+
+def _lead_members(rows: pd.DataFrame) -> dict:
+    """
+    Lead row -> the rows it stands for (itself first, then by calories per
+    portion), from the pool's "lead" column; each row leads itself without one
+
+    The first row of a group leads it, so a subset of a pool without its
+    lead food is led by the next member.
+    """
+    if "lead" not in rows.columns:
+        return {i: [i] for i in range(len(rows))}
+    first, members = {}, {}
+    for i, lead in enumerate(rows["lead"].astype(str)):
+        members.setdefault(first.setdefault(lead, i), []).append(i)
+    return members
+
+
+def _copy_caps(kcal: np.ndarray, members: list) -> list:
+    """Cumulative capacity of the first 1, 2, ... members, in portions of the first (per MAX_PORTIONS)"""
+    ratios = kcal[members] / max(float(kcal[members[0]]), 1e-9)
+    ratios[0] = 1.0
+    return np.cumsum(ratios).tolist()
+
+
+def _lead_portions(rows: pd.DataFrame, x: dict, y: dict) -> list:
+    """
+    Portions per row of a solution: each lead's amount goes to its first y
+    members in equal portions (which keeps every one within MAX_PORTIONS)
+    """
+    kcal = _portion_matrix(rows)[:, 0]
+    portions = [0.0] * len(rows)
+    for i, members in _lead_members(rows).items():
+        amount = value(x[i]) or 0.0
+        copies = min(max(int(round(value(y[i]) or 0.0)), 1), len(members))
+        if amount <= 0:
+            continue
+        each = amount / _copy_caps(kcal, members)[copies - 1]
+        for j in members[:copies]:
+            portions[j] = each
+    return portions
+
 
+def pool_candidates(pool: pd.DataFrame) -> int:
+    """Number of MILP candidates in a pool (its leads)"""
+    return int(pool["lead"].nunique()) if "lead" in pool.columns else len(pool)
+
+
+def meal_objective(totals, target_cal: float, macro_target: dict):
+    """
+    The MILP objective for given meal totals (NUTRIENTS order)
+
+    Weighted absolute deviation from the calorie and macro targets plus the
+    fiber shortfall; `totals` may be a vector or a (..., 5) array.
+    """
+    T = np.asarray(totals, dtype=float)
+    t = np.array([target_cal, macro_target["protein_g"], macro_target["fat_g"], macro_target["carbs_g"]])
+    dev = np.abs(T[..., :4] - t) @ OBJECTIVE_WEIGHTS
+    return dev + np.maximum(float(macro_target["fiber_g"]) - T[..., 4], 0.0) * FIBER_WEIGHT
+
+
+def _extract_items(rows: pd.DataFrame, portions_list) -> list:
     result = []
-    for i in range(n):
-        portions = value(x[i])
+    for i, portions in enumerate(portions_list):
         if portions is None or portions < 0.01:
             continue
 
@@ -323,65 +575,536 @@ def solve_one_meal(
             "fiber":        round(float(r.get("fiber", 0.0)) * sc, 1),
         })
 
-    return result if result else None
+    return result
+
+
+# ---------------------------
+# feasibility pre-check + relaxation ladder
+# ---------------------------
+
+def precheck_meal(
+    pool: pd.DataFrame,
+    target_cal: float,
+    macro_target: dict,
+    min_items: int,
+    max_items: int,
+    cal_band: float = CAL_BAND,
+    fiber_floor: float = FIBER_FLOOR,
+):
+    """
+    Necessary conditions for the meal MILP, from per-food bounds
+
+    Returns None if the meal may be feasible, else the reason: EMPTY_POOL,
+    TOO_FEW_FOODS, CALORIES_UNREACHABLE (the max_items most caloric foods
+    at MAX_PORTIONS miss the band), FIBER_UNREACHABLE (same for the fiber
+    floor) or FIBER_OVER_CAP (the calorie floor needs more fiber than the
+    fiber target, which the model caps).
+    """
+    n = len(pool)
+    if n == 0:
+        return "EMPTY_POOL"
+    if n < min_items:
+        return "TOO_FEW_FOODS"
+
+    M = _portion_matrix(pool)
+    k = min(max_items, n)
+    lo = target_cal * (1 - cal_band)
+    fib_t = float(macro_target["fiber_g"])
+
+    if np.partition(M[:, 0], n - k)[n - k:].sum() * MAX_PORTIONS < lo:
+        return "CALORIES_UNREACHABLE"
+    if np.partition(M[:, 4], n - k)[n - k:].sum() * MAX_PORTIONS < fib_t * fiber_floor:
+        return "FIBER_UNREACHABLE"
+    if lo * (M[:, 4] / M[:, 0]).min() > fib_t * (1 + 1e-6):
+        return "FIBER_OVER_CAP"
+    return None
+
+
+def relaxation_attempts(ladder):
+    """
+    The base attempt, then one attempt per ladder step with all steps so
+    far applied (widen_band, lower_fiber, extra_item, unfiltered_pool)
+    """
+    attempt = {"relaxed": [], "cal_band": CAL_BAND, "fiber_floor": FIBER_FLOOR,
+               "extra_items": 0, "unfiltered_pool": False}
+    yield dict(attempt)
+
+    for step in ladder:
+        if step == "widen_band":
+            attempt["cal_band"] = RELAXED_CAL_BAND
+        elif step == "lower_fiber":
+            attempt["fiber_floor"] = RELAXED_FIBER_FLOOR
+        elif step == "extra_item":
+            attempt["extra_items"] += 1
+        elif step == "unfiltered_pool":
+            attempt["unfiltered_pool"] = True
+        attempt["relaxed"] = attempt["relaxed"] + [step]
+        yield dict(attempt)
 
 
 # ---------------------------
 # full day builder
 # ---------------------------
 
+def _slot_macro(targets: dict, frac: float) -> dict:
+    return {
+        "protein_g": float(targets["protein_g"]) * frac,
+        "fat_g":     float(targets["fat_g"])     * frac,
+        "carbs_g":   float(targets["carbs_g"])   * frac,
+        "fiber_g":   float(targets["fiber_g"])   * frac,
+    }
+
+
+def _solve_slots(
+    catalog,
+    allowed: np.ndarray,
+    slot_targets: dict,
+    plan: dict,
+    used_ids: set,
+    deadline: Deadline = None,
+    max_candidates: int = None,
+    mode: str = "exact",
+    report_gap: bool = False,
+    rotation: int = 0,
+    warm_starts: dict = None,
+    locked: dict = None,
+    ladder=None,
+    backend: str = None,
+):
+    """
+    Solve the given slots in order, filling plan["meals"] and warnings
+
+    slot_targets maps slot -> (meal calories, macro targets, min items,
+    max items) for the foods to add; `locked` maps slot -> items that stay
+    in that slot, and `warm_starts` slot -> {food_id: portions} to seed
+    the MILP with. Returns the summed objectives of the solved slots.
+
+    Each slot is first checked with precheck_meal; hopeless or infeasible
+    slots are retried down the relaxation `ladder` (default
+    RELAXATION_LADDER) and the steps used go to plan["relaxations"].
+    """
+    max_candidates = max_candidates or MAX_CANDIDATES_PER_MEAL
+    warm_starts = warm_starts or {}
+    locked = locked or {}
+    ladder = RELAXATION_LADDER if ladder is None else ladder
+    objective = {"objective": 0.0, "milp_objective": 0.0}
+
+    for slot, (meal_cal, macro, min_i, max_i) in slot_targets.items():
+        pool_name = MEAL_CONFIG[slot][3]
+        kept_items = list(locked.get(slot, []))
+        warm = warm_starts.get(slot)
+
+        budget = deadline.next_share() if deadline is not None else None
+        # heuristic and MILP solve times scale differently with the pool
+        sizer_key = pool_name if mode == "exact" else f"{pool_name}:{mode}"
+        k = POOL_SIZER.choose(sizer_key, budget, max_candidates)
+        time_limit = None
+        if budget is not None:
+            time_limit = min(LP_SOLVER_TIMEOUT, max(budget, MIN_TIME_LIMIT))
+
+        pools = {}
+        items, status, relaxed, info = None, "INFEASIBLE", [], {}
+        for attempt in relaxation_attempts(ladder):
+            unfiltered = attempt["unfiltered_pool"]
+            if unfiltered not in pools:
+                with stage("pool"):
+                    pool = catalog.pool(pool_name, allowed, exclude_ids=used_ids, max_candidates=k,
+                                        rotation=rotation, slot_rules=not unfiltered)
+                    if warm:
+                        pool = catalog.with_foods(pool, warm.keys(), allowed, exclude_ids=used_ids)
+                pools[unfiltered] = pool
+                if not unfiltered:
+                    POOL_SIZE.observe(pool_candidates(pool), slot=slot)
+            pool = pools[unfiltered]
+            max_items = max_i + attempt["extra_items"]
+
+            with stage("precheck"):
+                reason = precheck_meal(pool, meal_cal, macro, min_i, max_items,
+                                       attempt["cal_band"], attempt["fiber_floor"])
+            if reason is not None:
+                status = reason
+                record_solve({"slot": slot, "candidates": pool_candidates(pool), "status": reason,
+                              "relaxed": attempt["relaxed"]})
+                continue
+
+            info = {"slot": slot, "relaxed": attempt["relaxed"]}
+            items = solve_one_meal(pool, meal_cal, macro, max_items=max_items, min_items=min_i,
+                                   info=info, time_limit=time_limit, mode=mode, report_gap=report_gap,
+                                   warm_start=warm, cal_band=attempt["cal_band"],
+                                   fiber_floor=attempt["fiber_floor"], backend=backend)
+            POOL_SIZER.observe(sizer_key, pool_candidates(pool), info.get("solve_time_s"),
+                               info.get("time_limit_hit", False))
+            if items is not None:
+                relaxed = attempt["relaxed"]
+                break
+            # no incumbent within the time limit: relaxing will not buy more time
+            if info.get("status") == "Not Solved":
+                status = "TIMEOUT"
+                break
+            status = "INFEASIBLE"
+
+        if not _record_slot(plan, slot, items, status, relaxed, info, kept_items):
+            continue
+
+        objective["objective"] += info.get("objective", 0.0)
+        if report_gap and objective["milp_objective"] is not None:
+            milp = info.get("milp_objective", info.get("objective") if mode == "exact" else None)
+            objective["milp_objective"] = None if milp is None else objective["milp_objective"] + milp
+        used_ids.update(it["food_id"] for it in items)
+
+    return objective
+
+
+def _record_slot(plan: dict, slot: str, items, status: str, relaxed: list, info: dict,
+                 kept_items: list = ()) -> bool:
+    """Put a slot's outcome in the plan (meals, warnings, relaxations); False if unsolved"""
+    if items is None:
+        plan["meals"][slot] = list(kept_items)
+        plan["warnings"].append(f"⚠️ {slot}: {status}")
+        SOLVER_STATUS.inc(status=status)
+        return False
+
+    SOLVER_STATUS.inc(status="Relaxed" if relaxed else "Optimal")
+    if relaxed:
+        plan.setdefault("relaxations", {})[slot] = relaxed
+        plan["warnings"].append(f"⚠️ {slot}: solved with relaxation ({', '.join(relaxed)})")
+    if info.get("time_limit_hit"):
+        plan["warnings"].append(
+            f"⚠️ {slot}: TIME_LIMIT after {info['time_limit_s']}s, best plan found so far"
+        )
+    plan["meals"][slot] = list(kept_items) + items
+    return True
+
+
+def _finish_plan(plan: dict, objective: dict, mode: str, report_gap: bool) -> dict:
+    """Day totals over all meals, plus the "solver" section"""
+    grand = {"calories": 0.0, "protein": 0.0, "fat": 0.0, "carbs": 0.0, "fiber": 0.0}
+    for items in plan["meals"].values():
+        for it in items:
+            for n in grand:
+                grand[n] += float(it.get(n, 0.0))
+
+    plan["meals"] = {slot: plan["meals"][slot] for slot in MEAL_CONFIG if slot in plan["meals"]}
+    plan["totals"] = {k: round(v, 2) for k, v in grand.items()}
+    plan["solver"] = {"mode": mode, "objective": round(objective["objective"], 4)}
+    if report_gap:
+        milp = objective["milp_objective"]
+        plan["solver"]["milp_objective"] = None if milp is None else round(milp, 4)
+        plan["solver"]["gap"] = objective_gap(objective["objective"], milp)
+    return plan
+
+
 def build_day(
-    foods_df: pd.DataFrame,
+    foods,
     targets: dict,
     allergies=None,
     conditions=None,
+    deadline: Deadline = None,
+    max_candidates: int = None,
+    mode: str = "exact",
+    report_gap: bool = False,
+    rotation: int = 0,
+    backend: str = None,
 ):
-    allergies = allergies or []
-    conditions = conditions or []
-
-    foods_df = _ensure_required_cols(foods_df)
-    filtered = filter_by_user(foods_df, allergies, conditions)
+    """
+    Build one day of meals, solving the MEAL_CONFIG slots in order
+
+    With a `deadline`, each slot gets its share of the remaining time as the
+    CBC time limit, and its pool size is chosen by POOL_SIZER to fit that
+    share (never above `max_candidates`, default MAX_CANDIDATES_PER_MEAL).
+    Slots whose solve hit the time limit keep the best incumbent and add a
+    TIME_LIMIT warning.
+
+    `mode` and `report_gap` are passed to solve_one_meal; the plan's
+    "solver" section sums the objectives of the planned meals (and, with
+    report_gap, their MILP objectives and the relative gap). `backend` picks
+    the PuLP solver for exact mode (default LP_SOLVER_BACKEND).
+
+    `foods` is a PreparedCatalog (normalized once, dominance-pruned slot
+    pools) or a raw foods DataFrame, which is prepared on the fly. Pools
+    are deterministic; `rotation` (e.g. the day of a week) picks different
+    foods from each nutrient cluster.
+    """
+    from src.optimizer.catalog import as_catalog
+
+    catalog = as_catalog(foods)
+    with stage("filter"):
+        allowed = catalog.user_mask(allergies or [], conditions or [])
 
     total_cal = float(targets.get("calories", targets.get("calories_kcal", 0.0)))
+    slot_targets = {
+        slot: (total_cal * cal_frac, _slot_macro(targets, cal_frac), min_i, max_i)
+        for slot, (cal_frac, min_i, max_i, _) in MEAL_CONFIG.items()
+    }
 
     plan = {"meals": {}, "totals": {}, "warnings": []}
-    used_ids = set()
-    grand = {"calories": 0.0, "protein": 0.0, "fat": 0.0, "carbs": 0.0, "fiber": 0.0}
+    objective = _solve_slots(catalog, allowed, slot_targets, plan, set(), deadline=deadline,
+                             max_candidates=max_candidates, mode=mode, report_gap=report_gap,
+                             rotation=rotation, backend=backend)
+    return _finish_plan(plan, objective, mode, report_gap)
 
-    for slot, (cal_frac, min_i, max_i, pool_name) in MEAL_CONFIG.items():
-        meal_cal = total_cal * cal_frac
 
-        macro = {
-            "protein_g": float(targets["protein_g"]) * cal_frac,
-            "fat_g":     float(targets["fat_g"])     * cal_frac,
-            "carbs_g":   float(targets["carbs_g"])   * cal_frac,
-            "fiber_g":   float(targets["fiber_g"])   * cal_frac,
-        }
-
-        pool = get_pool(filtered, pool_name, max_candidates=250)
-        pool = pool[~pool["food_id"].isin(used_ids)].reset_index(drop=True)
-
-        if pool.empty:
-            plan["meals"][slot] = []
-            plan["warnings"].append(f"⚠️ {slot}: EMPTY_POOL")
-            continue
+def replan_day(
+    foods,
+    targets: dict,
+    previous_plan: dict,
+    locked_slots=None,
+    locked_items=None,
+    allergies=None,
+    conditions=None,
+    deadline: Deadline = None,
+    max_candidates: int = None,
+    mode: str = "exact",
+):
+    """
+    Re-solve only the unlocked MEAL_CONFIG slots of an existing day plan
+
+    Locked slots keep all their items; locked items (food_ids) stay in
+    their slot while the rest of it is re-solved. Locked nutrients are
+    subtracted from the day targets and the remainder is split over the
+    re-solved slots by their calorie fractions; locked food_ids are
+    excluded from the new meals. Each slot's previous foods are added to
+    its pool and, in exact mode, passed to CBC as a warm start.
+
+    The plan's "replanned" lists the slots that were solved again.
+    """
+    from src.optimizer.catalog import as_catalog
+
+    locked_slots = set(locked_slots or [])
+    locked_items = {str(i) for i in (locked_items or [])}
+    previous = previous_plan.get("meals", previous_plan)
+
+    catalog = as_catalog(foods)
+    with stage("filter"):
+        allowed = catalog.user_mask(allergies or [], conditions or [])
+
+    kept = {}
+    for slot in MEAL_CONFIG:
+        items = previous.get(slot, []) or []
+        kept[slot] = items if slot in locked_slots else \
+            [it for it in items if str(it["food_id"]) in locked_items]
 
-        items = solve_one_meal(pool, meal_cal, macro, max_items=max_i, min_items=min_i)
+    total_cal = float(targets.get("calories", targets.get("calories_kcal", 0.0)))
+    day = {"calories": total_cal, "protein": float(targets["protein_g"]), "fat": float(targets["fat_g"]),
+           "carbs": float(targets["carbs_g"]), "fiber": float(targets["fiber_g"])}
+    for items in kept.values():
+        for it in items:
+            for n in day:
+                day[n] -= float(it.get(n, 0.0))
+    remaining = {k: max(v, 0.0) for k, v in day.items()}
+
+    open_slots = [s for s in MEAL_CONFIG if s not in locked_slots]
+    frac_total = sum(MEAL_CONFIG[s][0] for s in open_slots) or 1.0
+    remaining_targets = {
+        "protein_g": remaining["protein"], "fat_g": remaining["fat"],
+        "carbs_g": remaining["carbs"], "fiber_g": remaining["fiber"],
+    }
 
-        if items is None:
-            plan["meals"][slot] = []
-            plan["warnings"].append(f"⚠️ {slot}: INFEASIBLE")
+    plan = {"meals": {s: kept[s] for s in locked_slots if s in MEAL_CONFIG}, "totals": {}, "warnings": []}
+    slot_targets, warm_starts = {}, {}
+    for slot in open_slots:
+        _, min_i, max_i, _ = MEAL_CONFIG[slot]
+        n_locked = len(kept[slot])
+        if n_locked >= max_i or remaining["calories"] <= 0:
+            plan["meals"][slot] = kept[slot]
             continue
+        frac = MEAL_CONFIG[slot][0] / frac_total
+        slot_targets[slot] = (remaining["calories"] * frac, _slot_macro(remaining_targets, frac),
+                              max(min_i - n_locked, 1), max_i - n_locked)
+        warm_starts[slot] = {
+            str(it["food_id"]): float(it["portions"])
+            for it in previous.get(slot, []) or [] if str(it["food_id"]) not in locked_items
+        }
+    if open_slots and remaining["calories"] <= 0:
+        plan["warnings"].append("⚠️ locked items already cover the day's calories")
+
+    used_ids = {str(it["food_id"]) for items in kept.values() for it in items}
+    objective = _solve_slots(catalog, allowed, slot_targets, plan, used_ids, deadline=deadline,
+                             max_candidates=max_candidates, mode=mode,
+                             warm_starts=warm_starts, locked=kept)
+    plan = _finish_plan(plan, objective, mode, False)
+    plan["replanned"] = list(slot_targets)
+    return plan
 
-        for it in items:
-            used_ids.add(it["food_id"])
-            grand["calories"] += float(it["calories"])
-            grand["protein"]  += float(it["protein"])
-            grand["fat"]      += float(it["fat"])
-            grand["carbs"]    += float(it["carbs"])
-            grand["fiber"]    += float(it["fiber"])
 
-        plan["meals"][slot] = items
+# ---------------------------
+# target sweeps (parametric re-solves)
+# ---------------------------
 
-    plan["totals"] = {k: round(v, 2) for k, v in grand.items()}
-    return plan
+class MealModel:
+    """
+    One meal's MILP, built once and re-solved for new targets
+
+    The candidate pool, portion matrix and PuLP expressions are built once;
+    set_targets() only changes the right-hand sides of the named target
+    constraints (calorie band, fiber floor, item count, macro targets) and
+    exclude() the bounds of foods used elsewhere in the day. Each solve
+    after the first is warm-started from the previous solution.
+    """
+
+    def __init__(self, pool: pd.DataFrame, max_items: int, min_items: int):
+        self.prob = LpProblem("meal", LpMinimize)
+        zero = {"protein_g": 0.0, "fat_g": 0.0, "carbs_g": 0.0, "fiber_g": 0.0}
+        self.x, self.y, self.rows, objective = _add_meal_terms(self.prob, pool, 0.0, zero,
+                                                               max_items, min_items)
+        self.prob += objective
+        self.ids = self.rows["food_id"].astype(str).to_numpy()
+        self.excluded = np.zeros(len(self.rows), dtype=bool)
+        self.members = _lead_members(self.rows)
+        kcal = _portion_matrix(self.rows)[:, 0]
+        self.caps = {i: _copy_caps(kcal, m) for i, m in self.members.items()}
+        self.targets = (0.0, zero)
+        self.solves = 0
+
+    def set_targets(self, target_cal: float, macro_target: dict, max_items: int,
+                    cal_band: float = CAL_BAND, fiber_floor: float = FIBER_FLOOR):
+        c = self.prob.constraints
+        c["cal_lo"].changeRHS(target_cal * (1 - cal_band))
+        c["cal_hi"].changeRHS(target_cal * (1 + cal_band))
+        c["fib_floor"].changeRHS(macro_target["fiber_g"] * fiber_floor)
+        c["items_max"].changeRHS(max_items)
+        c["cal_dev"].changeRHS(float(target_cal))
+        c["pro_dev"].changeRHS(float(macro_target["protein_g"]))
+        c["fat_dev"].changeRHS(float(macro_target["fat_g"]))
+        c["carb_dev"].changeRHS(float(macro_target["carbs_g"]))
+        c["fib_dev"].changeRHS(float(macro_target["fiber_g"]))
+        self.targets = (target_cal, macro_target)
+
+    def exclude(self, food_ids: set):
+        """Fix the given foods at 0 (used in an earlier slot); all others are free again"""
+        self.excluded = np.isin(self.ids, list(food_ids))
+        for i, members in self.members.items():
+            # a lead may only use its members up to the first excluded one
+            copies = next((k for k, j in enumerate(members) if self.excluded[j]), len(members))
+            self.excluded[members[copies:]] = True
+            self.x[i].upBound = MAX_PORTIONS * self.caps[i][copies - 1] if copies else 0
+            self.y[i].upBound = copies
+            if (self.y[i].varValue or 0) > copies:
+                # keep the warm start feasible
+                self.x[i].setInitialValue(0)
+                self.y[i].setInitialValue(0)
+
+    @property
+    def pool(self) -> pd.DataFrame:
+        """The candidates that are not excluded (for precheck_meal)"""
+        return self.rows[~self.excluded]
+
+    def solve(self, info: dict, time_limit: float = None, backend: str = None):
+        """Items of the optimal meal for the current targets, or None; fills `info` like solve_one_meal"""
+        warm = self.solves > 0
+        time_limit = time_limit or LP_SOLVER_TIMEOUT
+        with stage("solve"):
+            t0 = time.perf_counter()
+            self.prob.solve(make_solver(backend, time_limit, warm_start=warm))
+            solve_time = time.perf_counter() - t0
+        self.solves += 1
+
+        info.update({
+            "candidates": sum(1 for i in self.members if not self.excluded[i]),
+            "mode": "exact",
+            "backend": backend or LP_SOLVER_BACKEND,
+            "status": LpStatus[self.prob.status],
+            "objective": round(float(value(self.prob.objective) or 0.0), 4),
+            "solve_time_s": round(solve_time, 4),
+            "time_limit_s": round(float(time_limit), 3),
+            "time_limit_hit": self.prob.sol_status == LpSolutionIntegerFeasible,
+            "warm_start": warm,
+        })
+        record_solve(info)
+        if LpStatus[self.prob.status] != "Optimal":
+            return None
+        with stage("extract"):
+            portions = _lead_portions(self.rows, self.x, self.y)
+            result = _extract_items(self.rows, portions)
+        info["objective"] = _realized_objective(self.rows, portions, *self.targets)
+        return result or None
+
+
+def sweep_day(
+    foods,
+    targets_list: list,
+    allergies=None,
+    conditions=None,
+    deadline: Deadline = None,
+    max_candidates: int = None,
+    ladder=None,
+    backend: str = None,
+) -> list:
+    """
+    Daily plans for a series of day targets (e.g. a calorie sweep)
+
+    The slot pools and a MealModel per slot are built once; each target
+    point only updates the models' right-hand sides and re-solves them,
+    warm-started from the previous point. Returns one plan per entry of
+    `targets_list`, as build_day does in exact mode.
+
+    Foods used in an earlier slot are excluded by their bounds, so the
+    pools do not shrink with the day as in build_day. Relaxation uses the
+    ladder steps that only change right-hand sides (all but
+    unfiltered_pool). With a `deadline`, pool sizes are chosen for the
+    average share of one solve and each solve gets its share as the time
+    limit.
+    """
+    from src.optimizer.catalog import as_catalog
+
+    max_candidates = max_candidates or MAX_CANDIDATES_PER_MEAL
+    ladder = [s for s in (RELAXATION_LADDER if ladder is None else ladder) if s != "unfiltered_pool"]
+    catalog = as_catalog(foods)
+    with stage("filter"):
+        allowed = catalog.user_mask(allergies or [], conditions or [])
+
+    models = {}
+    for slot, (_, min_i, max_i, pool_name) in MEAL_CONFIG.items():
+        share = deadline.seconds / deadline.parts_left if deadline is not None else None
+        k = POOL_SIZER.choose(pool_name, share, max_candidates)
+        with stage("pool"):
+            pool = catalog.pool(pool_name, allowed, max_candidates=k)
+        POOL_SIZE.observe(pool_candidates(pool), slot=slot)
+        with stage("model_build"):
+            models[slot] = MealModel(pool, max_i, min_i) if not pool.empty else None
+
+    plans = []
+    for targets in targets_list:
+        total_cal = float(targets.get("calories", targets.get("calories_kcal", 0.0)))
+        plan = {"meals": {}, "totals": {}, "warnings": []}
+        objective = {"objective": 0.0, "milp_objective": None}
+        used_ids = set()
+
+        for slot, (cal_frac, min_i, max_i, pool_name) in MEAL_CONFIG.items():
+            meal_cal, macro = total_cal * cal_frac, _slot_macro(targets, cal_frac)
+            model = models[slot]
+            budget = deadline.next_share() if deadline is not None else None
+            time_limit = min(LP_SOLVER_TIMEOUT, max(budget, MIN_TIME_LIMIT)) if budget is not None else None
+
+            items, status, relaxed, info = None, "EMPTY_POOL", [], {}
+            if model is not None:
+                model.exclude(used_ids)
+            for attempt in relaxation_attempts(ladder) if model is not None else ():
+                max_items = max_i + attempt["extra_items"]
+                with stage("precheck"):
+                    reason = precheck_meal(model.pool, meal_cal, macro, min_i, max_items,
+                                           attempt["cal_band"], attempt["fiber_floor"])
+                if reason is not None:
+                    status = reason
+                    record_solve({"slot": slot, "candidates": len(model.pool), "status": reason,
+                                  "relaxed": attempt["relaxed"]})
+                    continue
+
+                model.set_targets(meal_cal, macro, max_items, attempt["cal_band"], attempt["fiber_floor"])
+                info = {"slot": slot, "relaxed": attempt["relaxed"]}
+                items = model.solve(info, time_limit, backend)
+                POOL_SIZER.observe(pool_name, info["candidates"], info["solve_time_s"], info["time_limit_hit"])
+                if items is not None:
+                    relaxed = attempt["relaxed"]
+                    break
+                if info["status"] == "Not Solved":
+                    status = "TIMEOUT"
+                    break
+                status = "INFEASIBLE"
+
+            if _record_slot(plan, slot, items, status, relaxed, info):
+                objective["objective"] += info.get("objective", 0.0)
+                used_ids.update(it["food_id"] for it in items)
+
+        plans.append(_finish_plan(plan, objective, "exact", False))
+    return plans
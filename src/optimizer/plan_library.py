@@ -0,0 +1,277 @@
+"""
+Precomputed plan library
+
+Most requests fall into a few target buckets: the day's calories rounded
+to CAL_STEP, the protein/fat/carbs energy split rounded to SPLIT_STEP
+percent and the fiber target rounded to FIBER_STEP. The offline job
+(src/pipelines/plan_library_builder.py, `python main.py plan-library`)
+solves one exact day per frequent (bucket, restriction signature) and
+stores each meal's foods and portions under "bucket|signature|slot".
+
+A request finds its own bucket by rounding its targets, so each meal is
+one dict lookup. A library meal is rescaled to the request's meal
+calories, with nutrients from the current catalog, and served when its
+protein, fat and carbs are within PLAN_LIBRARY_TOLERANCE of the meal
+targets, the fiber floor holds and no portion exceeds MAX_PORTIONS. The
+other meals are solved live, without the library meals' foods.
+"""
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.config import PLAN_LIBRARY_JSON, PLAN_LIBRARY_TOLERANCE
+from src.metrics import REGISTRY, stage
+from src.optimizer.budget import Deadline
+from src.optimizer.lp_day_solver import (
+    ALLERGY_PATTERNS, FIBER_FLOOR, MAX_PORTIONS, MEAL_CONFIG, NUTRIENTS,
+    _extract_items, _finish_plan, _portion_matrix, _slot_macro, _solve_slots, meal_objective,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CAL_STEP = 50       # kcal
+SPLIT_STEP = 2      # percent of the day's calories
+FIBER_STEP = 5      # grams
+
+LIBRARY_LOOKUPS = REGISTRY.counter(
+    "planner_library_lookups_total",
+    "Plan library lookups per meal (hit, miss, out_of_tolerance, stale)", ["outcome"])
+
+# allergies with the same exclusion pattern share one name ("nuts" = "tree_nut")
+_ALLERGY_NAMES = {
+    name: min(other for other, p in ALLERGY_PATTERNS.items() if p == pattern)
+    for name, pattern in ALLERGY_PATTERNS.items()
+}
+
+
+# ---------------------------
+# keys
+# ---------------------------
+
+def restriction_signature(allergies: Optional[List[str]], conditions: Optional[List[str]]) -> str:
+    """Canonical name of a user's food exclusions: "none", "dairy", "dairy+diabetes", ..."""
+    names = {_ALLERGY_NAMES[a.lower()] for a in allergies or [] if a.lower() in _ALLERGY_NAMES}
+    if any("diabetes" in c.lower() for c in conditions or []):
+        names.add("diabetes")
+    return "+".join(sorted(names)) or "none"
+
+
+def signature_restrictions(signature: str) -> Tuple[List[str], List[str]]:
+    """(allergies, conditions) that have the given signature"""
+    names = [] if signature == "none" else signature.split("+")
+    return [n for n in names if n != "diabetes"], [n for n in names if n == "diabetes"]
+
+
+def target_bucket(targets: Dict) -> Tuple[str, Dict]:
+    """(bucket key, the bucket's center targets) for day targets"""
+    cal = float(targets.get("calories", targets.get("calories_kcal", 0.0)))
+    cal_b = int(round(cal / CAL_STEP)) * CAL_STEP
+    split = [float(targets[k]) * kcal_per_g * 100 / max(cal, 1.0)
+             for k, kcal_per_g in (("protein_g", 4), ("fat_g", 9), ("carbs_g", 4))]
+    p, f, c = (int(round(v / SPLIT_STEP)) * SPLIT_STEP for v in split)
+    fib = int(round(float(targets["fiber_g"]) / FIBER_STEP)) * FIBER_STEP
+    center = {
+        "calories": float(cal_b),
+        "protein_g": cal_b * p / 400,
+        "fat_g": cal_b * f / 900,
+        "carbs_g": cal_b * c / 400,
+        "fiber_g": float(fib),
+    }
+    return f"{cal_b}:{p}-{f}-{c}:{fib}", center
+
+
+def entry_key(bucket: str, signature: str, slot: str) -> str:
+    return f"{bucket}|{signature}|{slot}"
+
+
+def plan_entries(plan: Dict, bucket: str, signature: str) -> Dict[str, Dict]:
+    """
+    Library entries from an exact day plan; meals with a warning
+    (relaxed, time limit, unsolved) are left out
+    """
+    flagged = {w.replace("⚠️", "").split(":")[0].strip() for w in plan.get("warnings", [])}
+    entries = {}
+    for slot, items in plan.get("meals", {}).items():
+        if not items or slot in flagged:
+            continue
+        entries[entry_key(bucket, signature, slot)] = {
+            "calories": round(sum(float(it["calories"]) for it in items), 1),
+            "items": [{"food_id": str(it["food_id"]), "portions": float(it["portions"])} for it in items],
+        }
+    return entries
+
+
+# ---------------------------
+# library file
+# ---------------------------
+
+class PlanLibrary:
+    """Library meals by entry_key(), with the build's metadata"""
+
+    def __init__(self, entries: Dict[str, Dict], meta: Optional[Dict] = None):
+        self.entries = entries
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PlanLibrary":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        meta = data.get("meta", {})
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported plan library format {meta.get('format_version')}")
+        return cls(data.get("entries", {}), meta)
+
+    def save(self, path: Union[str, Path]):
+        """Written to a temp name and renamed, so readers never see a partial file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"meta": {**self.meta, "format_version": FORMAT_VERSION}, "entries": self.entries}, f)
+        tmp.replace(path)
+
+
+_loaded: Optional[Tuple[tuple, Optional[PlanLibrary]]] = None
+_load_lock = threading.Lock()
+
+
+def get_library(path: Optional[Union[str, Path]] = PLAN_LIBRARY_JSON) -> Optional[PlanLibrary]:
+    """The library at `path`, reloaded when the file changes; None if there is none"""
+    global _loaded
+    if path is None:
+        return None
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    stamp = (str(path), st.st_mtime_ns, st.st_size)
+
+    with _load_lock:
+        if _loaded is None or _loaded[0] != stamp:
+            try:
+                library = PlanLibrary.load(path)
+                logger.info(f"📚 Plan library loaded ({len(library)} meals from {path})")
+            except (OSError, ValueError) as e:
+                library = None
+                logger.error(f"❌ Plan library {path} not loaded: {e}")
+            _loaded = (stamp, library)
+        return _loaded[1]
+
+
+# ---------------------------
+# serving
+# ---------------------------
+
+def scale_entry(
+    catalog,
+    allowed: np.ndarray,
+    entry: Dict,
+    meal_cal: float,
+    macro_target: Dict,
+    tolerance: float = PLAN_LIBRARY_TOLERANCE,
+) -> Tuple[Optional[List[Dict]], str]:
+    """
+    A library meal rescaled to `meal_cal` with the catalog's current
+    nutrients: (items, "hit"), or (None, "stale") when a food is gone or
+    not allowed, or (None, "out_of_tolerance")
+    """
+    pos = catalog.table.positions([it["food_id"] for it in entry["items"]])
+    if (pos < 0).any() or not allowed[pos].all():
+        return None, "stale"
+
+    rows = catalog.table.frame(pos)
+    M = _portion_matrix(rows)
+    portions = np.array([float(it["portions"]) for it in entry["items"]])
+    cal = float(M[:, 0] @ portions)
+    if cal <= 0:
+        return None, "stale"
+    portions *= meal_cal / cal
+
+    totals = M.T @ portions
+    t = np.array([macro_target["protein_g"], macro_target["fat_g"], macro_target["carbs_g"]], dtype=float)
+    deviation = np.abs(totals[1:4] - t) / np.maximum(t, 1.0)
+    if (portions.max() > MAX_PORTIONS or (deviation > tolerance).any()
+            or totals[4] < macro_target["fiber_g"] * FIBER_FLOOR):
+        return None, "out_of_tolerance"
+    return _extract_items(rows, portions.tolist()), "hit"
+
+
+def library_day(
+    catalog,
+    targets: Dict,
+    allergies=None,
+    conditions=None,
+    library: Optional[PlanLibrary] = None,
+    deadline: Deadline = None,
+    max_candidates: int = None,
+    mode: str = "exact",
+    tolerance: float = PLAN_LIBRARY_TOLERANCE,
+    deadline_s: Optional[float] = None,
+) -> Optional[Dict]:
+    """
+    Day plan with library meals where they fit and live solves for the rest
+
+    Returns None when no meal can be served from the library (the caller
+    solves the day as usual). The plan's "library" section names the bucket,
+    the restriction signature and the slots served from the library.
+
+    deadline_s is split over the slots solved live only; a shared
+    `deadline` is used as given.
+    """
+    t0 = time.perf_counter()
+    library = library if library is not None else get_library()
+    if not library:
+        return None
+
+    bucket, _ = target_bucket(targets)
+    signature = restriction_signature(allergies, conditions)
+    total_cal = float(targets.get("calories", targets.get("calories_kcal", 0.0)))
+    with stage("filter"):
+        allowed = catalog.user_mask(allergies or [], conditions or [])
+
+    plan = {"meals": {}, "totals": {}, "warnings": []}
+    objective = {"objective": 0.0, "milp_objective": None}
+    live, used_ids = {}, set()
+    with stage("library"):
+        for slot, (cal_frac, min_i, max_i, _) in MEAL_CONFIG.items():
+            meal_cal, macro = total_cal * cal_frac, _slot_macro(targets, cal_frac)
+            entry = library.get(entry_key(bucket, signature, slot))
+            items, outcome = (None, "miss") if entry is None else \
+                scale_entry(catalog, allowed, entry, meal_cal, macro, tolerance)
+            LIBRARY_LOOKUPS.inc(outcome=outcome)
+            if items is None:
+                live[slot] = (meal_cal, macro, min_i, max_i)
+                continue
+            plan["meals"][slot] = items
+            totals = [sum(float(it[n]) for it in items) for n in NUTRIENTS]
+            objective["objective"] += float(meal_objective(totals, meal_cal, macro))
+            used_ids.update(it["food_id"] for it in items)
+
+    if len(live) == len(MEAL_CONFIG):
+        return None
+    if live:
+        if deadline is None and deadline_s:
+            deadline = Deadline(max(deadline_s - (time.perf_counter() - t0), 0.0), parts=len(live))
+        solved = _solve_slots(catalog, allowed, live, plan, used_ids, deadline=deadline,
+                              max_candidates=max_candidates, mode=mode)
+        objective["objective"] += solved["objective"]
+
+    plan = _finish_plan(plan, objective, mode, False)
+    plan["library"] = {
+        "bucket": bucket,
+        "restrictions": signature,
+        "slots": [s for s in MEAL_CONFIG if s not in live],
+    }
+    return plan
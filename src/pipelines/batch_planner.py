@@ -0,0 +1,295 @@
+"""
+Offline cohort planning
+
+Plans whole populations without going through HTTP:
+
+    python main.py plan-batch --input profiles.csv --days 7
+
+Profiles are streamed from CSV in chunks. Each profile's targets come
+from the profile builder, and its plans are generated by a process pool.
+The pool shares one PreparedCatalog: it is built before the pool forks, so
+workers inherit it copy-on-write. On platforms without fork, each worker
+builds it once instead. Results are written per chunk as columnar part
+files:
+
+    <output>/items/part-00000.parquet       one row per plan item
+    <output>/day_totals/part-00000.parquet  one row per user and day
+    <output>/errors/part-00000.parquet      profiles that failed
+
+Parquet needs pyarrow (or fastparquet); without it the parts are CSV.
+After every chunk, _checkpoint.json records the progress. A rerun with
+the same input and settings resumes after the last finished chunk.
+
+The single-user case (write_plan_csv) fills MEAL_PLAN_CSV for the API.
+"""
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.config import DATA_OUTPUT_DIR, FOODS_CLUSTERS_NPZ, FOODS_COMPLETE_CSV, PLAN_DEADLINE_S
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = DATA_OUTPUT_DIR / "batch_plans"
+CHUNK_SIZE = 500
+CHECKPOINT = "_checkpoint.json"
+TABLES = ["items", "day_totals", "errors"]
+# Profile columns; list columns hold ";"-separated values ("peanut;dairy")
+REQUIRED_COLUMNS = ["age", "gender", "height_cm", "weight_kg"]
+OPTIONAL_COLUMNS = {"activity": "moderate", "goal": "maintain", "intensity": "standard"}
+LIST_COLUMNS = ["conditions", "allergies"]
+NUTRIENTS = ["calories", "protein", "fat", "carbs", "fiber"]
+TARGETS = ["calories", "protein_g", "fat_g", "carbs_g", "fiber_g"]
+# Plan item fields (_extract_items), for an empty plan's CSV header
+ITEM_COLUMNS = ["food_id", "food_name", "portions", "portion_unit", "grams"] + NUTRIENTS
+
+# Set in the parent before the pool forks (or by _init_worker)
+_catalog = None
+
+
+# ---------------------------
+# plan -> rows
+# ---------------------------
+
+def plan_rows(plan: Dict, user_id=None, day: int = 1, targets: Optional[Dict] = None) -> Tuple[List[Dict], Dict]:
+    """Flatten one daily plan into item rows and a day-totals row"""
+    items = []
+    for slot, slot_items in plan.get("meals", {}).items():
+        for position, it in enumerate(slot_items or []):
+            items.append({"user_id": user_id, "day": day, "slot": slot, "position": position, **it})
+
+    totals = {"user_id": user_id, "day": day}
+    totals.update({n: plan.get("totals", {}).get(n, 0.0) for n in NUTRIENTS})
+    for t in TARGETS:
+        totals[f"target_{t}"] = (targets or {}).get(t)
+    totals["n_items"] = len(items)
+    totals["warnings"] = " | ".join(plan.get("warnings", []))
+    return items, totals
+
+
+def write_plan_csv(plan: Dict, path: Union[str, Path]):
+    """Write one user's daily plan as item rows (e.g. MEAL_PLAN_CSV)"""
+    items, _ = plan_rows(plan)
+    columns = ["day", "slot", "position"] + ITEM_COLUMNS
+    pd.DataFrame(items, columns=["user_id"] + columns)[columns].to_csv(path, index=False)
+
+
+# ---------------------------
+# per-user work (runs in the pool)
+# ---------------------------
+
+def _split_list(value) -> List[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+
+def profile_kwargs(row: Dict) -> Dict:
+    """build_profile_targets arguments from one CSV row"""
+    missing = [c for c in REQUIRED_COLUMNS if pd.isna(row.get(c))]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    kwargs = {
+        "age": int(row["age"]),
+        "gender": str(row["gender"]),
+        "height_cm": float(row["height_cm"]),
+        "weight_kg": float(row["weight_kg"]),
+    }
+    for col, default in OPTIONAL_COLUMNS.items():
+        value = row.get(col)
+        kwargs[col] = default if pd.isna(value) or value == "" else str(value)
+    for col in LIST_COLUMNS:
+        kwargs[col] = _split_list(row.get(col))
+    return kwargs
+
+
+def plan_user(task: Tuple) -> Tuple[List[Dict], List[Dict], Optional[Dict]]:
+    """(user_id, row, days, mode, deadline_s) -> (items, day totals, error)"""
+    from src.optimizer.engine import build_day, build_weekly_plan
+    from src.profile.profile_builder import build_profile_targets
+
+    user_id, row, days, mode, deadline_s = task
+    try:
+        profile = build_profile_targets(**profile_kwargs(row), save=False)
+        if days == 1:
+            day_plans = [build_day(profile, _catalog, deadline_s=deadline_s, mode=mode)]
+        else:
+            weekly = build_weekly_plan(profile, _catalog, days=days, deadline_s=deadline_s, mode=mode)
+            day_plans = weekly["days"]
+    except Exception as e:
+        return [], [], {"user_id": user_id, "error": f"{type(e).__name__}: {e}"}
+
+    items, totals = [], []
+    for day, plan in enumerate(day_plans, start=1):
+        day_items, day_totals = plan_rows(plan, user_id, day, profile["targets"])
+        items.extend(day_items)
+        totals.append(day_totals)
+    return items, totals, None
+
+
+def _init_worker(foods_path: Optional[str]):
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog(foods_path)
+
+
+def load_catalog(foods_path: Optional[Union[str, Path]] = None):
+    from src.catalog_manager import CatalogManager, sample_foods
+
+    path = Path(foods_path) if foods_path else FOODS_COMPLETE_CSV
+    clusters = FOODS_CLUSTERS_NPZ if path == FOODS_COMPLETE_CSV else None
+    return CatalogManager(path, clusters, fallback=sample_foods).reload("batch").catalog
+
+
+# ---------------------------
+# output + checkpoint
+# ---------------------------
+
+def resolve_format(fmt: str) -> str:
+    if fmt != "auto":
+        return fmt
+    has_parquet = any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet"))
+    return "parquet" if has_parquet else "csv"
+
+
+def write_part(rows: List[Dict], out_dir: Path, table: str, part: int, fmt: str):
+    """Write one chunk of a table; written to a temp name and renamed, so parts are all-or-nothing"""
+    if not rows:
+        return
+    path = out_dir / table / f"part-{part:05d}.{fmt}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df = pd.DataFrame(rows)
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+def _run_key(input_path: Path, days: int, mode: str, chunk_size: int, fmt: str) -> Dict:
+    st = input_path.stat()
+    return {
+        "input": str(input_path.resolve()),
+        "input_size": st.st_size,
+        "input_mtime_ns": st.st_mtime_ns,
+        "days": days,
+        "mode": mode,
+        "chunk_size": chunk_size,
+        "format": fmt,
+    }
+
+
+def load_checkpoint(out_dir: Path, key: Dict, fresh: bool = False) -> Dict:
+    path = out_dir / CHECKPOINT
+    if fresh or not path.exists():
+        return {"run": key, "chunks_done": 0, "users_done": 0, "errors": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("run") != key:
+        raise ValueError(f"{path} belongs to a different run (input or settings changed); "
+                         f"use --fresh to start over")
+    return state
+
+
+def save_checkpoint(out_dir: Path, state: Dict):
+    path = out_dir / CHECKPOINT
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(path)
+
+
+def read_chunks(input_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(input_path, chunksize=chunk_size,
+                           dtype={c: str for c in LIST_COLUMNS + ["user_id"]})
+
+
+# ---------------------------
+# driver
+# ---------------------------
+
+def run_batch(
+    input_path: Union[str, Path],
+    output_dir: Union[str, Path] = DEFAULT_OUTPUT,
+    days: int = 7,
+    processes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    mode: str = "exact",
+    deadline_s: Optional[float] = None,
+    fmt: str = "auto",
+    fresh: bool = False,
+    foods_path: Optional[Union[str, Path]] = None,
+) -> Dict:
+    """
+    Plan every profile in `input_path`; returns the final checkpoint state
+
+    deadline_s is the latency budget per user (all days together), default
+    PLAN_DEADLINE_S.
+    """
+    global _catalog
+    input_path, out_dir = Path(input_path), Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fmt = resolve_format(fmt)
+    state = load_checkpoint(out_dir, _run_key(input_path, days, mode, chunk_size, fmt), fresh)
+    if not state["chunks_done"]:
+        # Parts from an older run would mix with this one
+        for table in TABLES:
+            for old in (out_dir / table).glob("part-*"):
+                old.unlink()
+    else:
+        logger.info(f"↩️ Resuming after chunk {state['chunks_done']} ({state['users_done']} users done)")
+
+    deadline_s = deadline_s if deadline_s is not None else (PLAN_DEADLINE_S or None)
+    processes = processes or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    if "fork" in multiprocessing.get_all_start_methods():
+        _catalog = load_catalog(foods_path)
+        pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(processes, initializer=_init_worker,
+                                   initargs=(str(foods_path) if foods_path else None,))
+    logger.info(f"✅ Catalog ready in {time.perf_counter() - t0:.1f}s, planning with {processes} processes")
+
+    with pool:
+        for part, chunk in enumerate(read_chunks(input_path, chunk_size)):
+            if part < state["chunks_done"]:
+                continue
+            t = time.perf_counter()
+            base = part * chunk_size
+            tasks = []
+            for i, row in enumerate(chunk.to_dict(orient="records")):
+                user_id = row.get("user_id")
+                user_id = str(base + i) if user_id is None or pd.isna(user_id) else str(user_id)
+                tasks.append((user_id, row, days, mode, deadline_s))
+
+            items, totals, errors = [], [], []
+            for user_items, user_totals, error in pool.map(plan_user, tasks, chunksize=max(1, len(tasks) // (4 * processes))):
+                items.extend(user_items)
+                totals.extend(user_totals)
+                if error:
+                    errors.append(error)
+
+            write_part(items, out_dir, "items", part, fmt)
+            write_part(totals, out_dir, "day_totals", part, fmt)
+            write_part(errors, out_dir, "errors", part, fmt)
+
+            state["chunks_done"] = part + 1
+            state["users_done"] += len(tasks)
+            state["errors"] += len(errors)
+            save_checkpoint(out_dir, state)
+            logger.info(f"✅ Chunk {part}: {len(tasks)} users, {len(errors)} errors, "
+                        f"{time.perf_counter() - t:.1f}s")
+
+    state["complete"] = True
+    save_checkpoint(out_dir, state)
+    return state
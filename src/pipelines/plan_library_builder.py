@@ -0,0 +1,138 @@
+"""
+Offline plan library build
+
+    python main.py plan-library --input profiles.csv --top 200
+
+Reads profiles in the plan-batch CSV format (e.g. a sample of recent
+traffic), maps each one's targets to its bucket and restriction signature
+(src/optimizer/plan_library.py) and counts them. The `top` most frequent
+(bucket, signature) pairs with at least `min_count` profiles get one exact
+day plan each, solved for the bucket's center targets on a process pool
+that shares the catalog as in plan-batch. The meals are written to
+PLAN_LIBRARY_JSON; the API reloads it on the next request that uses it.
+"""
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from src.config import PLAN_LIBRARY_JSON
+from src.optimizer.budget import Deadline
+from src.optimizer.lp_day_solver import MEAL_CONFIG, build_day
+from src.optimizer.plan_library import (
+    CAL_STEP, FIBER_STEP, SPLIT_STEP, PlanLibrary, plan_entries, restriction_signature,
+    signature_restrictions, target_bucket,
+)
+from src.pipelines.batch_planner import CHUNK_SIZE, load_catalog, profile_kwargs, read_chunks
+from src.profile.profile_builder import build_profile_targets
+
+logger = logging.getLogger(__name__)
+
+# Set in the parent before the pool forks (or by _init_worker)
+_catalog = None
+
+
+def count_buckets(input_path: Path, chunk_size: int = CHUNK_SIZE) -> Tuple[Counter, Dict[str, Dict], int]:
+    """((bucket, signature) -> profiles, bucket -> center targets, rows skipped as invalid)"""
+    counts, centers, skipped = Counter(), {}, 0
+    for chunk in read_chunks(input_path, chunk_size):
+        for row in chunk.to_dict(orient="records"):
+            try:
+                kwargs = profile_kwargs(row)
+                profile = build_profile_targets(**kwargs, save=False)
+            except Exception:
+                skipped += 1
+                continue
+            bucket, centers[bucket] = target_bucket(profile["targets"])
+            counts[bucket, restriction_signature(kwargs["allergies"], kwargs["conditions"])] += 1
+    return counts, centers, skipped
+
+
+def solve_bucket(task: Tuple) -> Tuple[str, str, Dict, Optional[str]]:
+    """(bucket, signature, center targets, deadline_s) -> (bucket, signature, entries, error)"""
+    bucket, signature, center, deadline_s = task
+    try:
+        allergies, conditions = signature_restrictions(signature)
+        deadline = Deadline(deadline_s, parts=len(MEAL_CONFIG)) if deadline_s else None
+        plan = build_day(_catalog, center, allergies, conditions, deadline=deadline)
+    except Exception as e:
+        return bucket, signature, {}, f"{type(e).__name__}: {e}"
+    return bucket, signature, plan_entries(plan, bucket, signature), None
+
+
+def _init_worker(foods_path: Optional[str]):
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog(foods_path)
+
+
+def build_library(
+    input_path: Union[str, Path],
+    output: Optional[Union[str, Path]] = None,
+    top: Optional[int] = None,
+    min_count: int = 1,
+    processes: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    foods_path: Optional[Union[str, Path]] = None,
+) -> Dict:
+    """
+    Build the plan library for the profiles in `input_path`; returns its metadata
+
+    deadline_s caps each bucket's day solve (default: LP_SOLVER_TIMEOUT per meal).
+    """
+    global _catalog
+    input_path = Path(input_path)
+    output = Path(output) if output else PLAN_LIBRARY_JSON
+    if output is None:
+        raise ValueError("No output path (PLAN_LIBRARY_PATH is empty)")
+
+    t0 = time.perf_counter()
+    counts, centers, skipped = count_buckets(input_path)
+    total = sum(counts.values())
+    chosen = [(key, n) for key, n in counts.most_common(top) if n >= min_count]
+    logger.info(f"📊 {total} profiles in {len(counts)} buckets ({skipped} skipped, "
+                f"{time.perf_counter() - t0:.1f}s), solving the top {len(chosen)}")
+
+    processes = processes or os.cpu_count() or 1
+    if "fork" in multiprocessing.get_all_start_methods():
+        _catalog = load_catalog(foods_path)
+        pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(processes, initializer=_init_worker,
+                                   initargs=(str(foods_path) if foods_path else None,))
+
+    entries, covered, errors = {}, 0, 0
+    tasks = [(bucket, signature, centers[bucket], deadline_s) for (bucket, signature), _ in chosen]
+    with pool:
+        for (bucket, signature, bucket_entries, error), (_, n) in zip(pool.map(solve_bucket, tasks), chosen):
+            if error:
+                errors += 1
+                logger.error(f"❌ Bucket {bucket} ({signature}) failed: {error}")
+                continue
+            entries.update(bucket_entries)
+            covered += n
+
+    meta = {
+        "built_at": datetime.now().isoformat(),
+        "input": str(input_path.resolve()),
+        "foods": str(foods_path) if foods_path else None,
+        "food_count": len(_catalog) if _catalog is not None else None,
+        "cal_step": CAL_STEP,
+        "split_step": SPLIT_STEP,
+        "fiber_step": FIBER_STEP,
+        "profiles": total,
+        "buckets": len(chosen) - errors,
+        "errors": errors,
+        "meals": len(entries),
+        "coverage": round(covered / total, 4) if total else 0.0,
+        "build_s": round(time.perf_counter() - t0, 1),
+    }
+    PlanLibrary(entries, meta).save(output)
+    logger.info(f"💾 Plan library saved to {output} ({len(entries)} meals, "
+                f"{meta['coverage']:.0%} of profiles covered)")
+    return meta
@@ -0,0 +1,107 @@
+"""
+Synthetic food catalog generator
+
+Builds catalogs with the same columns as foods_complete_with_portions.csv,
+using food names assembled from the MEAL_RULES keywords so every meal slot
+gets a realistic share of candidates. Used by the benchmarks and offline
+evaluation, where the real database may not be available.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.optimizer.lp_day_solver import MEAL_RULES, BLACKLIST
+
+# Preparation / variant words mixed into names ("Rice, white, cooked")
+MODIFIERS = [
+    "raw", "cooked", "boiled", "steamed", "fried", "baked", "grilled",
+    "roasted", "white", "brown", "whole", "low fat", "plain", "fresh",
+    "canned", "frozen", "sweetened", "unsweetened", "homemade", "with salt",
+]
+
+# Words that never match a keyword, so some foods only reach the fallback pool
+FILLERS = [
+    "mix", "stew", "salad", "soup", "sauce", "wrap", "roll", "platter",
+    "bowl", "dish", "pie", "casserole",
+]
+
+PORTION_UNITS = ["cup", "piece", "slice", "tbsp", "portion", "serving", "bowl"]
+GRAMS_PER_PORTION = [30.0, 50.0, 80.0, 100.0, 150.0, 200.0, 240.0]
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """Parse catalog sizes such as '1k', '300k' or '5000'"""
+    t = str(text).strip().lower()
+    if t and t[-1] in SIZE_SUFFIXES:
+        return int(float(t[:-1]) * SIZE_SUFFIXES[t[-1]])
+    return int(t)
+
+
+def _vocabulary() -> list:
+    words = []
+    for rules in MEAL_RULES.values():
+        for kw in rules["keywords"] + rules["blocked"]:
+            if kw not in words:
+                words.append(kw)
+    return words
+
+
+def generate_catalog(n_foods: int, seed: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Generate a synthetic food catalog
+
+    Args:
+        n_foods: Number of rows to generate
+        seed: Random seed (same seed -> identical catalog)
+
+    Returns:
+        DataFrame with food_id, food_name, calories, protein, fat, carbs,
+        fiber (all per 100 g), grams_per_portion and portion_unit
+    """
+    rng = np.random.default_rng(seed)
+    vocab = np.array(_vocabulary())
+
+    base = vocab[rng.integers(0, len(vocab), n_foods)]
+    mod1 = np.array(MODIFIERS)[rng.integers(0, len(MODIFIERS), n_foods)]
+    mod2 = np.array(MODIFIERS)[rng.integers(0, len(MODIFIERS), n_foods)]
+    names = np.char.add(np.char.add(np.char.add(np.char.capitalize(base), ", "), mod1), ", ")
+    names = np.char.add(names, mod2).astype(object)
+
+    # ~8% fillers that match no keyword, ~3% blacklisted products
+    filler = rng.random(n_foods) < 0.08
+    fill_words = np.array(FILLERS)[rng.integers(0, len(FILLERS), n_foods)]
+    names[filler] = np.char.add(np.char.add(np.char.capitalize(fill_words[filler]), ", "), mod1[filler])
+
+    black = rng.random(n_foods) < 0.03
+    black_words = np.array(BLACKLIST)[rng.integers(0, len(BLACKLIST), n_foods)]
+    names[black] = names[black] + ", " + black_words[black].astype(object)
+
+    # Energy split across protein / fat / carbs, then converted to grams
+    kcal = np.clip(rng.lognormal(mean=5.0, sigma=0.6, size=n_foods), 15.0, 880.0)
+    split = rng.dirichlet([2.0, 1.5, 3.0], size=n_foods)
+    protein = kcal * split[:, 0] / 4.0
+    fat = kcal * split[:, 1] / 9.0
+    carbs = kcal * split[:, 2] / 4.0
+    fiber = np.minimum(rng.gamma(1.2, 2.0, n_foods), carbs)
+
+    # Near-identical variants of the same food are common in FDC exports
+    dup = rng.random(n_foods) < 0.10
+    src = rng.integers(0, n_foods, n_foods)
+    for arr in (kcal, protein, fat, carbs, fiber):
+        arr[dup] = arr[src[dup]] * (1.0 + rng.normal(0.0, 0.005, dup.sum()))
+    names[dup] = names[src[dup]]
+
+    return pd.DataFrame({
+        "food_id": np.arange(n_foods),
+        "food_name": names,
+        "calories": np.round(kcal, 1),
+        "protein": np.round(protein, 2),
+        "fat": np.round(fat, 2),
+        "carbs": np.round(carbs, 2),
+        "fiber": np.round(fiber, 2),
+        "grams_per_portion": np.array(GRAMS_PER_PORTION)[rng.integers(0, len(GRAMS_PER_PORTION), n_foods)],
+        "portion_unit": np.array(PORTION_UNITS)[rng.integers(0, len(PORTION_UNITS), n_foods)],
+    })
@@ -11,6 +11,52 @@ ACTIVITY_FACTOR = {
     "athlete":   1.9,
 }
 
+
+def macro_targets(
+    target_cal: float,
+    weight_kg: float,
+    goal: str = "maintain",
+    conditions: Optional[List[str]] = None,
+) -> tuple:
+    """(protein_g, fat_g, carbs_g, fiber_g) for a calorie target"""
+    goal_l = goal.lower()
+    has_diabetes = any("diabetes" in c.lower() for c in conditions or [])
+
+    if goal_l in ["muscle_gain", "gain", "bulking"]:
+        protein_g = 1.8 * weight_kg
+        fat_ratio = 0.25
+    elif goal_l in ["weight_loss", "fat_loss", "loss"]:
+        protein_g = 1.6 * weight_kg
+        fat_ratio = 0.30
+    else:
+        protein_g = 1.4 * weight_kg
+        fat_ratio = 0.28
+
+    if has_diabetes:
+        protein_g = max(protein_g, 1.6 * weight_kg)
+        fat_ratio = max(fat_ratio, 0.30)
+
+    fat_g = target_cal * fat_ratio / 9
+    carbs_g = max(0, (target_cal - protein_g * 4 - fat_g * 9) / 4)
+    fiber_g = 30.0 if (target_cal < 2200 or has_diabetes) else 25.0
+
+    return protein_g, fat_g, carbs_g, fiber_g
+
+
+def targets_for_calories(profile: Dict, calories: float) -> Dict:
+    """The profile's targets recomputed for another calorie target (plan sweeps)"""
+    inputs = profile["inputs"]
+    protein_g, fat_g, carbs_g, fiber_g = macro_targets(
+        calories, inputs["weight_kg"], inputs.get("goal", "maintain"), inputs.get("conditions"))
+    return {
+        "calories": round(calories, 1),
+        "protein_g": round(protein_g, 1),
+        "fat_g": round(fat_g, 1),
+        "carbs_g": round(carbs_g, 1),
+        "fiber_g": round(fiber_g, 1),
+    }
+
+
 def build_profile_targets(
     age: int,
     gender: str,
@@ -21,6 +67,7 @@ def build_profile_targets(
     intensity: str = "standard",
     conditions: Optional[List[str]] = None,
     allergies: Optional[List[str]] = None,
+    save: bool = True,
 ) -> Dict:
     conditions = conditions or []
     allergies = allergies or []
@@ -42,25 +89,7 @@ def build_profile_targets(
     else:
         target_cal = tdee
 
-    has_diabetes = any("diabetes" in c.lower() for c in conditions)
-
-    if goal_l in ["muscle_gain", "gain", "bulking"]:
-        protein_g = 1.8 * weight_kg
-        fat_ratio = 0.25
-    elif goal_l in ["weight_loss", "fat_loss", "loss"]:
-        protein_g = 1.6 * weight_kg
-        fat_ratio = 0.30
-    else:
-        protein_g = 1.4 * weight_kg
-        fat_ratio = 0.28
-
-    if has_diabetes:
-        protein_g = max(protein_g, 1.6 * weight_kg)
-        fat_ratio = max(fat_ratio, 0.30)
-
-    fat_g = target_cal * fat_ratio / 9
-    carbs_g = max(0, (target_cal - protein_g * 4 - fat_g * 9) / 4)
-    fiber_g = 30.0 if (target_cal < 2200 or has_diabetes) else 25.0
+    protein_g, fat_g, carbs_g, fiber_g = macro_targets(target_cal, weight_kg, goal, conditions)
 
     profile = {
         "inputs": {
@@ -88,9 +117,10 @@ def build_profile_targets(
         },
     }
 
-    # ✅ Save to data_output/user_targets.json
-    config.DATA_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(config.USER_TARGETS_JSON, "w", encoding="utf-8") as f:
-        json.dump(profile, f, indent=2, ensure_ascii=False)
+    # ✅ Save to data_output/user_targets.json (off for batch runs)
+    if save:
+        config.DATA_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        with open(config.USER_TARGETS_JSON, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
 
     return profile
@@ -0,0 +1,103 @@
+"""
+Opt-in request profiling
+
+Runs a planning call under cProfile and tracemalloc and collects per-meal
+solver details recorded by solve_one_meal. Only one profiling session runs
+at a time because tracemalloc is process-wide. For the same reason the
+memory numbers also count allocations made meanwhile by other requests'
+threads (tracemalloc cannot filter by thread); reports say so in
+"memory_scope".
+"""
+import contextvars
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+_solver_log: contextvars.ContextVar[Optional[List[Dict]]] = \
+    contextvars.ContextVar("solver_log", default=None)
+
+_session_lock = threading.Lock()
+
+MEMORY_SCOPE = ("process: peak_memory_mb and top_allocations include allocations by "
+                "other requests served while profiling")
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when another profiling session is already running"""
+
+
+def record_solve(details: Dict):
+    """Append solver details to the active profiling session, if any"""
+    log = _solver_log.get()
+    if log is not None:
+        log.append(details)
+
+
+def _top_functions(prof: cProfile.Profile, top: int) -> List[Dict]:
+    stats = pstats.Stats(prof).stats
+    rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+    return [
+        {
+            "function": f"{filename}:{line}({func})",
+            "ncalls": nc,
+            "tottime_s": round(tt, 6),
+            "cumtime_s": round(ct, 6),
+        }
+        for (filename, line, func), (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, top: int) -> List[Dict]:
+    return [
+        {
+            "location": str(stat.traceback[0]),
+            "size_kb": round(stat.size / 1024.0, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+
+
+def profile_call(fn: Callable, *args, top: int = 25, **kwargs) -> Tuple[object, Dict]:
+    """
+    Call fn(*args, **kwargs) under cProfile and tracemalloc
+
+    Returns:
+        (fn result, report) where report has wall time, peak traced memory,
+        top functions by cumulative time, top allocation sites (both for the
+        whole process, see MEMORY_SCOPE) and the per-meal solver details
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy("Another profiling session is already running")
+
+    log: List[Dict] = []
+    token = _solver_log.set(log)
+    prof = cProfile.Profile()
+    try:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            wall = time.perf_counter() - t0
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        _solver_log.reset(token)
+        _session_lock.release()
+
+    report = {
+        "wall_time_s": round(wall, 4),
+        "peak_memory_mb": round(peak / 1e6, 3),
+        "memory_scope": MEMORY_SCOPE,
+        "top_functions": _top_functions(prof, top),
+        "top_allocations": _top_allocations(snapshot, top),
+        "solver": log,
+    }
+    return result, report
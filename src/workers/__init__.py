@@ -0,0 +1,3 @@
+"""
+Solver worker tier: job messages, transports, workers and the API client
+"""
@@ -0,0 +1,120 @@
+"""
+Front-end side of the solver worker tier
+
+SolverClient sends a job, waits for its result with a timeout and resends
+it (same id, so whichever copy finishes first wins) up to `retries` times.
+A listener thread routes results from the transport to the waiting
+requests.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+from src.config import SOLVER_JOB_RETRIES, SOLVER_JOB_TIMEOUT_S
+from src.metrics import REGISTRY
+from src.workers.jobs import JOB_KINDS, Job, Result, decode_result, encode_job
+from src.workers.transport import Transport
+
+logger = logging.getLogger(__name__)
+
+SOLVER_JOBS = REGISTRY.counter(
+    "planner_solver_jobs_total", "Jobs sent to solver workers", ["kind", "outcome"])
+SOLVER_JOB_SECONDS = REGISTRY.histogram(
+    "planner_solver_job_seconds", "Job round trip through the worker tier", ["kind"])
+
+
+class SolverTimeout(TimeoutError):
+    """No worker answered within the timeout and retries"""
+
+
+class WorkerError(RuntimeError):
+    """A worker ran the job and it failed"""
+
+
+class SolverClient:
+    def __init__(
+        self,
+        transport: Transport,
+        timeout_s: float = SOLVER_JOB_TIMEOUT_S,
+        retries: int = SOLVER_JOB_RETRIES,
+    ):
+        self.transport = transport
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def start(self) -> "SolverClient":
+        self._listener = threading.Thread(target=self._listen, daemon=True, name="solver-results")
+        self._listener.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+        self.transport.close()
+
+    def _listen(self):
+        while not self._stop.is_set():
+            try:
+                data = self.transport.get_result(0.5)
+            except Exception as e:
+                logger.error(f"❌ Solver result queue failed: {e}")
+                time.sleep(1.0)
+                continue
+            if data is None:
+                continue
+            result = decode_result(data)
+            with self._lock:
+                future = self._pending.get(result.id)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    def solve(self, kind: str, profile: Dict, timeout_s: Optional[float] = None,
+              catalog_id: str = "", **kwargs) -> Result:
+        """
+        Run a planner call (one of JOB_KINDS) on a worker
+
+        catalog_id names a regional catalog ("" for the default one).
+        Raises SolverTimeout when no attempt answered in time and
+        WorkerError when the worker reports a failure.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        timeout_s = timeout_s or self.timeout_s
+        job = Job(kind=kind, profile=profile, kwargs=kwargs, reply_to=self.transport.reply_to,
+                  catalog_id=catalog_id)
+        future: Future = Future()
+        with self._lock:
+            self._pending[job.id] = future
+
+        t0 = time.perf_counter()
+        try:
+            for attempt in range(1, self.retries + 2):
+                job.attempt = attempt
+                job.expires_at = time.time() + timeout_s
+                self.transport.put_job(encode_job(job))
+                try:
+                    result = future.result(timeout=timeout_s)
+                except FutureTimeout:
+                    logger.warning(f"⚠️ Solver job {job.id} ({kind}) attempt {attempt} timed out")
+                    continue
+
+                SOLVER_JOB_SECONDS.observe(time.perf_counter() - t0, kind=kind)
+                if not result.ok:
+                    SOLVER_JOBS.inc(kind=kind, outcome="error")
+                    raise WorkerError(result.error)
+                SOLVER_JOBS.inc(kind=kind, outcome="ok" if attempt == 1 else "retried")
+                return result
+
+            SOLVER_JOBS.inc(kind=kind, outcome="timeout")
+            raise SolverTimeout(f"No solver worker answered within {timeout_s:.0f}s "
+                                f"({self.retries + 1} attempts)")
+        finally:
+            with self._lock:
+                self._pending.pop(job.id, None)
@@ -0,0 +1,69 @@
+"""
+Solver job and result messages
+
+A job carries everything a stateless worker needs: the planner call
+("daily", "weekly", "replan" or "sweep"), the already-built user profile,
+the call's keyword arguments and the food catalog to plan on. Messages are
+compact JSON bytes so any transport can carry them.
+"""
+import json
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+JOB_KINDS = ("daily", "weekly", "replan", "sweep")
+
+
+@dataclass
+class Job:
+    kind: str
+    profile: Dict
+    kwargs: Dict = field(default_factory=dict)
+    reply_to: str = ""
+    expires_at: float = 0.0         # wall clock; workers drop jobs past it
+    attempt: int = 1
+    catalog_id: str = ""            # regional catalog; "" = the default one
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def expired(self) -> bool:
+        return bool(self.expires_at) and time.time() > self.expires_at
+
+
+@dataclass
+class Result:
+    id: str
+    ok: bool
+    value: Any = None               # the plan when ok
+    error: Optional[str] = None
+    worker: str = ""
+    solve_s: float = 0.0
+    catalog_version: Optional[int] = None   # of the catalog the worker solved on
+
+
+def _default(o):
+    # numpy scalars in plans
+    if hasattr(o, "item"):
+        return o.item()
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Dict) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def encode_job(job: Job) -> bytes:
+    return _dumps(asdict(job))
+
+
+def decode_job(data: bytes) -> Job:
+    return Job(**json.loads(data))
+
+
+def encode_result(result: Result) -> bytes:
+    return _dumps(asdict(result))
+
+
+def decode_result(data: bytes) -> Result:
+    return Result(**json.loads(data))
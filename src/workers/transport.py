@@ -0,0 +1,162 @@
+"""
+Job transports between the API front end and solver workers
+
+A transport is one job queue shared by all workers plus one result queue
+per front end (`reply_to`). Two implementations:
+
+- LocalTransport: multiprocessing queues, for worker processes spawned by
+  the API on the same host (SOLVER_TRANSPORT=local)
+- TcpTransport: queues held by a broker process (`python main.py broker`)
+  and reached over TCP with multiprocessing.managers; front ends and
+  workers on any host connect to it (SOLVER_TRANSPORT=tcp)
+
+Both only move bytes, so other queues (ZeroMQ, Redis lists) fit behind
+the same four methods.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from multiprocessing.managers import BaseManager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Put on the job queue to stop one worker
+STOP = b""
+
+
+class Transport(ABC):
+    """Job queue shared by all workers plus this front end's result queue"""
+
+    reply_to: str = ""
+
+    @abstractmethod
+    def put_job(self, data: bytes):
+        ...
+
+    @abstractmethod
+    def get_job(self, timeout: float) -> Optional[bytes]:
+        """Next job, or None after `timeout` seconds"""
+
+    @abstractmethod
+    def put_result(self, reply_to: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def get_result(self, timeout: float) -> Optional[bytes]:
+        """Next result for this front end, or None after `timeout` seconds"""
+
+    def close(self):
+        pass
+
+
+class LocalTransport(Transport):
+    """multiprocessing queues; pass the transport to the worker processes"""
+
+    reply_to = "local"
+
+    def __init__(self, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.jobs = ctx.Queue()
+        self.results = ctx.Queue()
+
+    def put_job(self, data: bytes):
+        self.jobs.put(data)
+
+    def get_job(self, timeout: float) -> Optional[bytes]:
+        try:
+            return self.jobs.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put_result(self, reply_to: str, data: bytes):
+        self.results.put(data)
+
+    def get_result(self, timeout: float) -> Optional[bytes]:
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+# ---------------------------
+# TCP broker
+# ---------------------------
+
+class _BrokerClient(BaseManager):
+    pass
+
+
+_BrokerClient.register("jobs")
+_BrokerClient.register("results")
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' -> (host, port)"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def serve_broker(address: str, authkey: str):
+    """Run the job broker in this process (blocks)"""
+    jobs: "queue.Queue[bytes]" = queue.Queue()
+    results: Dict[str, "queue.Queue[bytes]"] = {}
+    lock = threading.Lock()
+
+    def result_queue(name: str):
+        with lock:
+            return results.setdefault(name, queue.Queue())
+
+    class _BrokerServer(BaseManager):
+        pass
+
+    _BrokerServer.register("jobs", callable=lambda: jobs)
+    _BrokerServer.register("results", callable=result_queue)
+
+    manager = _BrokerServer(address=parse_address(address), authkey=authkey.encode())
+    server = manager.get_server()
+    logger.info(f"✅ Solver job broker listening on {address}")
+    server.serve_forever()
+
+
+class TcpTransport(Transport):
+    """Queues on a broker started with serve_broker()"""
+
+    def __init__(self, address: str, authkey: str, reply_to: Optional[str] = None):
+        self.address = address
+        self._manager = _BrokerClient(address=parse_address(address), authkey=authkey.encode())
+        self._manager.connect()
+        self._jobs = self._manager.jobs()
+        self.reply_to = reply_to or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._results: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _result_queue(self, name: str):
+        with self._lock:
+            q = self._results.get(name)
+            if q is None:
+                q = self._results[name] = self._manager.results(name)
+            return q
+
+    def put_job(self, data: bytes):
+        self._jobs.put(data)
+
+    def get_job(self, timeout: float) -> Optional[bytes]:
+        try:
+            return self._jobs.get(True, timeout)
+        except queue.Empty:
+            return None
+
+    def put_result(self, reply_to: str, data: bytes):
+        self._result_queue(reply_to).put(data)
+
+    def get_result(self, timeout: float) -> Optional[bytes]:
+        try:
+            return self._result_queue(self.reply_to).get(True, timeout)
+        except queue.Empty:
+            return None
@@ -0,0 +1,138 @@
+"""
+Stateless solver worker
+
+Loads the food catalog once (and hot-reloads it like the API when
+CATALOG_WATCH_INTERVAL_S is set), then takes jobs off the transport, runs
+the planner and sends the result to the job's front end. Workers keep no
+per-user state, so any number can serve the same queue. Jobs for a
+regional catalog load it on first use, under the same memory budget as
+the API's CatalogRegistry.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from typing import List, Optional
+
+from src.catalog_manager import CatalogManager, sample_foods
+from src.catalog_registry import CatalogRegistry
+from src.config import (
+    CATALOG_MEMORY_BUDGET_MB,
+    CATALOG_WATCH_INTERVAL_S,
+    DEFAULT_CATALOG_ID,
+    FOOD_CATALOGS,
+    FOODS_CLUSTERS_NPZ,
+    FOODS_COMPLETE_CSV,
+)
+from src.workers.jobs import Job, Result, decode_job, encode_result
+from src.workers.transport import STOP, LocalTransport, Transport
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the stop flag while the queue is idle
+POLL_S = 1.0
+
+
+def _planners():
+    from src.optimizer.engine import build_day, build_weekly_plan, replan_day, sweep_calories
+    return {"daily": build_day, "weekly": build_weekly_plan, "replan": replan_day, "sweep": sweep_calories}
+
+
+def execute(job: Job, manager: CatalogManager, worker_id: str = "",
+            registry: Optional[CatalogRegistry] = None) -> Result:
+    """Run one job on the manager's current catalog, or on the job's regional one"""
+    if job.catalog_id and job.catalog_id != DEFAULT_CATALOG_ID:
+        if registry is None or job.catalog_id not in registry:
+            return Result(id=job.id, ok=False, error=f"Unknown catalog_id: {job.catalog_id}", worker=worker_id)
+        try:
+            snapshot = registry.get(job.catalog_id)
+        except Exception as e:
+            return Result(id=job.id, ok=False, worker=worker_id,
+                          error=f"Catalog '{job.catalog_id}' not available: {e}")
+    else:
+        snapshot = manager.current
+    if snapshot is None or not snapshot.ready:
+        return Result(id=job.id, ok=False, error="Food database not available", worker=worker_id)
+
+    planner = _planners().get(job.kind)
+    if planner is None:
+        return Result(id=job.id, ok=False, error=f"Unknown job kind: {job.kind}", worker=worker_id)
+
+    t0 = time.perf_counter()
+    try:
+        value = planner(job.profile, snapshot.catalog, **job.kwargs)
+    except Exception as e:
+        logger.error(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+        return Result(id=job.id, ok=False, error=f"{type(e).__name__}: {e}", worker=worker_id,
+                      solve_s=time.perf_counter() - t0)
+    return Result(id=job.id, ok=True, value=value, worker=worker_id, solve_s=time.perf_counter() - t0,
+                  catalog_version=snapshot.version)
+
+
+def run_worker(
+    transport: Transport,
+    manager: Optional[CatalogManager] = None,
+    stop: Optional[threading.Event] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Serve jobs until `stop` is set, a STOP message arrives or `max_jobs`
+    jobs are done; returns the number of jobs handled
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    if manager is None:
+        manager = CatalogManager(FOODS_COMPLETE_CSV, FOODS_CLUSTERS_NPZ, fallback=sample_foods)
+    if manager.current is None:
+        manager.reload("worker start")
+    manager.start_watching(CATALOG_WATCH_INTERVAL_S)
+    registry = CatalogRegistry(FOOD_CATALOGS, CATALOG_MEMORY_BUDGET_MB)
+    logger.info(f"✅ Solver worker {worker_id} ready (catalog v{manager.current.version})")
+
+    handled = 0
+    try:
+        while not stop.is_set() and (max_jobs is None or handled < max_jobs):
+            data = transport.get_job(POLL_S)
+            if data is None:
+                continue
+            if data == STOP:
+                break
+            job = decode_job(data)
+            if job.expired:
+                logger.warning(f"⚠️ Dropped expired job {job.id} ({job.kind}, attempt {job.attempt})")
+                continue
+            result = execute(job, manager, worker_id, registry)
+            transport.put_result(job.reply_to, encode_result(result))
+            handled += 1
+    finally:
+        manager.stop_watching()
+    return handled
+
+
+def _local_worker_main(transport: LocalTransport):
+    logging.basicConfig(level=logging.INFO)
+    run_worker(transport)
+
+
+def spawn_local_workers(n: int, transport: LocalTransport) -> List:
+    """Start n worker processes on this host serving `transport`"""
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    for i in range(n):
+        p = ctx.Process(target=_local_worker_main, args=(transport,), daemon=True,
+                        name=f"solver-worker-{i}")
+        p.start()
+        procs.append(p)
+    return procs
+
+
+def stop_local_workers(procs: List, transport: LocalTransport, timeout: float = 5.0):
+    for _ in procs:
+        transport.put_job(STOP)
+    for p in procs:
+        p.join(timeout)
+        if p.is_alive():
+            p.terminate()
@@ -0,0 +1,62 @@
+import pytest
+
+from src.catalog_registry import CatalogRegistry, UnknownCatalog
+from src.pipelines.synthetic_catalog import generate_catalog
+
+REGIONS = ["bd", "in", "us"]
+
+
+@pytest.fixture(scope="module")
+def paths(tmp_path_factory):
+    root = tmp_path_factory.mktemp("catalogs")
+    out = {}
+    for seed, cid in enumerate(REGIONS):
+        out[cid] = root / f"foods_{cid}.csv"
+        generate_catalog(300, seed=seed).to_csv(out[cid], index=False)
+    return out
+
+
+@pytest.fixture(scope="module")
+def catalog_mb(paths):
+    registry = CatalogRegistry(paths, budget_mb=1e6)
+    return max(registry.get(cid).memory_mb for cid in REGIONS)
+
+
+def _loaded(registry):
+    return {cid for cid, c in registry.status()["catalogs"].items() if c["loaded"]}
+
+
+def test_registry_evicts_least_recently_used(paths, catalog_mb):
+    # room for two catalogs
+    registry = CatalogRegistry(paths, budget_mb=2.5 * catalog_mb)
+    registry.get("bd")
+    registry.get("in")
+    assert _loaded(registry) == {"bd", "in"}
+
+    registry.get("bd")          # "in" is now least recently used
+    registry.get("us")
+    assert _loaded(registry) == {"bd", "us"}
+    assert registry.status()["loaded_mb"] <= registry.budget_mb
+
+
+def test_registry_reload_after_eviction_continues_versions(paths, catalog_mb):
+    registry = CatalogRegistry(paths, budget_mb=1.5 * catalog_mb)
+    first = registry.get("bd")
+    registry.get("in")
+    assert _loaded(registry) == {"in"}
+
+    again = registry.get("bd")
+    assert again.version == first.version + 1
+    assert _loaded(registry) == {"bd"}
+
+
+def test_registry_hit_returns_same_snapshot(paths, catalog_mb):
+    registry = CatalogRegistry(paths, budget_mb=10 * catalog_mb)
+    assert registry.get("us") is registry.get("us")
+
+
+def test_registry_unknown_catalog(paths):
+    registry = CatalogRegistry(paths, budget_mb=100.0)
+    assert "xx" not in registry
+    with pytest.raises(UnknownCatalog):
+        registry.get("xx")
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.optimizer.food_table import FoodTable, IntegerIds, StringTable
+from src.optimizer.lp_day_solver import _ensure_required_cols
+
+
+def _foods(ids):
+    n = len(ids)
+    return _ensure_required_cols(pd.DataFrame({
+        "food_id": ids,
+        "food_name": [f"Food {i}" for i in range(n)],
+        "calories": np.linspace(50.0, 500.0, n),
+        "protein": np.linspace(1.0, 30.0, n),
+        "fat": np.linspace(0.5, 20.0, n),
+        "carbs": np.linspace(2.0, 60.0, n),
+        "fiber": np.linspace(0.0, 8.0, n),
+        "grams_per_portion": [100.0] * n,
+    }))
+
+
+@pytest.mark.parametrize("ids, dtype", [
+    (["7", "0", "123", "-4", "2147483647"], np.int32),
+    (["1", "99999999999"], np.int64),
+])
+def test_integer_ids_round_trip(ids, dtype):
+    table = FoodTable(_foods(ids))
+    assert isinstance(table.ids, IntegerIds)
+    assert table.ids.values.dtype == dtype
+    assert table.ids.to_list() == ids
+    assert table.frame(np.arange(len(ids)))["food_id"].tolist() == ids
+
+
+@pytest.mark.parametrize("ids", [
+    ["1", "01", "2"],           # leading zero would not round-trip
+    ["1", "abc", "3"],
+    ["1.0", "2"],
+])
+def test_non_integer_ids_use_strings(ids):
+    table = FoodTable(_foods(ids))
+    assert isinstance(table.ids, StringTable)
+    assert table.ids.to_list() == ids
+
+
+@pytest.mark.parametrize("ids", [
+    ["7", "0", "123", "-4", "2147483647"],
+    ["1", "01", "abc", "x y"],
+])
+def test_positions_lookup(ids):
+    table = FoodTable(_foods(ids))
+    assert table.positions(ids).tolist() == list(range(len(ids)))
+    assert table.positions(list(reversed(ids))).tolist() == list(reversed(range(len(ids))))
+    # unknown, non-canonical and non-string lookups
+    assert table.positions(["999", "007", "", "nope"]).tolist() == [-1] * 4
+    assert table.positions([ids[2]])[0] == 2
+    assert table.positions([]).tolist() == []
+
+
+def test_integer_positions_accept_ints():
+    table = FoodTable(_foods(["10", "20", "30"]))
+    assert table.positions([20, 30, 40]).tolist() == [1, 2, -1]
+
+
+def test_frame_values():
+    foods = _foods(["5", "6", "7"])
+    frame = FoodTable(foods).frame([2, 0])
+    assert frame["food_name"].tolist() == ["Food 2", "Food 0"]
+    assert frame["calories"].tolist() == pytest.approx(foods["calories"].iloc[[2, 0]].tolist())
+    assert frame["name_norm"].tolist() == ["food 2", "food 0"]
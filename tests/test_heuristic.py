@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.optimizer.heuristic import _repair, solve_meal_fast
+from src.optimizer.lp_day_solver import CAL_BAND, FIBER_FLOOR, _portion_matrix, solve_one_meal
+
+FOODS = pd.DataFrame({
+    "food_id": [str(i) for i in range(8)],
+    "food_name": ["rice", "beans", "chicken", "apple", "broccoli", "oats", "egg", "almonds"],
+    "calories": [130.0, 127.0, 165.0, 52.0, 34.0, 389.0, 155.0, 579.0],
+    "protein": [2.7, 8.7, 31.0, 0.3, 2.8, 16.9, 13.0, 21.2],
+    "fat": [0.3, 0.5, 3.6, 0.2, 0.4, 6.9, 11.0, 49.9],
+    "carbs": [28.0, 22.8, 0.0, 13.8, 6.6, 66.3, 1.1, 21.6],
+    "fiber": [0.4, 6.4, 0.0, 2.4, 2.6, 10.6, 0.0, 12.5],
+    "grams_per_portion": [150.0, 100.0, 120.0, 150.0, 100.0, 60.0, 100.0, 30.0],
+})
+
+MACRO = {"protein_g": 35.0, "fat_g": 15.0, "carbs_g": 70.0, "fiber_g": 9.0}
+
+
+def _totals(items):
+    return {n: sum(it[n] for it in items) for n in ("calories", "fiber")}
+
+
+@pytest.mark.parametrize("min_items, max_items", [(1, 2), (2, 3), (3, 4), (4, 4)])
+def test_fast_meal_item_counts_and_bounds(min_items, max_items):
+    info = {}
+    items = solve_meal_fast(FOODS, 550.0, MACRO, max_items=max_items, min_items=min_items, info=info)
+    assert items is not None, info
+    assert info["status"] == "Heuristic"
+    assert min_items <= len(items) <= max_items
+
+    totals = _totals(items)
+    # items are rounded to 0.1 kcal / g
+    assert 550.0 * (1 - CAL_BAND) - 1 <= totals["calories"] <= 550.0 * (1 + CAL_BAND) + 1
+    assert MACRO["fiber_g"] * FIBER_FLOOR - 0.1 <= totals["fiber"] <= MACRO["fiber_g"] + 0.1
+
+
+def test_fast_meal_unreachable_calories():
+    info = {}
+    assert solve_meal_fast(FOODS, 20_000.0, MACRO, max_items=2, min_items=1, info=info) is None
+    assert info["status"] == "Heuristic infeasible"
+
+
+def test_repair_scales_into_calorie_band():
+    M = _portion_matrix(FOODS)
+    chosen = [0, 2]
+    portions = np.zeros(len(FOODS))
+    portions[chosen] = 0.3
+    fiber_cap = {"fiber_g": 100.0}
+
+    repaired = _repair(M, portions.copy(), chosen, 400.0, fiber_cap)
+    assert 400.0 * (1 - CAL_BAND) <= repaired @ M[:, 0] <= 400.0 * (1 + CAL_BAND)
+    assert (repaired[chosen] <= 1.5).all()
+    assert (np.delete(repaired, chosen) == 0).all()
+
+
+def test_fast_meal_portions_optimal_for_its_foods():
+    # with every food required, only the portions are left to choose
+    pool = FOODS.iloc[[0, 1, 2]]
+    fast, exact = {}, {}
+    solve_meal_fast(pool, 550.0, MACRO, max_items=3, min_items=3, info=fast)
+    solve_one_meal(pool, 550.0, MACRO, max_items=3, min_items=3, info=exact)
+    assert exact["status"] == "Optimal"
+    assert fast["objective"] == pytest.approx(exact["objective"], abs=1e-3)
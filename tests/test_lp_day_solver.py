@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.catalog_manager import sample_foods
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.lp_day_solver import MEAL_CONFIG, _slot_macro, _solve_slots, build_day, precheck_meal
+from src.pipelines.batch_planner import ITEM_COLUMNS, write_plan_csv
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return PreparedCatalog(sample_foods())
+
+
+def _slot_targets(total_cal, targets):
+    return {
+        slot: (total_cal * frac, _slot_macro(targets, frac), min_i, max_i)
+        for slot, (frac, min_i, max_i, _) in MEAL_CONFIG.items()
+    }
+
+
+HUGE = {"calories": 1_000_000, "protein_g": 40_000, "fat_g": 30_000, "carbs_g": 120_000, "fiber_g": 10_000}
+
+
+@pytest.mark.parametrize("mode", ["exact", "fast"])
+def test_build_day_all_prechecks_fail(catalog, mode):
+    plan = build_day(catalog, HUGE, mode=mode)
+    assert all(items == [] for items in plan["meals"].values())
+    assert all("CALORIES_UNREACHABLE" in w for w in plan["warnings"])
+    assert len(plan["warnings"]) == len(MEAL_CONFIG)
+
+
+@pytest.mark.parametrize("mode", ["exact", "fast"])
+def test_solve_slots_empty_pools(catalog, mode):
+    targets = {"calories": 2000, "protein_g": 100, "fat_g": 60, "carbs_g": 250, "fiber_g": 30}
+    allowed = np.zeros(len(catalog), dtype=bool)
+    plan = {"meals": {}, "totals": {}, "warnings": []}
+    objective = _solve_slots(catalog, allowed, _slot_targets(2000.0, targets), plan, set(), mode=mode)
+    assert objective["objective"] == 0.0
+    assert plan["warnings"] == [f"⚠️ {slot}: EMPTY_POOL" for slot in MEAL_CONFIG]
+
+
+# two 100 g portions: 300 kcal and 12 g fiber together, 450 kcal / 18 g at MAX_PORTIONS
+POOL = pd.DataFrame({
+    "food_id": ["1", "2"],
+    "food_name": ["rice", "beans"],
+    "calories": [200.0, 100.0],
+    "protein": [4.0, 8.0],
+    "fat": [1.0, 1.0],
+    "carbs": [44.0, 14.0],
+    "fiber": [2.0, 10.0],
+    "grams_per_portion": [100.0, 100.0],
+})
+
+
+@pytest.mark.parametrize("pool, target_cal, fiber_g, min_items, reason", [
+    (POOL, 300.0, 10.0, 1, None),
+    (POOL.iloc[:0], 300.0, 10.0, 1, "EMPTY_POOL"),
+    (POOL, 300.0, 10.0, 3, "TOO_FEW_FOODS"),
+    (POOL, 600.0, 10.0, 1, "CALORIES_UNREACHABLE"),
+    (POOL, 300.0, 100.0, 1, "FIBER_UNREACHABLE"),
+    (POOL, 300.0, 2.0, 1, "FIBER_OVER_CAP"),
+])
+def test_precheck_meal_reasons(pool, target_cal, fiber_g, min_items, reason):
+    macro = {"protein_g": 10.0, "fat_g": 5.0, "carbs_g": 50.0, "fiber_g": fiber_g}
+    assert precheck_meal(pool, target_cal, macro, min_items=min_items, max_items=2) == reason
+
+
+def test_write_plan_csv_empty_plan(catalog, tmp_path):
+    plan = build_day(catalog, HUGE, mode="fast")
+    path = tmp_path / "plan.csv"
+    write_plan_csv(plan, path)
+    frame = pd.read_csv(path)
+    assert frame.empty
+    assert list(frame.columns) == ["day", "slot", "position"] + ITEM_COLUMNS
@@ -0,0 +1,64 @@
+import pytest
+
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.lp_day_solver import MEAL_CONFIG, MealModel, _slot_macro, solve_one_meal
+from src.pipelines.synthetic_catalog import generate_catalog
+
+DAY = {"protein_g": 110.0, "fat_g": 70.0, "carbs_g": 280.0, "fiber_g": 30.0}
+SWEEP = [1800.0, 2200.0, 2600.0, 2200.0]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    catalog = PreparedCatalog(generate_catalog(500, seed=0))
+    # small enough for CBC to prove optimality
+    return catalog.pool("lunch", max_candidates=25)
+
+
+def _targets(calories):
+    frac = MEAL_CONFIG["lunch"][0]
+    return calories * frac, _slot_macro(dict(DAY, calories=calories), frac)
+
+
+def _fresh(pool, meal_cal, macro, max_items, min_items):
+    info = {}
+    items = solve_one_meal(pool, meal_cal, macro, max_items=max_items, min_items=min_items, info=info)
+    return items, info
+
+
+def test_meal_model_sweep_matches_fresh_solves(pool):
+    _, min_i, max_i, _ = MEAL_CONFIG["lunch"]
+    model = MealModel(pool, max_i, min_i)
+    for calories in SWEEP:
+        meal_cal, macro = _targets(calories)
+        model.set_targets(meal_cal, macro, max_i)
+        info = {}
+        items = model.solve(info)
+        fresh_items, fresh = _fresh(pool, meal_cal, macro, max_i, min_i)
+
+        assert info["status"] == fresh["status"] == "Optimal"
+        assert info["warm_start"] == (model.solves > 1)
+        assert info["objective"] == pytest.approx(fresh["objective"], abs=1e-3)
+        assert min_i <= len(items) <= max_i
+        assert fresh_items is not None
+
+
+def test_meal_model_exclude_matches_fresh_solve_without_foods(pool):
+    _, min_i, max_i, _ = MEAL_CONFIG["lunch"]
+    model = MealModel(pool, max_i, min_i)
+    meal_cal, macro = _targets(2200.0)
+    model.set_targets(meal_cal, macro, max_i)
+    first = model.solve({})
+
+    used = {it["food_id"] for it in first}
+    model.exclude(used)
+    info = {}
+    items = model.solve(info)
+    _, fresh = _fresh(model.pool, meal_cal, macro, max_i, min_i)
+    assert not used & {it["food_id"] for it in items}
+    assert info["objective"] == pytest.approx(fresh["objective"], abs=1e-3)
+    assert info["candidates"] == fresh["candidates"]
+
+    # excluding nothing frees the foods again
+    model.exclude(set())
+    assert len(model.pool) == len(pool)
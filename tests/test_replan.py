@@ -0,0 +1,62 @@
+import pytest
+
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.lp_day_solver import MEAL_CONFIG, build_day, replan_day
+from src.pipelines.synthetic_catalog import generate_catalog
+
+TARGETS = {"calories": 2200.0, "protein_g": 110.0, "fat_g": 70.0, "carbs_g": 280.0, "fiber_g": 30.0}
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return PreparedCatalog(generate_catalog(500, seed=0))
+
+
+@pytest.fixture(scope="module")
+def previous(catalog):
+    plan = build_day(catalog, TARGETS, mode="fast")
+    assert all(plan["meals"][slot] for slot in MEAL_CONFIG), plan["warnings"]
+    return plan
+
+
+def _ids(items):
+    return [str(it["food_id"]) for it in items]
+
+
+@pytest.mark.parametrize("mode", ["exact", "fast"])
+def test_replan_keeps_locked_slots_and_items(catalog, previous, mode):
+    locked_item = previous["meals"]["lunch"][0]
+    plan = replan_day(catalog, TARGETS, previous, locked_slots=["breakfast"],
+                      locked_items=[locked_item["food_id"]], mode=mode)
+
+    assert plan["meals"]["breakfast"] == previous["meals"]["breakfast"]
+    assert "breakfast" not in plan["replanned"]
+    assert set(plan["replanned"]) == set(MEAL_CONFIG) - {"breakfast"}
+
+    lunch = plan["meals"]["lunch"]
+    assert lunch[0] == locked_item
+    assert len(lunch) <= MEAL_CONFIG["lunch"][2]
+
+
+@pytest.mark.parametrize("mode", ["exact", "fast"])
+def test_replan_does_not_reuse_locked_foods(catalog, previous, mode):
+    locked_item = previous["meals"]["dinner"][0]
+    plan = replan_day(catalog, TARGETS, previous, locked_slots=["breakfast", "snack1"],
+                      locked_items=[locked_item["food_id"]], mode=mode)
+
+    locked_ids = set(_ids(previous["meals"]["breakfast"]) + _ids(previous["meals"]["snack1"]))
+    locked_ids.add(str(locked_item["food_id"]))
+    for slot in plan["replanned"]:
+        new_ids = _ids(plan["meals"][slot])
+        if slot == "dinner":
+            new_ids.remove(str(locked_item["food_id"]))
+        assert not locked_ids & set(new_ids), slot
+
+    day_ids = [i for items in plan["meals"].values() for i in _ids(items)]
+    assert len(day_ids) == len(set(day_ids))
+
+
+def test_replan_all_slots_locked(catalog, previous):
+    plan = replan_day(catalog, TARGETS, previous, locked_slots=list(MEAL_CONFIG))
+    assert plan["replanned"] == []
+    assert plan["meals"] == {slot: previous["meals"][slot] for slot in MEAL_CONFIG}
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.ml.neighbors import macro_profiles
+from src.optimizer.catalog import PreparedCatalog
+from src.optimizer.lp_day_solver import MAX_PORTIONS, _portion_matrix
+from src.pipelines.synthetic_catalog import generate_catalog
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return PreparedCatalog(generate_catalog(500, seed=0))
+
+
+def _lunch_food(catalog, n=0):
+    return catalog.table.frame(catalog.slots["lunch"].positions[n:n + 1])["food_id"].iloc[0]
+
+
+def test_substitutes_ranked_by_macro_distance(catalog):
+    food_id = _lunch_food(catalog)
+    item, subs = catalog.substitutes(food_id, "lunch", portions=1.2, k=5)
+    assert item["food_id"] == food_id
+    assert len(subs) == 5
+
+    distances = [s["macro_distance"] for s in subs]
+    assert distances == sorted(distances)
+    for s in subs:
+        # rescaled to the item's calories within the portion cap
+        assert s["calories"] == pytest.approx(item["calories"], abs=0.2)
+        assert 0.01 <= s["portions"] <= MAX_PORTIONS
+        assert s["food_name"] != item["food_name"]
+
+
+def test_substitutes_match_brute_force(catalog):
+    food_id = _lunch_food(catalog, 3)
+    item, subs = catalog.substitutes(food_id, "lunch", k=5)
+
+    sp = catalog.slots["lunch"]
+    frame = catalog.table.frame(sp.positions)
+    M = _portion_matrix(frame)
+    X = macro_profiles(M)
+    pos = int(np.flatnonzero(frame["food_id"].to_numpy() == food_id)[0])
+    ok = (
+        (M[:, 0] * MAX_PORTIONS >= item["calories"] - 0.1)
+        & (frame["food_name"].str.lower() != item["food_name"].lower()).to_numpy()
+    )
+    d = np.where(ok, np.linalg.norm(X - X[pos], axis=1), np.inf)
+    expected = frame["food_id"].to_numpy()[np.argsort(d, kind="stable")[:5]]
+    assert [s["food_id"] for s in subs] == list(expected)
+
+
+def test_substitutes_respect_exclusions(catalog):
+    food_id = _lunch_food(catalog)
+    _, first = catalog.substitutes(food_id, "lunch", k=3)
+    skipped = {s["food_id"] for s in first}
+    _, subs = catalog.substitutes(food_id, "lunch", k=3, exclude_ids=skipped)
+    assert len(subs) == 3
+    assert not skipped & {s["food_id"] for s in subs}
+
+
+def test_substitutes_unknown_food(catalog):
+    with pytest.raises(KeyError):
+        catalog.substitutes("no-such-food", "lunch")